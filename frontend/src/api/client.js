@@ -13,7 +13,7 @@ const apiClient = axios.create({
 
 export const api = {
   predict: (data) => apiClient.post('/predict/', data),
-  getRecords: () => apiClient.get('/records/'),
+  getRecords: (cursor) => apiClient.get('/records/', { params: cursor ? { cursor } : {} }),
   getStatistics: () => apiClient.get('/statistics/'),
 };
 
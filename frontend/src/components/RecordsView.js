@@ -4,6 +4,7 @@ import './RecordsView.css';
 
 function RecordsView({ refreshTrigger }) {
   const [records, setRecords] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -16,7 +17,8 @@ function RecordsView({ refreshTrigger }) {
     setError(null);
     try {
       const response = await api.getRecords();
-      setRecords(response.data);
+      setRecords(response.data.results);
+      setNextCursor(response.data.next_cursor);
     } catch (err) {
       setError('Failed to fetch records. Please ensure the backend is running.');
     } finally {
@@ -24,6 +26,16 @@ function RecordsView({ refreshTrigger }) {
     }
   };
 
+  const fetchMoreRecords = async () => {
+    try {
+      const response = await api.getRecords(nextCursor);
+      setRecords([...records, ...response.data.results]);
+      setNextCursor(response.data.next_cursor);
+    } catch (err) {
+      setError('Failed to fetch records. Please ensure the backend is running.');
+    }
+  };
+
   if (loading) {
     return (
       <div className="records-container">
@@ -92,7 +104,12 @@ function RecordsView({ refreshTrigger }) {
       )}
 
       <div className="records-footer">
-        <p>Total Records: <strong>{records.length}</strong></p>
+        <p>Records Shown: <strong>{records.length}</strong></p>
+        {nextCursor && (
+          <button onClick={fetchMoreRecords} className="refresh-btn">
+            Load More
+          </button>
+        )}
       </div>
     </div>
   );
@@ -1,8 +1,25 @@
 from django.contrib import admin
-from .models import StudentPerformance
+from .models import StudentPerformance, ShadowPrediction, PredictionLog, RecordStatistics
 
 @admin.register(StudentPerformance)
 class StudentPerformanceAdmin(admin.ModelAdmin):
-    list_display = ('id', 'hours_studied', 'previous_scores', 'extracurricular', 'sleep_hours', 'sample_papers', 'performance_index')
-    list_filter = ('extracurricular',)
+    list_display = ('id', 'hours_studied', 'previous_scores', 'extracurricular', 'sleep_hours', 'sample_papers', 'performance_index', 'predicted_performance_index', 'prediction_model_version')
+    list_filter = ('extracurricular', 'prediction_model_version')
     search_fields = ('performance_index',)
+
+
+@admin.register(ShadowPrediction)
+class ShadowPredictionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'primary_version', 'primary_prediction', 'shadow_version', 'shadow_prediction', 'created_at')
+    list_filter = ('shadow_version',)
+
+
+@admin.register(PredictionLog)
+class PredictionLogAdmin(admin.ModelAdmin):
+    list_display = ('id', 'hours_studied', 'previous_scores', 'extracurricular', 'sleep_hours', 'sample_papers', 'predicted_performance_index', 'model_version', 'profile', 'created_at')
+    list_filter = ('model_version', 'profile', 'source')
+
+
+@admin.register(RecordStatistics)
+class RecordStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('id', 'total_records', 'extracurricular_count', 'updated_at')
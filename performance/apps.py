@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PerformanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'performance'
+
+    def ready(self):
+        """
+        Keep the record statistics row up to date, and optionally load the
+        served model bundle at startup, so the first request does not pay
+        for importing NumPy and opening the bundle.
+        """
+        from .running_stats import connect_signals
+
+        connect_signals()
+
+        if settings.MODEL_WARMUP:
+            from .registry import get_registry
+
+            get_registry().get()
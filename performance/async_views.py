@@ -0,0 +1,192 @@
+"""
+Async versions of the prediction and read endpoints, for ASGI deployments.
+
+Request parsing and validation run on the event loop; model scoring and
+other blocking work are handed to the bounded prediction executor, and
+database reads use Django's async ORM. Responses match the sync views.
+"""
+import functools
+import json
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import status
+from .serializers import StudentPerformanceSerializer, PredictionSerializer
+from .models import StudentPerformance
+from .executor import ExecutorBusy, get_executor
+from .registry import get_registry
+from .shadow import get_shadow
+from .pagination import keyset_page, page_payload, page_size, split_page
+from . import views
+
+
+def require_methods(*methods):
+    """
+    require_http_methods for async views. Django 4.2's decorator wraps the
+    view in a sync function, so the handler would get an unawaited coroutine.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def exempt_from_csrf(view):
+    """
+    Mark a view as CSRF exempt without wrapping it (Django 4.2's csrf_exempt
+    wraps it in a sync function, like require_http_methods).
+    """
+    view.csrf_exempt = True
+    return view
+
+
+def error_response(message, status_code):
+    return JsonResponse({'error': message}, status=status_code)
+
+
+def parse_json(request):
+    """
+    Return the decoded JSON body, or raise ValueError.
+    """
+    return json.loads(request.body or b'null')
+
+
+def score_rows(bundle, rows, n_trees, profile):
+    """
+    Validate and score a batch (runs on the executor).
+    """
+    results, valid_indices, valid_rows = views.validate_batch(rows)
+    return views.score_batch(bundle, results, valid_indices, valid_rows, n_trees=n_trees, profile=profile)
+
+
+async def served_bundle():
+    """
+    Return the bundle to serve, loading it on the executor if this is the
+    first request (loading opens files, so it must not block the loop).
+    """
+    registry = get_registry()
+    if registry.version is not None:
+        return registry.get()
+    return await get_executor().run(registry.get)
+
+
+@exempt_from_csrf
+@require_methods('POST')
+async def predict_performance(request):
+    """
+    Async /api/predict/. Same request and response as the sync view.
+    """
+    bundle = await served_bundle()
+    if bundle is None:
+        return error_response('Model not found. Please train the model first.', status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    try:
+        serializer = PredictionSerializer(data=parse_json(request))
+    except ValueError:
+        return error_response('Request body must be valid JSON.', status.HTTP_400_BAD_REQUEST)
+
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    error = views.day_length_error(data)
+    if error is not None:
+        return error_response(error, status.HTTP_400_BAD_REQUEST)
+
+    profile, n_trees, error = views.resolve_profile(bundle, request.GET.get('profile'))
+    if error is not None:
+        return error_response(error, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        prediction = await get_executor().run(views.score_single, bundle, data, n_trees)
+    except ExecutorBusy:
+        return error_response('Server busy, please retry.', status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        return error_response(f'Prediction error: {str(e)}', status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # Queue the request for the challenger model; never waits on it.
+    # Only full-model predictions are compared, so truncated profiles
+    # do not show up as differences between the models
+    shadow = get_shadow()
+    if shadow is not None and n_trees is None:
+        shadow.submit(data, bundle.version, prediction)
+
+    views.log_prediction(bundle, data, prediction, profile, source='async')
+    return JsonResponse(views.prediction_payload(bundle, data, prediction, profile, n_trees), status=status.HTTP_200_OK)
+
+
+@exempt_from_csrf
+@require_methods('POST')
+async def predict_batch(request):
+    """
+    Async /api/predict/batch/. Same request and response as the sync view.
+    """
+    bundle = await served_bundle()
+    if bundle is None:
+        return error_response('Model not found. Please train the model first.', status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    try:
+        rows = parse_json(request)
+    except ValueError:
+        return error_response('Request body must be valid JSON.', status.HTTP_400_BAD_REQUEST)
+
+    error = views.batch_size_error(rows)
+    if error is not None:
+        return error_response(error, status.HTTP_400_BAD_REQUEST)
+
+    profile, n_trees, error = views.resolve_profile(bundle, request.GET.get('profile'))
+    if error is not None:
+        return error_response(error, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Validating a large batch is CPU-bound too, so it runs on the pool
+        payload = await get_executor().run(score_rows, bundle, rows, n_trees, profile)
+    except ExecutorBusy:
+        return error_response('Server busy, please retry.', status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        return error_response(f'Prediction error: {str(e)}', status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return JsonResponse(payload, status=status.HTTP_200_OK)
+
+
+@require_methods('GET')
+async def get_all_records(request):
+    """
+    Async /api/records/.
+    """
+    try:
+        size = page_size(request.GET.get('page_size'))
+        page = keyset_page(StudentPerformance.objects.all(), request.GET.get('cursor'), size)
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST)
+
+    records, next_cursor = split_page([record async for record in page], size)
+    serializer = StudentPerformanceSerializer(records, many=True)
+    return JsonResponse(page_payload(request, serializer.data, next_cursor, size), status=status.HTTP_200_OK)
+
+
+@require_methods('GET')
+async def get_record_by_id(request, pk):
+    """
+    Async /api/records/<pk>/.
+    """
+    try:
+        record = await StudentPerformance.objects.aget(pk=pk)
+    except StudentPerformance.DoesNotExist:
+        return error_response('Record not found', status.HTTP_404_NOT_FOUND)
+    return JsonResponse(StudentPerformanceSerializer(record).data, status=status.HTTP_200_OK)
+
+
+@require_methods('GET')
+async def get_statistics(request):
+    """
+    Async /api/statistics/.
+    """
+    stats = await sync_to_async(views.statistics_payload)()
+    if stats is None:
+        return error_response('No records found in database', status.HTTP_404_NOT_FOUND)
+    return JsonResponse(stats, status=status.HTTP_200_OK)
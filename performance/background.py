@@ -0,0 +1,153 @@
+"""
+Bounded queues drained in batches by a background thread.
+
+The request path hands an item to submit() and returns; a worker thread
+takes the queued items in batches of up to batch_size, waiting at most
+flush_interval seconds for a batch to fill, and passes each batch to
+_record(). While the queue is empty the worker blocks on it instead of
+polling, so an idle writer costs nothing.
+"""
+import logging
+import queue
+import threading
+import time
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop() to wake a worker blocked on an empty queue
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Base class for buffered writers. Subclasses implement _record(batch).
+
+    submit() never blocks: when the queue is full the item is dropped and
+    counted in dropped.
+    """
+
+    # Name of the worker thread, and the log message for a failed batch
+    thread_name = 'background-writer'
+    failure_message = 'Recording %d queued items failed: %s'
+
+    def __init__(self, queue_size=10000, batch_size=500, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stop = threading.Event()
+        self.submitted = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+
+    def submit(self, item):
+        """
+        Queue one item. Returns False if the queue was full and it was dropped.
+        """
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _record(self, batch):
+        raise NotImplementedError
+
+    def flush(self, wait=0):
+        """
+        Record up to batch_size queued items. Waits up to wait seconds for
+        the first one. Returns the number recorded.
+        """
+        return self._handle(self._take(wait))
+
+    def _take(self, wait, fill=0):
+        """
+        Return up to batch_size queued items. Waits up to wait seconds for
+        the first one (None: until one arrives), then up to fill seconds
+        for the batch to fill up.
+        """
+        try:
+            if wait is None:
+                item = self._queue.get()
+            elif wait > 0:
+                item = self._queue.get(timeout=wait)
+            else:
+                item = self._queue.get_nowait()
+        except queue.Empty:
+            return []
+
+        batch = []
+        deadline = time.monotonic() + fill
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch
+
+    def _handle(self, batch):
+        if not batch:
+            return 0
+        try:
+            self._record(batch)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = str(e)
+            logger.error(self.failure_message, len(batch), e)
+            return 0
+        return len(batch)
+
+    def start(self):
+        """
+        Start the background thread that drains the queue.
+        """
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        """
+        Record whatever is queued, then stop the background thread.
+        """
+        self._stop.set()
+        if self._worker is not None:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                # The worker is busy and will see the stop flag after this batch
+                pass
+            self._worker.join()
+        while not self._queue.empty():
+            self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._handle(self._take(None, fill=self.flush_interval))
+            close_old_connections()
+
+    def status(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'queue_size': self._queue.maxsize,
+                'queue_depth': self._queue.qsize(),
+                'submitted': self.submitted,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'last_error': self.last_error,
+            }
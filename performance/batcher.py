@@ -0,0 +1,136 @@
+"""
+Micro-batching for concurrent single-row predictions.
+
+Scoring one row costs almost as much as scoring a few dozen, so requests
+that arrive within a short window are queued, scored together in one
+vectorized call per model bundle, and handed back to their callers.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Coalesces predictions submitted from many threads into batches.
+
+    A batch is closed when window seconds have passed since its first row
+    arrived or when it holds max_batch_size rows, whichever comes first.
+    Rows are grouped by the bundle and tree count they were submitted
+    with, so a hot reload never mixes model versions within a request.
+    """
+
+    def __init__(self, window, max_batch_size):
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = False
+        self.submitted = 0
+        self.batches = 0
+        self.rows_scored = 0
+        self.largest_batch = 0
+        self.max_queue_depth = 0
+        self.errors = 0
+
+    def submit(self, bundle, row, n_trees=None):
+        """
+        Queue a validated prediction input and return a Future for its prediction.
+        n_trees limits the model to its first trees (see ModelBundle.serving_profile).
+        """
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError('MicroBatcher has been stopped')
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='prediction-micro-batcher', daemon=True)
+                self._worker.start()
+            self.submitted += 1
+            self._queue.put((bundle, row, n_trees, future))
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def predict(self, bundle, row, n_trees=None, timeout=None):
+        """
+        Submit one row and block until its prediction is ready.
+        """
+        return self.submit(bundle, row, n_trees=n_trees).result(timeout=timeout)
+
+    def stop(self):
+        """
+        Score whatever is queued, then stop the worker thread.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            worker = self._worker
+            self._queue.put(None)
+        if worker is not None:
+            worker.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._score(batch)
+
+    def _score(self, batch):
+        groups = {}
+        for bundle, row, n_trees, future in batch:
+            groups.setdefault((id(bundle), n_trees), (bundle, n_trees, []))[2].append((row, future))
+
+        for bundle, n_trees, items in groups.values():
+            try:
+                predictions = bundle.predict_rows([row for row, _ in items], n_trees=n_trees)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), prediction in zip(items, predictions):
+                future.set_result(float(prediction))
+
+        with self._lock:
+            self.batches += 1
+            self.rows_scored += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self):
+        """
+        Return batching counters and the current queue depth.
+        """
+        with self._lock:
+            return {
+                'enabled': True,
+                'window_ms': self.window * 1000,
+                'max_batch_size': self.max_batch_size,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'submitted': self.submitted,
+                'batches': self.batches,
+                'rows_scored': self.rows_scored,
+                'mean_batch_size': round(self.rows_scored / self.batches, 2) if self.batches else 0.0,
+                'largest_batch': self.largest_batch,
+                'errors': self.errors,
+            }
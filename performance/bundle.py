@@ -0,0 +1,243 @@
+"""
+Versioned model bundles.
+
+A bundle is one directory holding everything serving needs: the compiled
+tree arrays, scaler parameters, feature order, prediction cube, training
+data hash and metrics. Numeric arrays are plain .npy files opened with
+mmap_mode, so workers share them through the page cache instead of
+unpickling private copies.
+
+Layout:
+    <root>/CURRENT               name of the bundle to serve
+    <root>/<version>/manifest.json
+    <root>/<version>/*.npy
+"""
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+import numpy as np
+from .compiled import CompiledEnsemble
+from .cube import build_cube, load_cube, lookup
+from .exceptions import BundleError
+from .features import FEATURE_NAMES, build_features, rows_to_inputs
+
+
+MANIFEST_NAME = 'manifest.json'
+CURRENT_NAME = 'CURRENT'
+CUBE_NAME = 'cube.npy'
+FORMAT_VERSION = 1
+
+
+def hash_arrays(*arrays):
+    """
+    Return a sha256 hex digest of the given arrays' shapes and contents.
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """
+    A loaded, read-only model bundle.
+    """
+
+    def __init__(self, version, manifest, compiled, cube=None, path=None):
+        self.version = version
+        self.manifest = manifest
+        self.compiled = compiled
+        self.cube = cube
+        self.path = path
+
+    @property
+    def feature_names(self):
+        return self.manifest['feature_names']
+
+    @property
+    def metrics(self):
+        return self.manifest.get('metrics', {})
+
+    @property
+    def profiles(self):
+        """
+        Serving profiles by name, each with the number of trees it evaluates
+        and its held-out error. Bundles without staged errors only offer 'full'.
+        """
+        return self.manifest.get('profiles') or {'full': {'n_trees': self.compiled.n_trees}}
+
+    @property
+    def served_profiles(self):
+        """
+        profiles as they are actually served. The prediction cube holds the
+        full model at lookup cost, so in bundles with a cube every profile
+        is the full model and is reported as such.
+        """
+        if self.cube is None:
+            return self.profiles
+        full = self.profiles.get('full', {'n_trees': self.compiled.n_trees})
+        return {name: {**full, 'served_as': 'full', 'cube': True} for name in self.profiles}
+
+    def serving_profile(self, profile):
+        """
+        Return (name, n_trees) of what serves a request for profile: the
+        profile itself, or 'full' when the bundle has a cube. n_trees is
+        None when all trees are used. Raises KeyError for an unknown profile.
+        """
+        n_trees = self.profiles[profile]['n_trees']
+        if self.cube is not None:
+            return 'full', None
+        return profile, (n_trees if n_trees < self.compiled.n_trees else None)
+
+    def predict_features(self, features, n_trees=None):
+        """
+        Predict from an unscaled feature matrix, clipped to 0-100.
+        """
+        return np.clip(self.compiled.predict(features, n_trees=n_trees), 0, 100)
+
+    def predict_inputs(self, inputs, n_trees=None):
+        """
+        Predict from an (n, 5) array of valid raw inputs, answering from
+        the prediction cube when the bundle has one and all trees are used.
+        """
+        if self.cube is not None and n_trees is None:
+            return lookup(self.cube, inputs)
+        return self.predict_features(build_features(inputs), n_trees=n_trees)
+
+    def predict_rows(self, rows, n_trees=None):
+        """
+        Predict from a list of validated prediction inputs (dicts).
+        """
+        return self.predict_inputs(rows_to_inputs(rows), n_trees=n_trees)
+
+
+def save_bundle(root, compiled, scaler, training_data_hash, metrics=None, model_params=None,
+                cube_predict=None, profiles=None, staged_errors=None, make_current=True):
+    """
+    Write a new bundle under root and return its version.
+
+    profiles and staged_errors, if given, are the serving profiles and
+    per-stage held-out errors from performance.profiles.
+
+    cube_predict, if given, maps an (n, 15) unscaled feature matrix to
+    predictions and is used to build the bundle's prediction cube.
+    The bundle is written to a temporary directory and renamed into place,
+    and CURRENT is replaced atomically, so readers never see a partial bundle.
+    """
+    arrays = dict(compiled.arrays())
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    content_hash = hash_arrays(*(arrays[name] for name in sorted(arrays)))
+    version = content_hash[:12]
+    manifest = {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'content_hash': content_hash,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'feature_names': list(FEATURE_NAMES),
+        'baseline': compiled.baseline,
+        'n_trees': compiled.n_trees,
+        'depth': compiled.depth,
+        'training_data_hash': training_data_hash,
+        'model_params': model_params or {},
+        'metrics': metrics or {},
+        'profiles': profiles or {'full': {'n_trees': compiled.n_trees}},
+        'staged_errors': staged_errors or {},
+        'arrays': {
+            name: {'dtype': array.dtype.str, 'shape': list(array.shape)}
+            for name, array in arrays.items()
+        },
+        'cube': cube_predict is not None,
+    }
+
+    os.makedirs(root, exist_ok=True)
+    final_path = os.path.join(root, version)
+    if not os.path.isdir(final_path):
+        tmp_path = os.path.join(root, f'.{version}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{name}.npy'), array)
+        if cube_predict is not None:
+            build_cube(cube_predict, path=os.path.join(tmp_path, CUBE_NAME))
+        with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(tmp_path, final_path)
+
+    if make_current:
+        set_current_version(root, version)
+    return version
+
+
+def set_current_version(root, version):
+    """
+    Atomically point CURRENT at an existing bundle version.
+    """
+    if not os.path.isfile(os.path.join(root, version, MANIFEST_NAME)):
+        raise BundleError(f'Bundle {version} does not exist in {root}')
+
+    tmp_path = os.path.join(root, f'.{CURRENT_NAME}.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+    os.replace(tmp_path, os.path.join(root, CURRENT_NAME))
+
+
+def current_version(root):
+    """
+    Return the version named by CURRENT, or None if there is none.
+    """
+    try:
+        with open(os.path.join(root, CURRENT_NAME)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_bundle(root, version=None):
+    """
+    Open a bundle (the CURRENT one by default) with memory-mapped arrays.
+
+    Raises BundleError if it is missing or does not match this code's
+    feature pipeline or its own manifest.
+    """
+    version = version or current_version(root)
+    if version is None:
+        raise BundleError(f'No current model bundle in {root}')
+
+    path = os.path.join(root, version)
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BundleError(f'Bundle {version} has no manifest')
+
+    if manifest.get('format') != FORMAT_VERSION or manifest.get('version') != version:
+        raise BundleError(f'Bundle {version} has an unexpected manifest')
+    if manifest['feature_names'] != FEATURE_NAMES:
+        raise BundleError(f'Bundle {version} does not match the feature pipeline')
+
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        try:
+            array = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        except FileNotFoundError:
+            raise BundleError(f'Bundle {version} is missing {name}.npy')
+        if array.dtype.str != spec['dtype'] or list(array.shape) != spec['shape']:
+            raise BundleError(f'Bundle {version} has a corrupt {name}.npy')
+        arrays[name] = array
+
+    cube = None
+    if manifest.get('cube'):
+        cube = load_cube(os.path.join(path, CUBE_NAME))
+        if cube is None:
+            raise BundleError(f'Bundle {version} is missing its prediction cube')
+
+    compiled = CompiledEnsemble.from_arrays(arrays, manifest['baseline'])
+    return ModelBundle(version, manifest, compiled, cube=cube, path=path)
@@ -0,0 +1,98 @@
+"""
+In-process LRU caches whose entries are valid for one version of their source.
+"""
+import threading
+from collections import OrderedDict
+
+
+class VersionedLRUCache:
+    """
+    Bounded LRU cache whose entries all belong to one version of the data
+    they were computed from (a model version, a statistics generation).
+
+    Entries for an older version are dropped as soon as a lookup with a
+    new version is made, so stale values are never served.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            self._check_version(version)
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """
+        Store a value, evicting the least recently used entry if full.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drop all cached values.
+        """
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return hit/miss/eviction counters and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class PredictionCache(VersionedLRUCache):
+    """
+    Cache of single-row predictions, keyed on the validated input tuple
+    and the model version, so a retrained model never serves cached
+    predictions from the previous one.
+    """
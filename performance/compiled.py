@@ -0,0 +1,150 @@
+"""
+Array-based evaluator for the trained GradientBoostingRegressor.
+
+The ensemble is flattened into contiguous NumPy arrays and evaluated for a
+whole batch at once, one tree level per step, with no sklearn objects on
+the serving path. The StandardScaler is folded into the split thresholds,
+so the evaluator works directly on unscaled features.
+"""
+import numpy as np
+
+
+# Rows evaluated per step, bounding the (rows x trees) node index matrices
+CHUNK_ROWS = 256
+
+# Complete trees hold 2 ** depth leaves each, so keep depth reasonable
+MAX_DEPTH = 12
+
+
+def _float32_boundary(threshold):
+    """
+    sklearn trees compare float32(x) <= threshold. Return the float64
+    boundary b such that this holds exactly when x < b (up to ties).
+    """
+    lower = threshold.astype(np.float32)
+    lower = np.where(lower > threshold, np.nextafter(lower, np.float32(-np.inf)), lower)
+    upper = np.nextafter(lower, np.float32(np.inf))
+    return (lower.astype(np.float64) + upper.astype(np.float64)) / 2
+
+
+class CompiledEnsemble:
+    """
+    Tree ensemble stored as complete binary trees of equal depth.
+
+    Tree t keeps its 2 ** depth - 1 internal nodes in heap order in row t
+    of feature/threshold, and its 2 ** depth leaves in row t of value.
+    Shallower branches are padded with nodes that always go left
+    (threshold +inf) down to leaves repeating the original leaf value.
+    Leaf values already include the learning rate, and baseline is the
+    initial (constant) prediction.
+    """
+
+    ARRAY_NAMES = ('feature', 'threshold', 'value')
+
+    def __init__(self, feature, threshold, value, baseline):
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.baseline = float(baseline)
+        self.depth = int(np.log2(value.shape[1]))
+
+    @property
+    def n_trees(self):
+        return self.value.shape[0]
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """
+        Flatten a fitted GradientBoostingRegressor.
+
+        If scaler is given, split thresholds are transformed back into raw
+        feature space, so predict() takes unscaled features.
+        """
+        n_features = model.n_features_in_
+        mean = np.zeros(n_features) if scaler is None else scaler.mean_
+        scale = np.ones(n_features) if scaler is None else scaler.scale_
+
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        depth = max(tree.max_depth for tree in trees)
+        if depth > MAX_DEPTH:
+            raise ValueError(f'Trees of depth {depth} are too deep to compile (maximum is {MAX_DEPTH})')
+
+        n_internal = 2 ** depth - 1
+        feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+        threshold = np.full((len(trees), n_internal), np.inf)
+        value = np.zeros((len(trees), 2 ** depth))
+
+        for t, tree in enumerate(trees):
+            split_feature = np.where(tree.feature >= 0, tree.feature, 0)
+            raw_threshold = _float32_boundary(tree.threshold) * scale[split_feature] + mean[split_feature]
+
+            # (sklearn node, heap position, level)
+            stack = [(0, 0, 0)]
+            while stack:
+                node, position, level = stack.pop()
+                left = tree.children_left[node]
+
+                if left == -1:
+                    # Fill every leaf slot below this position
+                    first, last = position, position
+                    for _ in range(depth - level):
+                        first, last = 2 * first + 1, 2 * last + 2
+                    value[t, first - n_internal:last - n_internal + 1] = (
+                        model.learning_rate * tree.value[node, 0, 0]
+                    )
+                    continue
+
+                feature[t, position] = split_feature[node]
+                threshold[t, position] = raw_threshold[node]
+                stack.append((left, 2 * position + 1, level + 1))
+                stack.append((tree.children_right[node], 2 * position + 2, level + 1))
+
+        baseline = model.init_.predict(np.zeros((1, n_features)))[0]
+        return cls(feature, threshold, value, baseline)
+
+    def arrays(self):
+        """
+        Return the node arrays by name, for saving.
+        """
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    @classmethod
+    def from_arrays(cls, arrays, baseline):
+        """
+        Rebuild an ensemble from arrays returned by arrays().
+        """
+        return cls(*(arrays[name] for name in cls.ARRAY_NAMES), baseline)
+
+    def predict(self, features, n_trees=None):
+        """
+        Predict for an (n, n_features) matrix of unscaled features,
+        using the first n_trees trees (all trees by default).
+        """
+        features = np.asarray(features, dtype=np.float64)
+        n_trees = self.n_trees if n_trees is None else min(n_trees, self.n_trees)
+        n_internal = self.feature.shape[1]
+
+        feature = self.feature[:n_trees].ravel()
+        threshold = self.threshold[:n_trees].ravel()
+        value = self.value[:n_trees].ravel()
+        tree_offsets = np.arange(n_trees)[None, :] * n_internal
+        leaf_offsets = np.arange(n_trees)[None, :] * (n_internal + 1) - n_internal
+
+        predictions = np.empty(features.shape[0], dtype=np.float64)
+
+        for start in range(0, features.shape[0], CHUNK_ROWS):
+            chunk = features[start:start + CHUNK_ROWS]
+            flat_chunk = chunk.ravel()
+            row_offsets = np.arange(chunk.shape[0])[:, None] * chunk.shape[1]
+
+            nodes = np.zeros((chunk.shape[0], n_trees), dtype=np.intp)
+            flat_nodes = np.broadcast_to(tree_offsets, nodes.shape)
+
+            for _ in range(self.depth):
+                x = flat_chunk.take(feature.take(flat_nodes) + row_offsets)
+                nodes = 2 * nodes + 1 + (x > threshold.take(flat_nodes))
+                flat_nodes = nodes + tree_offsets
+
+            predictions[start:start + CHUNK_ROWS] = self.baseline + value.take(nodes + leaf_offsets).sum(axis=1)
+
+        return predictions
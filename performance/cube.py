@@ -0,0 +1,91 @@
+"""
+Precomputed prediction cube covering the whole valid input domain.
+
+PredictionSerializer bounds every input to a small integer range, so the
+model can be scored once for every possible input and served from a
+memory-mapped float32 array with a single index computation.
+"""
+import os
+import numpy as np
+from .features import build_features
+
+
+# Number of values per input, in INPUT_FIELDS order:
+# hours_studied 0-24, previous_scores 0-100, extracurricular 0-1,
+# sleep_hours 0-24, sample_papers 0-50
+CUBE_SHAPE = (25, 101, 2, 25, 51)
+
+# Rows scored per model call while building the cube
+CHUNK_SIZE = 262144
+
+
+def domain_inputs(start, stop):
+    """
+    Return the (n, 5) raw inputs for flat cube positions [start, stop).
+    """
+    positions = np.arange(start, stop)
+    return np.column_stack(np.unravel_index(positions, CUBE_SHAPE))
+
+
+def build_cube(predict_features, path, chunk_size=CHUNK_SIZE):
+    """
+    Score every valid input and write the results to a .npy file.
+
+    predict_features maps an (n, 15) feature matrix to n predictions.
+    Inputs where hours_studied + sleep_hours > 24 are stored as NaN.
+    The file is written next to its destination and swapped in atomically.
+    """
+    tmp_path = f'{path}.tmp'
+    cube = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=CUBE_SHAPE)
+    flat = cube.reshape(-1)
+
+    for start in range(0, flat.size, chunk_size):
+        stop = min(start + chunk_size, flat.size)
+        inputs = domain_inputs(start, stop)
+        valid = inputs[:, 0] + inputs[:, 3] <= 24
+
+        predictions = np.full(stop - start, np.nan, dtype=np.float32)
+        if valid.any():
+            predictions[valid] = np.clip(predict_features(build_features(inputs[valid])), 0, 100)
+        flat[start:stop] = predictions
+
+    cube.flush()
+    del flat, cube
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_cube(path):
+    """
+    Open the prediction cube read-only with mmap, or return None if it
+    is missing or has an unexpected shape.
+    """
+    try:
+        cube = np.load(path, mmap_mode='r')
+    except FileNotFoundError:
+        return None
+
+    if cube.shape != CUBE_SHAPE:
+        return None
+    return cube
+
+
+def verify_cube(cube, predict_features, samples=32, tolerance=1e-3):
+    """
+    Check the cube against the model on a fixed sample of valid inputs.
+    """
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, cube.size, size=samples * 4)
+    inputs = np.column_stack(np.unravel_index(positions, CUBE_SHAPE))
+    inputs = inputs[inputs[:, 0] + inputs[:, 3] <= 24][:samples]
+
+    expected = np.clip(predict_features(build_features(inputs)), 0, 100)
+    return bool(np.allclose(lookup(cube, inputs), expected, atol=tolerance))
+
+
+def lookup(cube, inputs):
+    """
+    Return cube predictions for an (n, 5) integer array of valid inputs.
+    """
+    inputs = np.asarray(inputs)
+    return np.asarray(cube[tuple(inputs.T)], dtype=np.float64)
@@ -0,0 +1,9 @@
+"""
+Exceptions raised by the model serving modules.
+"""
+
+
+class BundleError(Exception):
+    """
+    Raised when a model bundle is missing, incomplete or inconsistent.
+    """
@@ -0,0 +1,95 @@
+"""
+Bounded thread pool for CPU-bound work started from async views.
+
+The event loop only waits on the pool, so one ASGI process can hold many
+slow client connections while a fixed number of threads score models.
+Work beyond max_pending queued jobs is refused instead of piling up.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+class ExecutorBusy(Exception):
+    """
+    Raised when the executor already has max_pending jobs queued or running.
+    """
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor with a fixed worker count and a cap on pending jobs.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._pool = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prediction-executor')
+        return self._pool
+
+    async def run(self, func, *args):
+        """
+        Run func(*args) on the pool and await its result.
+        Raises ExecutorBusy if max_pending jobs are already in flight.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorBusy(f'{self.pending} jobs pending (maximum is {self.max_pending})')
+            self.pending += 1
+            try:
+                future = self._get_pool().submit(func, *args)
+            except BaseException:
+                self.pending -= 1
+                raise
+        # A job counts as pending until its thread is done with it, even if
+        # the awaiting request is cancelled while the job is running
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process-wide executor, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor(settings.PREDICTION_EXECUTOR_WORKERS, settings.PREDICTION_EXECUTOR_MAX_PENDING)
+    return _executor
@@ -0,0 +1,95 @@
+"""
+Feature engineering shared by training, serving and the bias tests.
+Maps raw student inputs to the advanced feature matrix the model expects.
+"""
+import numpy as np
+
+
+# Raw inputs, in the column order of dataset.csv
+INPUT_COLUMNS = [
+    'Hours Studied',
+    'Previous Scores',
+    'Extracurricular Activities',
+    'Sleep Hours',
+    'Sample Question Papers Practiced',
+]
+
+# The same raw inputs, as named by the API serializers
+INPUT_FIELDS = [
+    'hours_studied',
+    'previous_scores',
+    'extracurricular',
+    'sleep_hours',
+    'sample_papers',
+]
+
+# Model features, in the exact order saved to features.pkl
+FEATURE_NAMES = INPUT_COLUMNS + [
+    'study_sleep_interaction',
+    'study_papers_interaction',
+    'papers_score_interaction',
+    'hours_squared',
+    'sleep_squared',
+    'papers_squared',
+    'study_efficiency',
+    'sleep_quality',
+    'score_percentile',
+    'total_effort',
+]
+
+
+def rows_to_inputs(rows):
+    """
+    Convert validated prediction inputs (dicts keyed by INPUT_FIELDS)
+    to an (n, 5) integer array.
+    """
+    inputs = np.empty((len(rows), len(INPUT_FIELDS)), dtype=np.int64)
+    for i, row in enumerate(rows):
+        inputs[i] = [int(row[field]) for field in INPUT_FIELDS]
+    return inputs
+
+
+def build_features(inputs):
+    """
+    Create the advanced features used by the model.
+
+    Takes an (n, 5) array of raw inputs in INPUT_COLUMNS order and returns
+    an (n, 15) float64 matrix in FEATURE_NAMES order.
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    if inputs.ndim != 2 or inputs.shape[1] != len(INPUT_COLUMNS):
+        raise ValueError(f'Expected an (n, {len(INPUT_COLUMNS)}) input array, got shape {inputs.shape}')
+
+    hours = inputs[:, 0]
+    scores = inputs[:, 1]
+    extracurricular = inputs[:, 2]
+    sleep = inputs[:, 3]
+    papers = inputs[:, 4]
+
+    features = np.empty((inputs.shape[0], len(FEATURE_NAMES)), dtype=np.float64)
+    features[:, :5] = inputs
+
+    # Interaction features
+    np.multiply(hours, sleep, out=features[:, 5])
+    np.multiply(hours, papers, out=features[:, 6])
+    np.multiply(papers, scores, out=features[:, 7])
+
+    # Non-linear features
+    np.square(hours, out=features[:, 8])
+    np.square(sleep, out=features[:, 9])
+    np.square(papers, out=features[:, 10])
+
+    # Efficiency metric (0 when there is no sleep)
+    features[:, 11] = 0.0
+    np.divide(hours, sleep, out=features[:, 11], where=sleep > 0)
+
+    # Sleep quality indicator (optimal range is 7-9 hours)
+    np.abs(sleep - 8, out=features[:, 12])
+
+    # Normalized previous scores
+    np.divide(scores, 100.0, out=features[:, 13])
+
+    # Combined effort metric
+    features[:, 14] = (hours / 24 + papers / 10 + extracurricular) / 3
+
+    return features
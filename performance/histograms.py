@@ -0,0 +1,111 @@
+"""
+Fixed-bin histograms and the percentiles read from them.
+
+Every numeric field has a known range (the API's input limits, and 0-100
+for performance indices), so its distribution is kept as counts over fixed
+bins. Histograms are mergeable: adding or removing records just adds or
+subtracts counts, so they are maintained incrementally with the statistics
+row (see running_stats.py) and a percentile never sorts the table.
+
+Integer fields use one bin per value, so their percentiles are exact.
+Performance indices use 0.5-wide bins, and percentiles interpolate
+linearly within a bin (error below half a bin width).
+"""
+import math
+
+
+# Field: (lower edge, bin width, number of bins)
+HISTOGRAM_BINS = {
+    'hours_studied': (0, 1, 25),
+    'previous_scores': (0, 1, 101),
+    'sleep_hours': (0, 1, 25),
+    'sample_papers': (0, 1, 51),
+    'performance_index': (0, 0.5, 200),
+    'predicted_performance_index': (0, 0.5, 200),
+}
+
+# Integer fields: one bin per value, percentiles are values
+DISCRETE_FIELDS = {'hours_studied', 'previous_scores', 'sleep_hours', 'sample_papers'}
+
+DEFAULT_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+
+def empty_histogram(field):
+    return {'counts': [0] * HISTOGRAM_BINS[field][2], 'underflow': 0, 'overflow': 0}
+
+
+def bin_index(field, value):
+    """
+    Return the bin holding value, -1 below the range or None above it.
+    The top edge belongs to the last bin.
+    """
+    low, width, n_bins = HISTOGRAM_BINS[field]
+    index = math.floor((value - low) / width)
+    if index < 0:
+        return -1
+    if index >= n_bins:
+        return n_bins - 1 if value == low + n_bins * width else None
+    return index
+
+
+def add_values(histogram, field, values, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) non-null values, in place.
+    """
+    counts = histogram['counts']
+    for value in values:
+        index = bin_index(field, value)
+        if index is None:
+            histogram['overflow'] += sign
+        elif index < 0:
+            histogram['underflow'] += sign
+        else:
+            counts[index] += sign
+    return histogram
+
+
+def total(histogram):
+    return sum(histogram['counts']) + histogram['underflow'] + histogram['overflow']
+
+
+def percentile(histogram, field, q):
+    """
+    Return the q-th percentile (0-100) of the values in histogram, or None
+    if it is empty. Values outside the bin range count at the nearest edge.
+    """
+    n = total(histogram)
+    if not n:
+        return None
+    low, width, n_bins = HISTOGRAM_BINS[field]
+    discrete = field in DISCRETE_FIELDS
+    rank = q / 100 * n
+
+    seen = histogram['underflow']
+    if rank <= seen and seen:
+        return low
+    for index, count in enumerate(histogram['counts']):
+        if count and rank <= seen + count:
+            if discrete:
+                return low + index * width
+            return round(low + (index + (rank - seen) / count) * width, 4)
+        seen += count
+    return low + n_bins * width
+
+
+def describe_histogram(histogram, field, percentiles=DEFAULT_PERCENTILES):
+    """
+    Return the response form of a field's histogram with its percentiles.
+    """
+    low, width, n_bins = HISTOGRAM_BINS[field]
+    return {
+        'count': total(histogram),
+        'median': percentile(histogram, field, 50),
+        'percentiles': {f'p{q:g}': percentile(histogram, field, q) for q in percentiles},
+        'histogram': {
+            'low': low,
+            'bin_width': width,
+            'counts': list(histogram['counts']),
+            'underflow': histogram['underflow'],
+            'overflow': histogram['overflow'],
+        },
+    }
@@ -4,6 +4,7 @@ Run this once to populate the database with training data.
 """
 import pandas as pd
 from performance.models import StudentPerformance
+from performance.running_stats import bulk_create_records
 
 
 def run():
@@ -12,24 +13,30 @@ def run():
     """
     try:
         df = pd.read_csv('dataset.csv')
-        count = 0
+        records = []
+        seen = set()
         
         for _, row in df.iterrows():
-            # Check if record already exists to avoid duplicates
-            if not StudentPerformance.objects.filter(
+            key = (int(row['Hours Studied']), int(row['Previous Scores']), float(row['Performance Index']))
+            # Check if record already exists (in the database or earlier in the file) to avoid duplicates
+            if key in seen or StudentPerformance.objects.filter(
                 hours_studied=row['Hours Studied'],
                 previous_scores=row['Previous Scores'],
                 performance_index=row['Performance Index']
             ).exists():
-                StudentPerformance.objects.create(
-                    hours_studied=int(row['Hours Studied']),
-                    previous_scores=int(row['Previous Scores']),
-                    extracurricular=row['Extracurricular Activities'].lower() == 'yes',
-                    sleep_hours=int(row['Sleep Hours']),
-                    sample_papers=int(row['Sample Question Papers Practiced']),
-                    performance_index=float(row['Performance Index']),
-                )
-                count += 1
+                continue
+            seen.add(key)
+            records.append(StudentPerformance(
+                hours_studied=int(row['Hours Studied']),
+                previous_scores=int(row['Previous Scores']),
+                extracurricular=row['Extracurricular Activities'].lower() == 'yes',
+                sleep_hours=int(row['Sleep Hours']),
+                sample_papers=int(row['Sample Question Papers Practiced']),
+                performance_index=float(row['Performance Index']),
+            ))
+        
+        # One bulk insert, which also updates the statistics row
+        count = len(bulk_create_records(records))
         
         print(f"Successfully loaded {count} new records into the database.")
         
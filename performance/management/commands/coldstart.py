@@ -0,0 +1,96 @@
+"""
+Report cold-start import and model load times.
+
+Each run starts a fresh Python interpreter, so nothing is already imported
+or cached in-process, and times the steps a new worker goes through before
+it can answer its first prediction.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Modules whose import at startup would make workers slow to boot
+HEAVY_MODULES = ('numpy', 'pandas', 'sklearn', 'joblib', 'scipy')
+
+PROBE = r'''
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_ml.settings')
+django.setup()
+t1 = time.perf_counter()
+import performance.views
+t2 = time.perf_counter()
+heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+from performance.registry import get_registry
+registry = get_registry()
+registry.stop_watching()
+bundle = registry.get()
+t3 = time.perf_counter()
+first = None
+if bundle is not None:
+    bundle.predict_rows([{
+        'hours_studied': 6, 'previous_scores': 78, 'extracurricular': 1,
+        'sleep_hours': 7, 'sample_papers': 3,
+    }])
+    first = time.perf_counter() - t3
+print(json.dumps({
+    'django_setup': t1 - t0,
+    'import_views': t2 - t1,
+    'load_bundle': t3 - t2,
+    'first_prediction': first,
+    'model_version': bundle.version if bundle is not None else None,
+    'heavy_modules_at_import': heavy,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start times: Django setup, view import, bundle load and first prediction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Number of fresh interpreters to time (default 3)')
+        parser.add_argument('--json', action='store_true', help='Print the raw per-run results as JSON')
+
+    def run_probe(self):
+        code = f'HEAVY_MODULES = {HEAVY_MODULES!r}\n{PROBE}'
+        env = dict(os.environ, MODEL_WARMUP='0', DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'student_ml.settings'))
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Cold-start probe failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        runs = [self.run_probe() for _ in range(options['runs'])]
+        if options['json']:
+            self.stdout.write(json.dumps(runs, indent=2))
+            return
+
+        last = runs[-1]
+        self.stdout.write(f'Cold start over {len(runs)} fresh interpreter(s), median (min-max) in ms:')
+        for step in ('django_setup', 'import_views', 'load_bundle', 'first_prediction'):
+            values = [run[step] * 1000 for run in runs if run[step] is not None]
+            if not values:
+                self.stdout.write(f'  {step:<18} n/a')
+                continue
+            self.stdout.write(
+                f'  {step:<18} {statistics.median(values):8.2f} ({min(values):.2f}-{max(values):.2f})'
+            )
+
+        heavy = ', '.join(last['heavy_modules_at_import']) or 'none'
+        self.stdout.write(f'Heavy modules loaded by importing the views: {heavy}')
+        if last['model_version'] is None:
+            self.stdout.write(self.style.WARNING('No model bundle found; train the model to time the load.'))
+        else:
+            self.stdout.write(f'Model version: {last["model_version"]}')
@@ -0,0 +1,55 @@
+"""
+Convert a pickled model (model.pkl, scaler.pkl, features.pkl) into a model bundle.
+
+Deployments trained before model bundles existed only have the pickles that
+train() used to write. This command flattens them into a bundle under
+MODEL_BUNDLE_DIR and points CURRENT at it, without retraining.
+"""
+import hashlib
+import os
+import joblib
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from performance.features import FEATURE_NAMES
+from performance.train_model import export_bundle
+
+
+MODEL_DIR = 'performance'
+
+
+class Command(BaseCommand):
+    help = 'Convert model.pkl / scaler.pkl / features.pkl into a versioned model bundle and make it CURRENT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=os.path.join(MODEL_DIR, 'model.pkl'), help='Pickled model')
+        parser.add_argument('--scaler', default=os.path.join(MODEL_DIR, 'scaler.pkl'), help='Pickled scaler')
+        parser.add_argument('--features', default=os.path.join(MODEL_DIR, 'features.pkl'),
+                            help='Pickled feature names, checked against the serving feature order')
+        parser.add_argument('--bundle-dir', default=str(settings.MODEL_BUNDLE_DIR), help='Bundle directory')
+        parser.add_argument('--no-cube', action='store_true',
+                            help='Skip the prediction cube (smaller bundle, predictions evaluate the trees)')
+
+    def handle(self, *args, **options):
+        try:
+            model = joblib.load(options['model'])
+            scaler = joblib.load(options['scaler'])
+            features = joblib.load(options['features']) if os.path.exists(options['features']) else None
+        except FileNotFoundError as e:
+            raise CommandError(f'{e.filename} not found')
+
+        if features is not None and list(features) != list(FEATURE_NAMES):
+            raise CommandError('features.pkl does not match the serving feature order; retrain the model instead')
+        if getattr(model, 'n_features_in_', len(FEATURE_NAMES)) != len(FEATURE_NAMES):
+            raise CommandError(f'Model expects {model.n_features_in_} features, serving builds {len(FEATURE_NAMES)}')
+
+        # The training data is not known any more; record which pickle the bundle came from
+        with open(options['model'], 'rb') as f:
+            source_hash = f'model.pkl:{hashlib.sha256(f.read()).hexdigest()}'
+
+        try:
+            version = export_bundle(
+                model, scaler, source_hash, {}, bundle_dir=options['bundle_dir'], cube=not options['no_cube']
+            )
+        except (AttributeError, ValueError) as e:
+            raise CommandError(f'Cannot convert {options["model"]}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Exported bundle {version} to {options["bundle_dir"]} (now CURRENT)'))
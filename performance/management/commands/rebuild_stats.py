@@ -0,0 +1,61 @@
+"""
+Recompute the record statistics row from scratch and check it for consistency.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from performance.models import RecordStatistics, StudentPerformance
+from performance.histograms import HISTOGRAM_BINS
+from performance.running_stats import (
+    STATISTICS_PK, compute_statistics, materialized_statistics, rebuild_statistics, row_histogram, row_statistics,
+    statistics_differences,
+)
+from performance.stats import aggregate_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the incrementally maintained record statistics and check them against the records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drift between the stored and recomputed statistics; fail if any')
+
+    def handle(self, *args, **options):
+        # Read the row as stored: materialized_statistics() would refresh
+        # stale bounds, and --check must not write
+        row = RecordStatistics.objects.filter(pk=STATISTICS_PK).first()
+        fresh = compute_statistics(StudentPerformance.objects.all())
+
+        drift = statistics_differences(
+            row_statistics(RecordStatistics(**fresh)), row_statistics(row) if row is not None else None
+        )
+        if row is not None:
+            # Bounds marked stale are recomputed on the next read, so they are not drift
+            stale = {
+                f'{field}.{bound}'
+                for field, summary in row.fields.items() if summary.get('stale_bounds')
+                for bound in ('min', 'max')
+            }
+            drift = [difference for difference in drift if difference.split(':')[0] not in stale]
+            drift += [
+                f'{field}.histogram differs'
+                for field in HISTOGRAM_BINS
+                if row_histogram(row, field) != fresh['histograms'][field]
+            ]
+        for difference in drift:
+            self.stdout.write(self.style.WARNING(f'  drift  {difference}'))
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'Stored statistics differ from the records in {len(drift)} value(s)')
+            self.stdout.write(self.style.SUCCESS(f'Statistics are consistent ({fresh["total_records"]} records)'))
+            return
+
+        rebuild_statistics()
+
+        # Cross-check the rebuilt row against a database-side aggregate
+        mismatches = statistics_differences(materialized_statistics(), aggregate_statistics())
+        if mismatches:
+            raise CommandError('Rebuilt statistics disagree with aggregate(): ' + '; '.join(mismatches))
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt statistics over {fresh["total_records"]} records'
+            + (f', correcting {len(drift)} drifted value(s)' if drift else '')
+        ))
@@ -0,0 +1,33 @@
+"""
+Store model predictions on records that are new or were scored by an older model.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from performance.bundle import load_bundle
+from performance.exceptions import BundleError
+from performance.rescoring import BATCH_SIZE, rescore_records
+
+
+class Command(BaseCommand):
+    help = 'Score records that are new or were scored by another model version, in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f'Records per batch (default {BATCH_SIZE})')
+        parser.add_argument('--bundle-version', help='Bundle version to score with (default: CURRENT)')
+        parser.add_argument('--bundle-dir', default=str(settings.MODEL_BUNDLE_DIR), help='Bundle directory')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        try:
+            bundle = load_bundle(options['bundle_dir'], options['bundle_version'])
+        except BundleError as e:
+            raise CommandError(str(e))
+
+        summary = rescore_records(bundle, batch_size=options['batch_size'])
+        elapsed = summary['elapsed']
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {summary["scored"]} records with bundle {summary["model_version"]} '
+            f'in {summary["batches"]} batch(es), {elapsed:.2f} s'
+            + (f' ({summary["scored"] / elapsed:,.0f} records/s)' if summary['scored'] and elapsed > 0 else '')
+        ))
@@ -0,0 +1,194 @@
+"""
+Score a CSV extract offline with the served model bundle.
+
+The input is read in chunks; each chunk is converted, validated and scored
+by a pool of worker processes that open the bundle once each (its arrays
+are memory-mapped, so workers share them through the page cache). Results
+are written in input order to CSV or Parquet.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from performance.bundle import load_bundle
+from performance.exceptions import BundleError
+from performance.features import INPUT_COLUMNS
+from performance.streaming import FALSE_VALUES, TRUE_VALUES, score_chunk, validate_inputs
+
+
+PREDICTION_COLUMN = 'Predicted Performance Index'
+ERROR_COLUMN = 'Error'
+
+# Bundle opened by each worker process (see init_worker)
+_bundle = None
+
+
+def init_worker(root, version):
+    global _bundle
+    _bundle = load_bundle(root, version)
+
+
+def frame_to_inputs(frame):
+    """
+    Convert a chunk in the dataset.csv layout to an (n, 5) int64 array
+    and a list of per-row error messages (None for valid rows).
+    """
+    inputs = np.zeros((len(frame), len(INPUT_COLUMNS)), dtype=np.int64)
+    parse_errors = np.full(len(frame), None, dtype=object)
+
+    for position, column in enumerate(INPUT_COLUMNS):
+        values = frame[column]
+        if column == 'Extracurricular Activities':
+            text = values.astype(str).str.strip().str.lower()
+            numbers = pd.Series(np.nan, index=values.index)
+            numbers[text.isin(TRUE_VALUES)] = 1
+            numbers[text.isin(FALSE_VALUES)] = 0
+        else:
+            numbers = pd.to_numeric(values, errors='coerce')
+
+        numbers = numbers.to_numpy(dtype=np.float64)
+        bad = ~np.isfinite(numbers) | (numbers != np.round(numbers))
+        message = f'{column} must be Yes/No' if column == 'Extracurricular Activities' else f'{column} must be an integer'
+        for i in np.flatnonzero(bad):
+            parse_errors[i] = parse_errors[i] or message
+        inputs[~bad, position] = numbers[~bad]
+
+    errors = [parse_error or range_error for parse_error, range_error in zip(parse_errors, validate_inputs(inputs))]
+    return inputs, errors
+
+
+def score_frame(frame):
+    """
+    Worker task: return (predictions, errors) for one input chunk.
+    """
+    inputs, errors = frame_to_inputs(frame)
+    return score_chunk(_bundle, inputs, errors), errors
+
+
+class Command(BaseCommand):
+    help = 'Score a CSV in the dataset.csv layout with the model bundle and write predictions to CSV or Parquet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='CSV file with the dataset.csv input columns')
+        parser.add_argument('output', help='Output file (.csv or .parquet)')
+        parser.add_argument('--chunk-size', type=int, default=100000, help='Rows per chunk (default 100000)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes (default: CPU count; 0 scores in this process)')
+        parser.add_argument('--bundle-version', help='Bundle version to use (default: CURRENT)')
+        parser.add_argument('--bundle-dir', default=str(settings.MODEL_BUNDLE_DIR), help='Bundle directory')
+
+    def handle(self, *args, **options):
+        root, version = options['bundle_dir'], options['bundle_version']
+        try:
+            version = load_bundle(root, version).version
+        except BundleError as e:
+            raise CommandError(str(e))
+
+        output = options['output']
+        output_format = 'parquet' if output.endswith('.parquet') else 'csv'
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        try:
+            chunks = pd.read_csv(options['input'], chunksize=options['chunk_size'], dtype=str, keep_default_na=False)
+        except FileNotFoundError:
+            raise CommandError(f'{options["input"]} not found')
+
+        started = time.perf_counter()
+        writer = ChunkWriter(output, output_format)
+        rows = failed = n_chunks = 0
+
+        try:
+            for frame, (predictions, errors) in self.score_chunks(chunks, root, version, options['workers']):
+                frame[PREDICTION_COLUMN] = np.round(predictions, 2)
+                frame[ERROR_COLUMN] = errors
+                writer.write(frame)
+
+                rows += len(frame)
+                failed += sum(error is not None for error in errors)
+                n_chunks += 1
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Scored {rows} rows with bundle {version} -> {output}'))
+        self.stdout.write(f'  chunks:      {n_chunks} x {options["chunk_size"]} rows, {options["workers"]} worker(s)')
+        self.stdout.write(f'  succeeded:   {rows - failed}')
+        self.stdout.write(f'  failed:      {failed}')
+        self.stdout.write(f'  elapsed:     {elapsed:.2f} s')
+        self.stdout.write(f'  throughput:  {rows / elapsed if elapsed > 0 else 0:,.0f} rows/s')
+
+    def score_chunks(self, chunks, root, version, workers):
+        """
+        Yield (frame, (predictions, errors)) in input order. At most
+        2 * workers chunks are in flight, which bounds memory use.
+        """
+        if workers <= 0:
+            init_worker(root, version)
+            for frame in chunks:
+                check_columns(frame)
+                yield frame, score_frame(frame)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(root, version)) as pool:
+            pending = deque()
+            for frame in chunks:
+                check_columns(frame)
+                pending.append((frame, pool.submit(score_frame, frame)))
+                if len(pending) >= 2 * workers:
+                    frame, future = pending.popleft()
+                    yield frame, future.result()
+            while pending:
+                frame, future = pending.popleft()
+                yield frame, future.result()
+
+
+def check_columns(frame):
+    missing = [column for column in INPUT_COLUMNS if column not in frame.columns]
+    if missing:
+        raise CommandError(f'Input is missing columns: {", ".join(missing)}')
+
+
+class ChunkWriter:
+    """
+    Appends scored chunks to a CSV or Parquet file.
+    """
+
+    def __init__(self, path, output_format):
+        self.path = path
+        self.output_format = output_format
+        self._parquet = None
+        self._wrote_header = False
+
+        if output_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError('Writing Parquet requires pyarrow (pip install pyarrow)')
+
+    def write(self, frame):
+        if self.output_format == 'csv':
+            frame.to_csv(self.path, mode='a' if self._wrote_header else 'w', header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet is None:
+            # Explicit types: inferred from a first chunk without errors, the
+            # error column would be null and later chunks would not fit
+            schema = pa.schema(
+                [(column, pa.string()) for column in frame.columns if column not in (PREDICTION_COLUMN, ERROR_COLUMN)]
+                + [(PREDICTION_COLUMN, pa.float64()), (ERROR_COLUMN, pa.string())]
+            )
+            self._parquet = pq.ParquetWriter(self.path, schema)
+        self._parquet.write_table(pa.Table.from_pandas(frame, schema=self._parquet.schema, preserve_index=False))
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentperformance',
+            name='predicted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentperformance',
+            name='predicted_performance_index',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentperformance',
+            name='prediction_model_version',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
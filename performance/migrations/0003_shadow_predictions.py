@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0002_stored_predictions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShadowPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hours_studied', models.IntegerField()),
+                ('previous_scores', models.IntegerField()),
+                ('extracurricular', models.BooleanField()),
+                ('sleep_hours', models.IntegerField()),
+                ('sample_papers', models.IntegerField()),
+                ('primary_version', models.CharField(max_length=64)),
+                ('primary_prediction', models.FloatField()),
+                ('shadow_version', models.CharField(db_index=True, max_length=64)),
+                ('shadow_prediction', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
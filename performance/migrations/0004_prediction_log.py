@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0003_shadow_predictions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hours_studied', models.IntegerField()),
+                ('previous_scores', models.IntegerField()),
+                ('extracurricular', models.BooleanField()),
+                ('sleep_hours', models.IntegerField()),
+                ('sample_papers', models.IntegerField()),
+                ('predicted_performance_index', models.FloatField()),
+                ('model_version', models.CharField(db_index=True, max_length=64)),
+                ('profile', models.CharField(default='full', max_length=16)),
+                ('source', models.CharField(default='sync', max_length=8)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0004_prediction_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentperformance',
+            index=models.Index(fields=['-created_at', 'id'], name='perf_created_id_idx'),
+        ),
+    ]
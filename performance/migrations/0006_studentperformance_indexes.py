@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0005_records_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentperformance',
+            index=models.Index(fields=['hours_studied', 'previous_scores', 'performance_index'], name='perf_dedup_idx'),
+        ),
+    ]
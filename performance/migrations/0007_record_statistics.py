@@ -0,0 +1,104 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:40
+
+import math
+from django.db import migrations, models
+
+
+# Frozen copy of running_stats as of this migration, so later changes to
+# that module do not change what the migration computes
+STATISTICS_PK = 1
+NUMERIC_FIELDS = [
+    'hours_studied', 'previous_scores', 'sleep_hours', 'sample_papers',
+    'performance_index', 'predicted_performance_index',
+]
+CHUNK_SIZE = 10000
+
+
+def summarize(values):
+    summary = {'count': 0, 'total': 0.0, 'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None, 'stale_bounds': False}
+    if not values:
+        return summary
+    mean = math.fsum(values) / len(values)
+    summary.update({
+        'count': len(values),
+        'total': math.fsum(values),
+        'mean': mean,
+        'm2': math.fsum((value - mean) ** 2 for value in values),
+        'min': min(values),
+        'max': max(values),
+    })
+    return summary
+
+
+def merge(summary, part):
+    if not part['count']:
+        return summary
+    if not summary['count']:
+        return part
+    count = summary['count'] + part['count']
+    delta = part['mean'] - summary['mean']
+    return {
+        'count': count,
+        'total': summary['total'] + part['total'],
+        'mean': summary['mean'] + delta * part['count'] / count,
+        'm2': summary['m2'] + part['m2'] + delta ** 2 * summary['count'] * part['count'] / count,
+        'min': min(summary['min'], part['min']),
+        'max': max(summary['max'], part['max']),
+        'stale_bounds': False,
+    }
+
+
+def build_statistics(apps, schema_editor):
+    """
+    Compute the statistics row for the records already stored.
+    """
+    StudentPerformance = apps.get_model('performance', 'StudentPerformance')
+    RecordStatistics = apps.get_model('performance', 'RecordStatistics')
+
+    summaries = {field: summarize([]) for field in NUMERIC_FIELDS}
+    total_records = extracurricular_count = 0
+    last_id = 0
+    while True:
+        rows = list(
+            StudentPerformance.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'extracurricular', *NUMERIC_FIELDS)[:CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        total_records += len(rows)
+        extracurricular_count += sum(1 for row in rows if row[1])
+        for position, field in enumerate(NUMERIC_FIELDS, start=2):
+            values = [row[position] for row in rows if row[position] is not None]
+            summaries[field] = merge(summaries[field], summarize(values))
+        last_id = rows[-1][0]
+
+    RecordStatistics.objects.create(
+        pk=STATISTICS_PK,
+        total_records=total_records,
+        extracurricular_count=extracurricular_count,
+        fields=summaries,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0006_studentperformance_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_records', models.BigIntegerField(default=0)),
+                ('extracurricular_count', models.BigIntegerField(default=0)),
+                ('fields', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Record Statistics',
+            },
+        ),
+        migrations.RunPython(build_statistics, migrations.RunPython.noop),
+    ]
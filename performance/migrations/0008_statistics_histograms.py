@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:25
+
+import math
+from django.db import migrations, models
+
+
+# Frozen copy of histograms.py as of this migration, so later changes to
+# the bins do not change what the migration computes
+STATISTICS_PK = 1
+HISTOGRAM_BINS = {
+    'hours_studied': (0, 1, 25),
+    'previous_scores': (0, 1, 101),
+    'sleep_hours': (0, 1, 25),
+    'sample_papers': (0, 1, 51),
+    'performance_index': (0, 0.5, 200),
+    'predicted_performance_index': (0, 0.5, 200),
+}
+CHUNK_SIZE = 10000
+
+
+def add_value(histogram, field, value):
+    low, width, n_bins = HISTOGRAM_BINS[field]
+    index = math.floor((value - low) / width)
+    if index < 0:
+        histogram['underflow'] += 1
+    elif index < n_bins or value == low + n_bins * width:
+        histogram['counts'][min(index, n_bins - 1)] += 1
+    else:
+        histogram['overflow'] += 1
+
+
+def build_histograms(apps, schema_editor):
+    """
+    Fill in the histograms for the records already stored.
+    """
+    StudentPerformance = apps.get_model('performance', 'StudentPerformance')
+    RecordStatistics = apps.get_model('performance', 'RecordStatistics')
+
+    fields = list(HISTOGRAM_BINS)
+    histograms = {
+        field: {'counts': [0] * n_bins, 'underflow': 0, 'overflow': 0}
+        for field, (low, width, n_bins) in HISTOGRAM_BINS.items()
+    }
+    last_id = 0
+    while True:
+        rows = list(
+            StudentPerformance.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', *fields)[:CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        for row in rows:
+            for field, value in zip(fields, row[1:]):
+                if value is not None:
+                    add_value(histograms[field], field, value)
+        last_id = rows[-1][0]
+
+    RecordStatistics.objects.filter(pk=STATISTICS_PK).update(histograms=histograms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0007_record_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordstatistics',
+            name='histograms',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(build_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0008_statistics_histograms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordstatistics',
+            name='generation',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='studentperformance',
+            index=models.Index(
+                fields=['extracurricular', 'sleep_hours', 'hours_studied', 'previous_scores', 'sample_papers',
+                        'performance_index', 'predicted_performance_index'],
+                name='perf_group_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('performance', '0009_studentperformance_group_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordstatistics',
+            name='history_generation',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
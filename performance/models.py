@@ -12,12 +12,102 @@ class StudentPerformance(models.Model):
     sleep_hours = models.IntegerField()
     sample_papers = models.IntegerField()
     performance_index = models.FloatField()
+    # Model prediction for this record, written by the rescoring job
+    # (performance/rescoring.py); empty until the record is first scored
+    predicted_performance_index = models.FloatField(null=True, blank=True)
+    prediction_model_version = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    predicted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Student Performance"
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of /api/records/ (performance/pagination.py)
+            models.Index(fields=['-created_at', 'id'], name='perf_created_id_idx'),
+            # Duplicate check in load_data.run()
+            models.Index(fields=['hours_studied', 'previous_scores', 'performance_index'], name='perf_dedup_idx'),
+            # Covers grouped statistics (stats.grouped_statistics), so they scan
+            # this index instead of the table, in order when grouped by extracurricular
+            models.Index(
+                fields=['extracurricular', 'sleep_hours', 'hours_studied', 'previous_scores', 'sample_papers',
+                        'performance_index', 'predicted_performance_index'],
+                name='perf_group_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Performance Index: {self.performance_index}"
+
+
+class ShadowPrediction(models.Model):
+    """
+    A live /api/predict/ request scored by both the served model and a
+    shadow (challenger) model, for comparing them before promotion.
+    """
+    hours_studied = models.IntegerField()
+    previous_scores = models.IntegerField()
+    extracurricular = models.BooleanField()
+    sleep_hours = models.IntegerField()
+    sample_papers = models.IntegerField()
+    primary_version = models.CharField(max_length=64)
+    primary_prediction = models.FloatField()
+    shadow_version = models.CharField(max_length=64, db_index=True)
+    shadow_prediction = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.primary_version}: {self.primary_prediction} / {self.shadow_version}: {self.shadow_prediction}"
+
+
+class PredictionLog(models.Model):
+    """
+    A prediction served by /api/predict/: the inputs it was asked for and
+    what it returned. Written in batches by performance/prediction_log.py.
+    """
+    hours_studied = models.IntegerField()
+    previous_scores = models.IntegerField()
+    extracurricular = models.BooleanField()
+    sleep_hours = models.IntegerField()
+    sample_papers = models.IntegerField()
+    predicted_performance_index = models.FloatField()
+    model_version = models.CharField(max_length=64, db_index=True)
+    profile = models.CharField(max_length=16, default='full')
+    # 'sync' or 'async' endpoint
+    source = models.CharField(max_length=8, default='sync')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.model_version}: {self.predicted_performance_index}"
+
+
+class RecordStatistics(models.Model):
+    """
+    Running statistics over all StudentPerformance records (a single row),
+    updated as records are written. See performance/running_stats.py.
+    """
+    total_records = models.BigIntegerField(default=0)
+    extracurricular_count = models.BigIntegerField(default=0)
+    # Per numeric field: count, total, Welford mean and m2, min, max
+    fields = models.JSONField(default=dict)
+    # Per field: fixed-bin counts for percentiles (see performance/histograms.py)
+    histograms = models.JSONField(default=dict)
+    # Incremented on every change, so results cached against it expire on writes
+    generation = models.BigIntegerField(default=0)
+    # Incremented only when existing records are changed or deleted, i.e. when
+    # closed time buckets of /api/statistics/trends/ may change
+    history_generation = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Record Statistics"
+
+    def __str__(self):
+        return f"Statistics over {self.total_records} records"
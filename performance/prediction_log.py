@@ -0,0 +1,96 @@
+"""
+Buffered logging of served predictions.
+
+/api/predict/ hands each request's inputs and prediction to a bounded
+in-memory buffer and returns. A background thread writes the buffer to the
+PredictionLog table with bulk_create whenever it holds batch_size rows or
+flush_interval seconds have passed, so logging never adds a database write
+to the request path.
+"""
+import atexit
+import threading
+from django.conf import settings
+from .background import BackgroundWriter
+
+
+class PredictionLogWriter(BackgroundWriter):
+    """
+    Writes queued prediction log rows in batches off the request path.
+    """
+
+    thread_name = 'prediction-log-writer'
+    failure_message = 'Writing %d prediction log rows failed: %s'
+
+    def __init__(self, queue_size=10000, batch_size=500, flush_interval=1.0):
+        super().__init__(queue_size, batch_size, flush_interval)
+        self.written = 0
+        self.flushes = 0
+
+    def submit(self, row, model_version, profile, prediction, source='sync'):
+        """
+        Queue a validated prediction input and the prediction served for it.
+        Returns False if the buffer was full and the row was dropped.
+        """
+        return super().submit((row, model_version, profile, prediction, source))
+
+    def _record(self, batch):
+        from .models import PredictionLog
+
+        PredictionLog.objects.bulk_create([
+            PredictionLog(
+                **row,
+                predicted_performance_index=prediction,
+                model_version=model_version,
+                profile=profile,
+                source=source,
+            )
+            for row, model_version, profile, prediction, source in batch
+        ])
+        with self._lock:
+            self.written += len(batch)
+            self.flushes += 1
+
+    def status(self):
+        status = super().status()
+        with self._lock:
+            status.update({'written': self.written, 'flushes': self.flushes})
+        return status
+
+
+_writer = None
+_writer_lock = threading.Lock()
+_configured = False
+
+
+def get_prediction_log():
+    """
+    Return the process-wide prediction log writer, or None if logging is off.
+    The first call starts it when settings.PREDICTION_LOG_ENABLED is set.
+    """
+    global _writer, _configured
+    if not _configured:
+        with _writer_lock:
+            if not _configured:
+                if settings.PREDICTION_LOG_ENABLED:
+                    _writer = PredictionLogWriter(
+                        queue_size=settings.PREDICTION_LOG_QUEUE_SIZE,
+                        batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+                        flush_interval=settings.PREDICTION_LOG_FLUSH_INTERVAL,
+                    )
+                    _writer.start()
+                    # Write what is still buffered when the worker exits
+                    atexit.register(_writer.stop)
+                _configured = True
+    return _writer
+
+
+def replace_prediction_log(writer):
+    """
+    Replace the process-wide prediction log writer (used by tests and
+    tooling). Returns the previous one.
+    """
+    global _writer, _configured
+    with _writer_lock:
+        _configured = True
+        previous, _writer = _writer, writer
+    return previous
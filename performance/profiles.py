@@ -0,0 +1,55 @@
+"""
+Accuracy-vs-latency serving profiles.
+
+Boosted ensembles reach most of their accuracy well before the last tree.
+Training records the held-out error after every stage, and each profile
+serves the smallest prefix of trees whose error is within its tolerance
+of the full model's.
+"""
+import numpy as np
+
+
+# Allowed relative increase in held-out MAE over the full model, by profile
+PROFILE_TOLERANCES = {
+    'fast': 0.05,
+    'balanced': 0.01,
+    'full': 0.0,
+}
+
+
+def staged_errors(model, X, y):
+    """
+    Return the held-out MAE and RMSE after each boosting stage of a fitted
+    GradientBoostingRegressor, as lists indexed by n_trees - 1.
+    """
+    mae = []
+    rmse = []
+    for predictions in model.staged_predict(X):
+        errors = predictions - y
+        mae.append(float(np.abs(errors).mean()))
+        rmse.append(float(np.sqrt((errors ** 2).mean())))
+    return {'test_mae': mae, 'test_rmse': rmse}
+
+
+def choose_profiles(staged_mae, tolerances=PROFILE_TOLERANCES):
+    """
+    Pick the number of trees for each profile from per-stage held-out MAE.
+
+    Each profile gets the smallest n_trees whose MAE is within its
+    tolerance of the full model's, with the MAE it costs over the full model.
+    """
+    staged_mae = np.asarray(staged_mae)
+    full_mae = staged_mae[-1]
+    profiles = {}
+    for name, tolerance in tolerances.items():
+        if tolerance <= 0:
+            n_trees = len(staged_mae)
+        else:
+            n_trees = int(np.argmax(staged_mae <= full_mae * (1 + tolerance))) + 1
+        mae = float(staged_mae[n_trees - 1])
+        profiles[name] = {
+            'n_trees': n_trees,
+            'test_mae': round(mae, 4),
+            'mae_increase': round(mae - float(full_mae), 4),
+        }
+    return profiles
@@ -0,0 +1,220 @@
+"""
+Model registry with zero-downtime hot reload.
+
+The registry holds a reference to the model bundle currently being served.
+A new version is loaded and smoke-tested off the request path, then swapped
+in with a single reference assignment. Requests that already picked up the
+old bundle finish on it; new requests see the new one.
+"""
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from .exceptions import BundleError
+
+
+logger = logging.getLogger(__name__)
+
+# Inputs scored by the smoke test before a bundle is swapped in
+SMOKE_INPUTS = [
+    [6, 78, 1, 7, 3],
+    [0, 40, 0, 0, 0],
+    [16, 95, 1, 8, 10],
+    [0, 70, 0, 24, 2],
+]
+
+
+class ModelRegistry:
+    """
+    Holds the served ModelBundle and swaps in new versions atomically.
+    """
+
+    def __init__(self, root, retry_interval=5.0):
+        self.root = root
+        self.retry_interval = retry_interval
+        self._bundle = None
+        self._reload_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._watcher = None
+        self._stop = threading.Event()
+        self.loaded_at = None
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error = None
+
+    def get(self):
+        """
+        Return the bundle to serve, loading the current one on first use.
+        Returns None if no valid bundle is available; after a failed load,
+        requests do not retry it for retry_interval seconds.
+        """
+        bundle = self._bundle
+        if bundle is None:
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                bundle = self.reload()
+            except BundleError:
+                self._retry_at = time.monotonic() + self.retry_interval
+                return None
+        return bundle
+
+    @property
+    def version(self):
+        bundle = self._bundle
+        return bundle.version if bundle is not None else None
+
+    @staticmethod
+    def smoke_test(bundle):
+        """
+        Raise BundleError unless the bundle gives sane predictions and its
+        prediction cube agrees with its model.
+        """
+        import numpy as np
+        from .cube import verify_cube
+        from .features import build_features
+
+        predictions = bundle.predict_features(build_features(SMOKE_INPUTS))
+        if predictions.shape != (len(SMOKE_INPUTS),) or not np.isfinite(predictions).all():
+            raise BundleError(f'Bundle {bundle.version} failed the smoke prediction')
+        if bundle.cube is not None and not verify_cube(bundle.cube, bundle.predict_features):
+            raise BundleError(f'Bundle {bundle.version} has a prediction cube that does not match its model')
+
+    def reload(self, version=None):
+        """
+        Load a bundle (the CURRENT one by default), smoke-test it and swap
+        it in. Returns the served bundle. On failure the old bundle stays
+        in place and BundleError is raised.
+        """
+        with self._reload_lock:
+            version = version or current_version(self.root)
+            old = self._bundle
+            if old is not None and old.version == version:
+                return old
+            new = self._load(version)
+            self._swap(new)
+        return new
+
+    def promote(self, version):
+        """
+        Load and smoke-test version, point CURRENT at it and serve it.
+        Other processes pick the change up through their watchers.
+        """
+        from .bundle import set_current_version
+
+        # CURRENT is written before the swap and both happen under the
+        # reload lock, so the watcher cannot read the old CURRENT in
+        # between and revert the promotion
+        with self._reload_lock:
+            new = self._load(version)
+            set_current_version(self.root, version)
+            self._swap(new)
+        return new
+
+    def _load(self, version):
+        """
+        Load and smoke-test a bundle. Call with the reload lock held.
+        """
+        # numpy and the bundle code are imported on first load, not when
+        # the registry (and views) are imported
+        from .bundle import load_bundle
+
+        try:
+            new = load_bundle(self.root, version)
+            self.smoke_test(new)
+        except BundleError as e:
+            self.failed_reloads += 1
+            self.last_error = str(e)
+            raise
+        return new
+
+    def _swap(self, new):
+        """
+        Serve new from now on. Call with the reload lock held.
+        """
+        old = self._bundle
+        if old is not None and old.version == new.version:
+            return
+        self._bundle = new
+        self.loaded_at = time.time()
+        self.last_error = None
+        if old is not None:
+            self.reloads += 1
+            logger.info('Swapped model bundle %s -> %s', old.version, new.version)
+
+    def start_watching(self, interval):
+        """
+        Poll CURRENT every interval seconds in a daemon thread and reload
+        when it names a different version.
+        """
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            version = current_version(self.root)
+            if version is None or version == self.version:
+                continue
+            try:
+                # reload() reads CURRENT again under the lock, so a promotion
+                # that finished since the check above is not reverted
+                self.reload()
+            except BundleError as e:
+                logger.error('Could not reload model bundle %s: %s', version, e)
+
+    def status(self):
+        return {
+            'model_version': self.version,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None and not self._stop.is_set(),
+        }
+
+
+def current_version(root):
+    """
+    Return the bundle version named by root/CURRENT, or None.
+    Kept here (rather than imported from bundle) so polling stays import-light.
+    """
+    try:
+        with open(os.path.join(root, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Return the process-wide registry, creating it (and its watcher) on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ModelRegistry(settings.MODEL_BUNDLE_DIR, settings.MODEL_LOAD_RETRY_INTERVAL)
+                registry.start_watching(settings.MODEL_RELOAD_INTERVAL)
+                _registry = registry
+    return _registry
+
+
+def set_registry(registry):
+    """
+    Replace the process-wide registry (used by tests and tooling).
+    Returns the previous one.
+    """
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, registry
+    return previous
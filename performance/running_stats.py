@@ -0,0 +1,430 @@
+"""
+Incrementally maintained statistics over StudentPerformance records.
+
+A single RecordStatistics row holds, for every numeric field, the count,
+sum, Welford mean and sum of squared deviations (m2), min and max of the
+stored values, and a fixed-bin histogram (see histograms.py) from which
+percentiles are read. Record writes update it in the same transaction:
+
+- save() and delete() through signal handlers (connect_signals()),
+- bulk inserts through bulk_create_records(),
+- rescoring through apply_changes() on predicted_performance_index.
+
+Reading the statistics is then a single primary-key read however many
+records there are. Batches of values are merged with the parallel form of
+Welford's algorithm (Chan et al.), and removals subtract a batch the same
+way. A removal cannot restore a min or max it deletes; such bounds are
+marked stale and recomputed with one aggregate query on the next read.
+
+QuerySet.update() and raw SQL bypass all of this; run
+`python manage.py rebuild_stats` after using them.
+"""
+import math
+import threading
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save, pre_save
+from .models import RecordStatistics, StudentPerformance
+from .histograms import HISTOGRAM_BINS, add_values, describe_histogram, empty_histogram, percentile
+from .stats import NUMERIC_FIELDS, round_or_none
+
+
+STATISTICS_PK = 1
+
+# Records read per query by compute_statistics()
+CHUNK_SIZE = 10000
+
+
+def empty_summary():
+    return {'count': 0, 'total': 0.0, 'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None, 'stale_bounds': False}
+
+
+def summarize(values):
+    """
+    Return the summary of a list of (non-null) values.
+    """
+    summary = empty_summary()
+    if not values:
+        return summary
+    mean = math.fsum(values) / len(values)
+    summary.update({
+        'count': len(values),
+        'total': math.fsum(values),
+        'mean': mean,
+        'm2': math.fsum((value - mean) ** 2 for value in values),
+        'min': min(values),
+        'max': max(values),
+    })
+    return summary
+
+
+def merge(summary, part):
+    """
+    Return the summary of the union of two disjoint sets of values.
+    """
+    if not part['count']:
+        return dict(summary)
+    if not summary['count']:
+        return dict(part)
+    count = summary['count'] + part['count']
+    delta = part['mean'] - summary['mean']
+    return {
+        'count': count,
+        'total': summary['total'] + part['total'],
+        'mean': summary['mean'] + delta * part['count'] / count,
+        'm2': summary['m2'] + part['m2'] + delta ** 2 * summary['count'] * part['count'] / count,
+        'min': min(summary['min'], part['min']),
+        'max': max(summary['max'], part['max']),
+        'stale_bounds': summary['stale_bounds'] or part['stale_bounds'],
+    }
+
+
+def subtract(summary, part):
+    """
+    Return the summary of summary's values without part's (a subset of them).
+    """
+    if not part['count']:
+        return dict(summary)
+    count = summary['count'] - part['count']
+    if count <= 0:
+        return empty_summary()
+    mean = (summary['count'] * summary['mean'] - part['count'] * part['mean']) / count
+    delta = part['mean'] - mean
+    m2 = summary['m2'] - part['m2'] - delta ** 2 * count * part['count'] / summary['count']
+    return {
+        'count': count,
+        'total': summary['total'] - part['total'],
+        'mean': mean,
+        'm2': max(m2, 0.0),
+        'min': summary['min'],
+        'max': summary['max'],
+        # The removed values may have been the min or max
+        'stale_bounds': summary['stale_bounds'] or part['min'] <= summary['min'] or part['max'] >= summary['max'],
+    }
+
+
+def record_values(record):
+    """
+    Return the values of a record that the statistics cover.
+    """
+    return {field: getattr(record, field) for field in ['extracurricular', *NUMERIC_FIELDS]}
+
+
+def compute_statistics(queryset):
+    """
+    Compute the statistics row fields from scratch, reading the records of
+    queryset in primary-key chunks. Returns a dict of RecordStatistics fields.
+    """
+    summaries = {field: empty_summary() for field in NUMERIC_FIELDS}
+    histograms = {field: empty_histogram(field) for field in HISTOGRAM_BINS}
+    total_records = extracurricular_count = 0
+    last_id = 0
+
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'extracurricular', *NUMERIC_FIELDS)[:CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        total_records += len(rows)
+        extracurricular_count += sum(1 for row in rows if row[1])
+        for position, field in enumerate(NUMERIC_FIELDS, start=2):
+            values = [row[position] for row in rows if row[position] is not None]
+            summaries[field] = merge(summaries[field], summarize(values))
+            if field in histograms:
+                add_values(histograms[field], field, values)
+        last_id = rows[-1][0]
+
+    return {
+        'total_records': total_records,
+        'extracurricular_count': extracurricular_count,
+        'fields': summaries,
+        'histograms': histograms,
+    }
+
+
+def rebuild_statistics():
+    """
+    Recompute the statistics row from every record and save it.
+    """
+    with transaction.atomic():
+        values = compute_statistics(StudentPerformance.objects.all())
+        generation, history_generation = statistics_generations() or (0, 0)
+        row, _ = RecordStatistics.objects.update_or_create(
+            pk=STATISTICS_PK,
+            defaults={**values, 'generation': generation + 1, 'history_generation': history_generation + 1},
+        )
+    return row
+
+
+def statistics_generations():
+    """
+    Return the statistics row's (generation, history_generation), or None
+    before the row exists. One primary-key read.
+    """
+    return (
+        RecordStatistics.objects.filter(pk=STATISTICS_PK)
+        .values_list('generation', 'history_generation').first()
+    )
+
+
+def statistics_generation():
+    """
+    Return the statistics row's generation, which changes on every write to
+    the records (None before the row exists).
+    """
+    generations = statistics_generations()
+    return generations and generations[0]
+
+
+def history_generation():
+    """
+    Return the statistics row's history_generation, which changes only when
+    existing records are changed or deleted (None before the row exists).
+    """
+    generations = statistics_generations()
+    return generations and generations[1]
+
+
+def apply_changes(added=(), removed=(), count_records=True):
+    """
+    Update the statistics row for records added and removed, given as dicts
+    of record_values(). Null values are skipped. With count_records=False
+    only the field values change, e.g. when predictions are rewritten.
+    """
+    added, removed = list(added), list(removed)
+    if not added and not removed:
+        return
+
+    with transaction.atomic():
+        try:
+            row = RecordStatistics.objects.select_for_update().get(pk=STATISTICS_PK)
+        except RecordStatistics.DoesNotExist:
+            # Rebuilt from the table, which already includes this change
+            rebuild_statistics()
+            return
+
+        fields = dict(row.fields)
+        histograms = dict(row.histograms)
+        for field in NUMERIC_FIELDS:
+            added_values = [values[field] for values in added if values.get(field) is not None]
+            removed_values = [values[field] for values in removed if values.get(field) is not None]
+            summary = fields.get(field, empty_summary())
+            summary = merge(summary, summarize(added_values))
+            fields[field] = subtract(summary, summarize(removed_values))
+            if field in HISTOGRAM_BINS:
+                histogram = histograms.get(field) or empty_histogram(field)
+                add_values(histogram, field, added_values)
+                histograms[field] = add_values(histogram, field, removed_values, sign=-1)
+        row.fields = fields
+        row.histograms = histograms
+
+        if count_records:
+            row.total_records += len(added) - len(removed)
+            row.extracurricular_count += (
+                sum(1 for values in added if values['extracurricular'])
+                - sum(1 for values in removed if values['extracurricular'])
+            )
+        row.generation += 1
+        if count_records and removed:
+            row.history_generation += 1
+        row.save()
+
+
+def refresh_bounds(fields):
+    """
+    Recompute the min and max of the given fields with one aggregate query.
+    """
+    aggregates = {}
+    for field in fields:
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+
+    with transaction.atomic():
+        bounds = StudentPerformance.objects.order_by().aggregate(**aggregates)
+        row = RecordStatistics.objects.select_for_update().get(pk=STATISTICS_PK)
+        for field in fields:
+            row.fields[field].update({
+                'min': bounds[f'{field}__min'],
+                'max': bounds[f'{field}__max'],
+                'stale_bounds': False,
+            })
+        row.save()
+    return row
+
+
+def materialized_statistics():
+    """
+    Return the statistics in the aggregate_statistics() layout, plus the
+    standard deviation of each field, from the statistics row.
+    Returns None if there are no records.
+    """
+    row = RecordStatistics.objects.filter(pk=STATISTICS_PK).first()
+    if row is None:
+        row = rebuild_statistics()
+
+    stale = [field for field, summary in row.fields.items() if summary.get('stale_bounds')]
+    if stale:
+        row = refresh_bounds(stale)
+
+    return row_statistics(row)
+
+
+def row_statistics(row):
+    """
+    Return the response form of a statistics row, or None if it covers no records.
+    """
+    if not row.total_records:
+        return None
+
+    return {
+        'total_records': row.total_records,
+        'extracurricular_rate': round(row.extracurricular_count / row.total_records, 4),
+        'median_performance': percentile(row_histogram(row, 'performance_index'), 'performance_index', 50),
+        'fields': {
+            field: describe(row.fields.get(field, empty_summary()))
+            for field in NUMERIC_FIELDS
+        },
+    }
+
+
+def row_histogram(row, field):
+    return row.histograms.get(field) or empty_histogram(field)
+
+
+def distribution_statistics(fields, percentiles):
+    """
+    Return the histogram and percentiles of each field from the statistics
+    row, or None if there are no records.
+    """
+    row = RecordStatistics.objects.filter(pk=STATISTICS_PK).first()
+    if row is None:
+        row = rebuild_statistics()
+    if not row.total_records:
+        return None
+
+    return {
+        'total_records': row.total_records,
+        'fields': {
+            field: describe_histogram(row_histogram(row, field), field, percentiles)
+            for field in fields
+        },
+    }
+
+
+def describe(summary):
+    """
+    Turn a stored field summary into its response form.
+    """
+    count = summary['count']
+    return {
+        'count': count,
+        'average': round(summary['mean'], 2) if count else None,
+        'min': round_or_none(summary['min']),
+        'max': round_or_none(summary['max']),
+        'std': round(math.sqrt(summary['m2'] / count), 2) if count else None,
+    }
+
+
+def statistics_differences(expected, actual, tolerance=0.011):
+    """
+    Compare two sets of statistics in the materialized_statistics() layout
+    and return a list of differences (empty when they agree). Values are
+    rounded for display, hence the tolerance. Keys missing from actual,
+    e.g. std in aggregate_statistics(), are not compared.
+    """
+    if expected is None or actual is None:
+        if expected is actual:
+            return []
+        return [f'total_records: {expected and expected["total_records"]} != {actual and actual["total_records"]}']
+
+    pairs = [(key, expected[key], actual[key]) for key in ('total_records', 'extracurricular_rate')]
+    for field in NUMERIC_FIELDS:
+        for name, value in actual['fields'][field].items():
+            pairs.append((f'{field}.{name}', expected['fields'][field].get(name), value))
+
+    differences = []
+    for name, wanted, value in pairs:
+        if wanted is None or value is None:
+            same = wanted is value
+        else:
+            same = math.isclose(wanted, value, abs_tol=tolerance)
+        if not same:
+            differences.append(f'{name}: {wanted} != {value}')
+    return differences
+
+
+def bulk_create_records(records, batch_size=1000):
+    """
+    bulk_create StudentPerformance records and add them to the statistics
+    in the same transaction. Returns the created records.
+    """
+    with transaction.atomic():
+        records = StudentPerformance.objects.bulk_create(records, batch_size=batch_size)
+        apply_changes(added=[record_values(record) for record in records])
+    return records
+
+
+_pending = threading.local()
+
+
+@contextmanager
+def batched_changes():
+    """
+    Collect the statistics changes made by saves and deletes in this block
+    and apply them in one update at the end, in the same transaction, e.g.
+    around QuerySet.delete() on many records.
+    """
+    with transaction.atomic():
+        _pending.changes = ([], [])
+        try:
+            yield
+            added, removed = _pending.changes
+        finally:
+            _pending.changes = None
+        apply_changes(added=added, removed=removed)
+
+
+def record_change(added=(), removed=()):
+    changes = getattr(_pending, 'changes', None)
+    if changes is not None:
+        changes[0].extend(added)
+        changes[1].extend(removed)
+    else:
+        apply_changes(added=added, removed=removed)
+
+
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._statistics_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._statistics_previous = (
+        sender.objects.filter(pk=instance.pk).values('extracurricular', *NUMERIC_FIELDS).first()
+    )
+
+
+def record_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    values = record_values(instance)
+    if created:
+        record_change(added=[values])
+        return
+    previous = getattr(instance, '_statistics_previous', None)
+    if previous is not None and previous != values:
+        record_change(added=[values], removed=[previous])
+
+
+def record_deleted(sender, instance, **kwargs):
+    record_change(removed=[record_values(instance)])
+
+
+def connect_signals():
+    """
+    Keep the statistics row in step with StudentPerformance saves and deletes.
+    """
+    pre_save.connect(remember_previous_values, sender=StudentPerformance, dispatch_uid='statistics_pre_save')
+    post_save.connect(record_saved, sender=StudentPerformance, dispatch_uid='statistics_post_save')
+    post_delete.connect(record_deleted, sender=StudentPerformance, dispatch_uid='statistics_post_delete')
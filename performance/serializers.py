@@ -20,10 +20,12 @@ class StudentPerformanceSerializer(serializers.ModelSerializer):
             'sleep_hours',
             'sample_papers',
             'performance_index',
+            'predicted_performance_index',
+            'prediction_model_version',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'predicted_performance_index', 'prediction_model_version', 'created_at', 'updated_at']
 
 
 class PredictionSerializer(serializers.Serializer):
@@ -54,3 +56,88 @@ class PredictionSerializer(serializers.Serializer):
                 raise serializers.ValidationError(f"{field} is required.")
         
         return data
+
+
+# Inputs of PredictionSerializer that what-if requests may vary
+WHATIF_FEATURES = [
+    'hours_studied',
+    'previous_scores',
+    'extracurricular',
+    'sleep_hours',
+    'sample_papers',
+]
+
+
+def feature_bounds(feature):
+    """
+    Return the (min, max) values PredictionSerializer allows for an input.
+    """
+    if feature == 'extracurricular':
+        return 0, 1
+    field = PredictionSerializer().fields[feature]
+    return field.min_value, field.max_value
+
+
+class SweepAxisSerializer(serializers.Serializer):
+    """
+    One input varied by a what-if sweep, over start..stop (inclusive).
+    """
+    feature = serializers.ChoiceField(choices=WHATIF_FEATURES)
+    start = serializers.IntegerField()
+    stop = serializers.IntegerField()
+    step = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, data):
+        """
+        Validate that the range lies within the input's allowed values.
+        """
+        low, high = feature_bounds(data['feature'])
+        if not low <= data['start'] <= data['stop'] <= high:
+            raise serializers.ValidationError(
+                f"{data['feature']} range must satisfy {low} <= start <= stop <= {high}."
+            )
+        return data
+
+
+class SweepSerializer(serializers.Serializer):
+    """
+    Serializer for what-if sweep requests: a base input and one or two
+    inputs to vary.
+    """
+    base = PredictionSerializer()
+    vary = SweepAxisSerializer(many=True, min_length=1, max_length=2)
+
+    def validate_vary(self, value):
+        features = [axis['feature'] for axis in value]
+        if len(set(features)) != len(features):
+            raise serializers.ValidationError('Each varied input may appear only once.')
+        return value
+
+
+class GoalSeekSerializer(serializers.Serializer):
+    """
+    Serializer for goal-seek requests: the cheapest change to a base input
+    that reaches a target performance index.
+    """
+    base = PredictionSerializer()
+    target = serializers.FloatField(min_value=0, max_value=100)
+    adjustable = serializers.ListField(
+        child=serializers.ChoiceField(choices=WHATIF_FEATURES),
+        min_length=1,
+        default=['hours_studied', 'sample_papers'],
+    )
+    costs = serializers.DictField(child=serializers.FloatField(min_value=0), default=dict)
+    allow_decrease = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        """
+        Validate that adjustable inputs are distinct and costs refer to them.
+        """
+        adjustable = data['adjustable']
+        if len(set(adjustable)) != len(adjustable):
+            raise serializers.ValidationError('Each adjustable input may appear only once.')
+        
+        unknown = set(data['costs']) - set(adjustable)
+        if unknown:
+            raise serializers.ValidationError(f"Costs given for inputs that are not adjustable: {', '.join(sorted(unknown))}.")
+        return data
@@ -0,0 +1,163 @@
+"""
+Shadow (challenger) scoring of live prediction traffic.
+
+Requests served by /api/predict/ hand their inputs and served prediction to
+a bounded in-memory queue and return immediately. A background thread
+drains the queue in batches, scores each batch with the shadow bundle in
+one vectorized call and stores the paired predictions with bulk_create,
+so the shadow model never adds latency to the primary response.
+"""
+import logging
+import threading
+from django.conf import settings
+from .background import BackgroundWriter
+from .exceptions import BundleError
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowScorer(BackgroundWriter):
+    """
+    Scores queued requests with a shadow bundle off the request path.
+
+    submit() never blocks: when the queue is full the request is dropped
+    from the comparison and counted in dropped.
+    """
+
+    thread_name = 'shadow-scorer'
+    failure_message = 'Shadow scoring of %d requests failed: %s'
+
+    def __init__(self, root, version, queue_size=10000, batch_size=500, flush_interval=1.0):
+        super().__init__(queue_size, batch_size, flush_interval)
+        self.root = root
+        self.version = version
+        self._bundle = None
+        self.recorded = 0
+        self.total_abs_diff = 0.0
+        self.max_abs_diff = 0.0
+
+    def submit(self, row, primary_version, primary_prediction):
+        """
+        Queue a validated prediction input and its served prediction.
+        """
+        return super().submit((row, primary_version, primary_prediction))
+
+    def bundle(self):
+        """
+        Return the shadow bundle, loading it on first use.
+        """
+        if self._bundle is None:
+            from .bundle import load_bundle
+            from .registry import ModelRegistry
+
+            bundle = load_bundle(self.root, self.version)
+            ModelRegistry.smoke_test(bundle)
+            self._bundle = bundle
+        return self._bundle
+
+    def _record(self, batch):
+        import numpy as np
+        from .models import ShadowPrediction
+
+        bundle = self.bundle()
+        rows = [row for row, _, _ in batch]
+        predictions = np.round(bundle.predict_rows(rows), 2)
+        primary = np.array([prediction for _, _, prediction in batch])
+
+        ShadowPrediction.objects.bulk_create([
+            ShadowPrediction(
+                **row,
+                primary_version=primary_version,
+                primary_prediction=primary_prediction,
+                shadow_version=bundle.version,
+                shadow_prediction=float(prediction),
+            )
+            for (row, primary_version, primary_prediction), prediction in zip(batch, predictions)
+        ])
+
+        diff = np.abs(predictions - primary)
+        with self._lock:
+            self.recorded += len(batch)
+            self.total_abs_diff += float(diff.sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(diff.max()))
+
+    def status(self):
+        status = super().status()
+        with self._lock:
+            status.update({
+                'shadow_version': self.version,
+                'recorded': self.recorded,
+                'mean_abs_diff': round(self.total_abs_diff / self.recorded, 4) if self.recorded else None,
+                'max_abs_diff': round(self.max_abs_diff, 4),
+            })
+        return status
+
+
+_shadow = None
+_shadow_lock = threading.Lock()
+_configured = False
+
+
+def get_shadow():
+    """
+    Return the process-wide shadow scorer, or None if shadow mode is off.
+    The first call starts it for settings.MODEL_SHADOW_VERSION, if set.
+    """
+    global _configured
+    if not _configured:
+        with _shadow_lock:
+            if not _configured:
+                if settings.MODEL_SHADOW_VERSION:
+                    try:
+                        _set_shadow(settings.MODEL_SHADOW_VERSION)
+                    except BundleError as e:
+                        logger.error('Shadow mode disabled: %s', e)
+                _configured = True
+    return _shadow
+
+
+def set_shadow(version):
+    """
+    Start shadow scoring with the given bundle version (None turns shadow
+    mode off). Raises BundleError if the bundle cannot be loaded.
+    Returns the new scorer.
+    """
+    global _configured
+    with _shadow_lock:
+        _configured = True
+        return _set_shadow(version)
+
+
+def _set_shadow(version):
+    global _shadow
+    scorer = None
+    if version:
+        # Challengers live next to the served bundles
+        from .registry import get_registry
+
+        scorer = ShadowScorer(
+            get_registry().root, version,
+            queue_size=settings.SHADOW_QUEUE_SIZE,
+            batch_size=settings.SHADOW_BATCH_SIZE,
+            flush_interval=settings.SHADOW_FLUSH_INTERVAL,
+        )
+        scorer.bundle()
+        scorer.start()
+
+    previous, _shadow = _shadow, scorer
+    if previous is not None:
+        previous.stop()
+    return scorer
+
+
+def replace_shadow(scorer):
+    """
+    Replace the process-wide shadow scorer (used by tests and tooling).
+    Returns the previous one.
+    """
+    global _shadow, _configured
+    with _shadow_lock:
+        _configured = True
+        previous, _shadow = _shadow, scorer
+    return previous
@@ -0,0 +1,221 @@
+"""
+Statistics over stored StudentPerformance records.
+
+Every figure is computed by the database in a single aggregate() query, or
+one values().annotate() query for grouped statistics, so the cost is one
+query however many records there are and no rows are loaded into Python.
+"""
+from datetime import timedelta
+from django.db.models import Avg, Count, F, FloatField, IntegerField, Max, Min, Q
+from django.db.models.functions import Cast, Floor, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from .models import StudentPerformance
+
+
+# Numeric fields summarized by /api/statistics/
+NUMERIC_FIELDS = [
+    'hours_studied',
+    'previous_scores',
+    'sleep_hours',
+    'sample_papers',
+    'performance_index',
+    'predicted_performance_index',
+]
+
+
+def aggregate_statistics(queryset=None):
+    """
+    Return count, average, min and max of every numeric field, the number of
+    records and the share taking part in extracurricular activities, from
+    one aggregate() query. Returns None if there are no records.
+    """
+    queryset = StudentPerformance.objects.all() if queryset is None else queryset
+    aggregates = {
+        'total': Count('id'),
+        'extracurricular': Count('id', filter=Q(extracurricular=True)),
+    }
+    for field in NUMERIC_FIELDS:
+        aggregates[f'{field}__count'] = Count(field)
+        aggregates[f'{field}__avg'] = Avg(field)
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+
+    values = queryset.order_by().aggregate(**aggregates)
+    if not values['total']:
+        return None
+
+    return {
+        'total_records': values['total'],
+        'extracurricular_rate': round(values['extracurricular'] / values['total'], 4),
+        'fields': {
+            field: {
+                'count': values[f'{field}__count'],
+                'average': round_or_none(values[f'{field}__avg']),
+                'min': round_or_none(values[f'{field}__min']),
+                'max': round_or_none(values[f'{field}__max']),
+            }
+            for field in NUMERIC_FIELDS
+        },
+    }
+
+
+# Fields /api/statistics/groups/ can group by; all but extracurricular can be binned
+GROUP_FIELDS = ['extracurricular', 'hours_studied', 'previous_scores', 'sleep_hours', 'sample_papers']
+
+# Most dimensions one grouped query may use
+MAX_GROUP_FIELDS = 3
+
+
+def grouped_statistics(group_by, bins=None, queryset=None):
+    """
+    Return performance statistics per group, from one values().annotate()
+    query grouped by the given fields.
+
+    bins maps integer fields to a band width: records are grouped by
+    floor(value / width) * width, the lower edge of their band, computed by
+    the database. Groups are ordered by their keys.
+    """
+    bins = bins or {}
+    queryset = StudentPerformance.objects.all() if queryset is None else queryset
+
+    keys = {}
+    for field in group_by:
+        width = bins.get(field, 1)
+        if width > 1:
+            # Floor of a float division, so the band does not depend on how
+            # the backend divides integers
+            band = Floor(Cast(field, FloatField()) / width)
+            keys[f'{field}_band'] = Cast(band, IntegerField()) * width
+        else:
+            keys[field] = F(field)
+    names = list(keys)
+
+    rows = (
+        queryset.order_by()
+        .annotate(**{name: expression for name, expression in keys.items() if name not in group_by})
+        .values(*names)
+        .annotate(
+            count=Count('id'),
+            average_performance=Avg('performance_index'),
+            min_performance=Min('performance_index'),
+            max_performance=Max('performance_index'),
+            average_predicted_performance=Avg('predicted_performance_index'),
+        )
+        .order_by(*names)
+    )
+
+    groups = []
+    for row in rows:
+        group = {}
+        for field, name in zip(group_by, names):
+            width = bins.get(field, 1)
+            group[field] = row[name] if width <= 1 else {'min': row[name], 'max': row[name] + width - 1}
+        group.update({
+            'count': row['count'],
+            'average_performance': round_or_none(row['average_performance']),
+            'min_performance': round_or_none(row['min_performance']),
+            'max_performance': round_or_none(row['max_performance']),
+            'average_predicted_performance': round_or_none(row['average_predicted_performance']),
+        })
+        groups.append(group)
+    return groups
+
+
+# Bucket sizes of /api/statistics/trends/ and the database function for each
+TREND_PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+TREND_AGGREGATES = {
+    'count': lambda: Count('id'),
+    'average_performance': lambda: Avg('performance_index'),
+    'min_performance': lambda: Min('performance_index'),
+    'max_performance': lambda: Max('performance_index'),
+    'average_hours_studied': lambda: Avg('hours_studied'),
+    'average_sleep_hours': lambda: Avg('sleep_hours'),
+}
+
+
+def bucket_start(moment, period):
+    """
+    Return the start of the bucket holding moment, in the current time zone,
+    as TruncDay/TruncWeek/TruncMonth would (weeks start on Monday).
+    """
+    start = timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'week':
+        start -= timedelta(days=start.weekday())
+    elif period == 'month':
+        start = start.replace(day=1)
+    return start
+
+
+def bucket_starts(period, count, now=None):
+    """
+    Return the starts of the last count buckets, oldest first. The last one
+    is the current (open) bucket.
+    """
+    starts = [bucket_start(now or timezone.now(), period)]
+    while len(starts) < count:
+        starts.append(bucket_start(starts[-1] - timedelta(days=1), period))
+    return starts[::-1]
+
+
+def describe_bucket(start, values, closed):
+    bucket = {'start': start.isoformat(), 'closed': closed, 'count': values.get('count', 0)}
+    for name in TREND_AGGREGATES:
+        if name != 'count':
+            bucket[name] = round_or_none(values.get(name))
+    return bucket
+
+
+def trend_statistics(period, count, cache=None, version=None, now=None):
+    """
+    Return counts and averages per day, week or month for the last count
+    buckets, oldest first.
+
+    Closed buckets no longer change as records are added, so they are kept
+    in cache (a VersionedLRUCache, keyed on version, which must change when
+    existing records are changed or deleted) and only the missing ones are
+    computed, in one TruncX values().annotate() query over a created_at
+    range. The open bucket is recomputed with one aggregate() on every call.
+    Returns (buckets, number of closed buckets served from cache).
+    """
+    starts = bucket_starts(period, count, now)
+    closed_starts, open_start = starts[:-1], starts[-1]
+
+    closed = {}
+    for start in closed_starts:
+        bucket = cache.get((period, start), version) if cache is not None else None
+        if bucket is not None:
+            closed[start] = bucket
+    cached = len(closed)
+
+    missing = [start for start in closed_starts if start not in closed]
+    if missing:
+        rows = (
+            StudentPerformance.objects.order_by()
+            .filter(created_at__gte=missing[0], created_at__lt=open_start)
+            .annotate(bucket=TREND_PERIODS[period]('created_at'))
+            .values('bucket')
+            .annotate(**{name: aggregate() for name, aggregate in TREND_AGGREGATES.items()})
+        )
+        found = {bucket_start(row['bucket'], period): row for row in rows}
+        for start in missing:
+            closed[start] = describe_bucket(start, found.get(start, {}), closed=True)
+            if cache is not None:
+                cache.put((period, start), version, closed[start])
+
+    current = (
+        StudentPerformance.objects.order_by()
+        .filter(created_at__gte=open_start)
+        .aggregate(**{name: aggregate() for name, aggregate in TREND_AGGREGATES.items()})
+    )
+    buckets = [closed[start] for start in closed_starts]
+    buckets.append(describe_bucket(open_start, current, closed=False))
+    return buckets, cached
+
+
+def round_or_none(value, digits=2):
+    return None if value is None else round(value, digits)
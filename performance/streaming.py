@@ -0,0 +1,278 @@
+"""
+Chunked parsing and scoring of large CSV / NDJSON prediction inputs.
+
+Input is consumed line by line and scored CHUNK_ROWS rows at a time, so
+memory use depends on the chunk size rather than on the number of rows.
+CSV input uses the dataset.csv column layout (extra columns such as
+Performance Index are ignored); NDJSON input has one JSON object per line
+keyed by the API field names.
+"""
+import csv
+import io
+import json
+import numpy as np
+from .cube import CUBE_SHAPE
+from .features import INPUT_COLUMNS, INPUT_FIELDS
+
+
+# Rows parsed and scored per model call
+CHUNK_ROWS = 10000
+
+FORMATS = ('csv', 'ndjson')
+
+# Largest accepted value per input, in INPUT_FIELDS order (the minimum is 0)
+MAX_VALUES = np.array(CUBE_SHAPE) - 1
+MAX_VALUE = dict(zip(INPUT_FIELDS, MAX_VALUES.tolist()))
+
+TRUE_VALUES = {'yes', 'true', '1'}
+FALSE_VALUES = {'no', 'false', '0'}
+
+
+class StreamFormatError(ValueError):
+    """
+    Raised when the input as a whole cannot be parsed (e.g. a bad CSV header).
+    """
+
+
+def parse_value(field, value):
+    """
+    Convert one raw input value to an int, or raise ValueError. Values
+    outside [0, MAX_VALUES] are rejected here, before they reach an int64
+    array they might not fit in.
+    """
+    if field == 'extracurricular':
+        if isinstance(value, bool):
+            return int(value)
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return 1
+        if text in FALSE_VALUES:
+            return 0
+        raise ValueError(f'{field} must be Yes/No or true/false')
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        number = value
+    else:
+        try:
+            number = int(value)
+        except (TypeError, ValueError, OverflowError):
+            # Non-finite floats (NDJSON Infinity/NaN) end up here and fail
+            # is_integer() below
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f'{field} must be an integer')
+            if not number.is_integer():
+                raise ValueError(f'{field} must be an integer')
+            number = int(number)
+    if not 0 <= number <= MAX_VALUE[field]:
+        raise ValueError(f'{field} must be between 0 and {MAX_VALUE[field]}')
+    return number
+
+
+def plain_inputs(row):
+    """
+    Return a JSON row's inputs as a list of ints in INPUT_FIELDS order, or
+    None unless every input is present, in range and a plain JSON integer
+    (a boolean for extracurricular). Rows that return None need the
+    serializer to tell what is wrong with them.
+    """
+    if not isinstance(row, dict):
+        return None
+    values = []
+    for field in INPUT_FIELDS:
+        value = row.get(field)
+        if type(value) is not (bool if field == 'extracurricular' else int):
+            return None
+        try:
+            values.append(parse_value(field, value))
+        except ValueError:
+            return None
+    return values
+
+
+def decode_lines(lines):
+    """
+    Yield (text, error) for each non-blank line of an iterable of bytes or
+    str lines. A line that is not valid UTF-8 yields (None, error), so it is
+    reported as that row's error rather than ending the stream.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                yield None, 'Row is not valid UTF-8'
+                continue
+        line = line.rstrip('\r\n')
+        if line.strip():
+            yield line, None
+
+
+def split_csv_line(text):
+    return next(csv.reader([text]), [])
+
+
+def csv_records(lines):
+    """
+    Return an iterator of (values, error) for CSV lines in the dataset.csv
+    layout. The header is read immediately, so a bad header raises
+    StreamFormatError before any output is produced. Each row is one line
+    (quoted fields cannot span lines).
+    """
+    lines = decode_lines(lines)
+    first = next(lines, None)
+    if first is None:
+        return iter(())
+
+    text, error = first
+    if error is not None:
+        raise StreamFormatError('CSV header is not valid UTF-8')
+    try:
+        header = [name.strip() for name in split_csv_line(text)]
+    except csv.Error as e:
+        raise StreamFormatError(f'CSV header cannot be parsed: {e}')
+    missing = [name for name in INPUT_COLUMNS if name not in header]
+    if missing:
+        raise StreamFormatError(f'CSV header is missing columns: {", ".join(missing)}')
+    positions = [header.index(name) for name in INPUT_COLUMNS]
+
+    def records():
+        for text, error in lines:
+            if error is not None:
+                yield None, error
+                continue
+            try:
+                row = split_csv_line(text)
+                yield [parse_value(field, row[position]) for field, position in zip(INPUT_FIELDS, positions)], None
+            except csv.Error as e:
+                yield None, f'Row cannot be parsed: {e}'
+            except (ValueError, IndexError) as e:
+                yield None, str(e) if isinstance(e, ValueError) else 'Row has too few columns'
+
+    return records()
+
+
+def ndjson_records(lines):
+    """
+    Return an iterator of (values, error) for NDJSON lines keyed by INPUT_FIELDS.
+    """
+    def records():
+        for line, error in decode_lines(lines):
+            if error is not None:
+                yield None, error
+                continue
+            try:
+                obj = json.loads(line)
+                if not isinstance(obj, dict):
+                    raise ValueError('Each line must be a JSON object')
+                yield [parse_value(field, obj[field]) for field in INPUT_FIELDS], None
+            except KeyError as e:
+                yield None, f'{e.args[0]} is required'
+            except ValueError as e:
+                yield None, str(e)
+
+    return records()
+
+
+def read_records(lines, input_format):
+    """
+    Return an iterator of (values, error) pairs for CSV or NDJSON lines.
+    """
+    if input_format == 'csv':
+        return csv_records(lines)
+    if input_format == 'ndjson':
+        return ndjson_records(lines)
+    raise StreamFormatError(f'Unsupported format {input_format!r} (expected one of {", ".join(FORMATS)})')
+
+
+def validate_inputs(inputs):
+    """
+    Return an error message per row of an (n, 5) input array (None if valid).
+    """
+    errors = [None] * len(inputs)
+    out_of_range = (inputs < 0) | (inputs > MAX_VALUES)
+    too_long = inputs[:, 0] + inputs[:, 3] > 24
+
+    for i in np.flatnonzero(out_of_range.any(axis=1) | too_long):
+        column = np.flatnonzero(out_of_range[i])
+        if column.size:
+            field = INPUT_FIELDS[column[0]]
+            errors[i] = f'{field} must be between 0 and {MAX_VALUES[column[0]]}'
+        else:
+            errors[i] = 'hours_studied + sleep_hours exceeds 24 hours in a day'
+    return errors
+
+
+def iter_chunks(records, chunk_size=CHUNK_ROWS):
+    """
+    Group (values, error) records into chunks.
+
+    Yields (start, inputs, errors): the index of the chunk's first row, an
+    (n, 5) int64 array (zeros for rows that failed to parse) and a list of
+    per-row error messages, None for rows that are valid and can be scored.
+    """
+    start = 0
+    values = []
+    errors = []
+    for row, error in records:
+        values.append(row if row is not None else [0] * len(INPUT_FIELDS))
+        errors.append(error)
+        if len(values) == chunk_size:
+            yield finish_chunk(start, values, errors)
+            start += len(values)
+            values, errors = [], []
+    if values:
+        yield finish_chunk(start, values, errors)
+
+
+def finish_chunk(start, values, errors):
+    inputs = np.array(values, dtype=np.int64).reshape(-1, len(INPUT_FIELDS))
+    range_errors = validate_inputs(inputs)
+    errors = [error or range_error for error, range_error in zip(errors, range_errors)]
+    return start, inputs, errors
+
+
+def score_chunk(bundle, inputs, errors):
+    """
+    Return predictions for a chunk, NaN where the row has an error.
+    """
+    valid = np.array([error is None for error in errors], dtype=bool)
+    predictions = np.full(len(inputs), np.nan)
+    if valid.any():
+        predictions[valid] = bundle.predict_inputs(inputs[valid])
+    return predictions
+
+
+def format_chunk(start, predictions, errors, output_format):
+    """
+    Render a scored chunk as CSV or NDJSON text.
+    """
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for offset, (prediction, error) in enumerate(zip(predictions, errors)):
+            if error is None:
+                writer.writerow([start + offset, round(float(prediction), 2), ''])
+            else:
+                writer.writerow([start + offset, '', error])
+        return buffer.getvalue()
+
+    lines = []
+    for offset, (prediction, error) in enumerate(zip(predictions, errors)):
+        index = start + offset
+        if error is None:
+            lines.append(json.dumps({'index': index, 'predicted_performance_index': round(float(prediction), 2)}) + '\n')
+        else:
+            lines.append(json.dumps({'index': index, 'error': error}) + '\n')
+    return ''.join(lines)
+
+
+def stream_predictions(bundle, records, output_format, chunk_size=CHUNK_ROWS):
+    """
+    Yield the scored output for records, one chunk of text at a time.
+    """
+    if output_format == 'csv':
+        yield 'index,predicted_performance_index,error\n'
+    for start, inputs, errors in iter_chunks(records, chunk_size):
+        yield format_chunk(start, score_chunk(bundle, inputs, errors), errors, output_format)
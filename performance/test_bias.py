@@ -1,41 +1,11 @@
 """
 Test the model against bias scenarios and edge cases.
 This script verifies that the model handles extreme inputs reasonably.
+Run from the project root: python -m performance.test_bias
 """
 import joblib
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-
-
-def create_advanced_features(df):
-    """Create the same advanced features as in training"""
-    df_copy = df.copy()
-    
-    df_copy['study_sleep_interaction'] = df_copy['Hours Studied'] * df_copy['Sleep Hours']
-    df_copy['study_papers_interaction'] = df_copy['Hours Studied'] * df_copy['Sample Question Papers Practiced']
-    df_copy['papers_score_interaction'] = df_copy['Sample Question Papers Practiced'] * df_copy['Previous Scores']
-    
-    df_copy['hours_squared'] = df_copy['Hours Studied'] ** 2
-    df_copy['sleep_squared'] = df_copy['Sleep Hours'] ** 2
-    df_copy['papers_squared'] = df_copy['Sample Question Papers Practiced'] ** 2
-    
-    df_copy['study_efficiency'] = np.where(
-        df_copy['Sleep Hours'] > 0,
-        df_copy['Hours Studied'] / df_copy['Sleep Hours'],
-        0
-    )
-    
-    df_copy['sleep_quality'] = np.abs(df_copy['Sleep Hours'] - 8)
-    df_copy['score_percentile'] = df_copy['Previous Scores'] / 100.0
-    
-    df_copy['total_effort'] = (
-        (df_copy['Hours Studied'] / 24) +
-        (df_copy['Sample Question Papers Practiced'] / 10) +
-        df_copy['Extracurricular Activities']
-    ) / 3
-    
-    return df_copy
+from performance.features import INPUT_COLUMNS, FEATURE_NAMES, build_features
 
 
 def test_bias_scenarios():
@@ -45,6 +15,11 @@ def test_bias_scenarios():
         scaler = joblib.load('performance/scaler.pkl')
         feature_names = joblib.load('performance/features.pkl')
         
+        if list(feature_names) != FEATURE_NAMES:
+            print("Error: features.pkl does not match the feature pipeline.")
+            print("Retrain the model first!")
+            return
+        
         # Test scenarios
         test_cases = [
             # Scenario 1: 0 sleep
@@ -78,12 +53,10 @@ def test_bias_scenarios():
             {'Hours Studied': 5, 'Previous Scores': 70, 'Extracurricular Activities': 1, 'Sleep Hours': 7, 'Sample Question Papers Practiced': 3},
         ]
         
-        df_test = pd.DataFrame(test_cases)
-        df_enhanced = create_advanced_features(df_test)
-        df_enhanced = df_enhanced[feature_names]
-        df_scaled = scaler.transform(df_enhanced)
+        inputs = np.array([[case[column] for column in INPUT_COLUMNS] for case in test_cases])
+        features_scaled = scaler.transform(build_features(inputs))
         
-        predictions = model.predict(df_scaled)
+        predictions = model.predict(features_scaled)
         
         print("="*80)
         print("BIAS TEST SCENARIOS - MODEL PREDICTIONS")
@@ -1,11 +1,112 @@
 """
 Tests for the performance prediction API
 """
-from django.test import TestCase
+from django.test import TestCase, AsyncClient
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from datetime import datetime, timedelta
+from unittest import skipUnless
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import StudentPerformance
+from .models import StudentPerformance, ShadowPrediction, PredictionLog, RecordStatistics
+from .features import FEATURE_NAMES, INPUT_FIELDS, build_features
+from .cube import CUBE_SHAPE, build_cube, load_cube, verify_cube, lookup
+from .serializers import PredictionSerializer
+from .cache import PredictionCache
+from .batcher import MicroBatcher
+from .executor import BoundedExecutor, ExecutorBusy
+from .compiled import CompiledEnsemble
+from .bundle import BundleError, save_bundle, load_bundle, current_version, set_current_version
+from .registry import ModelRegistry, set_registry
+from .apps import PerformanceConfig
+from .rescoring import rescore_records, stale_records
+from .pagination import encode_cursor, keyset_page
+from .streaming import format_chunk
+from .stats import aggregate_statistics, bucket_start, grouped_statistics, trend_statistics
+from .histograms import add_values, empty_histogram, percentile
+from .running_stats import (
+    batched_changes, bulk_create_records, compute_statistics, materialized_statistics, merge, statistics_differences,
+    subtract, summarize,
+)
+from .whatif import candidate_count, goal_seek
+from .profiles import choose_profiles, staged_errors
+from .shadow import ShadowScorer, replace_shadow
+from .prediction_log import PredictionLogWriter, replace_prediction_log
+from . import views
+import numpy as np
+import joblib
+import tempfile
+import asyncio
+import csv
+import importlib.util
+import io
 import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+
+def train_small_model(n_estimators=40, seed=42):
+    """
+    Train a small GradientBoostingRegressor on engineered features.
+    Returns (features, target, model, scaler).
+    """
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+    
+    rng = np.random.default_rng(seed)
+    inputs = np.column_stack([
+        rng.integers(0, 13, 400), rng.integers(0, 101, 400), rng.integers(0, 2, 400),
+        rng.integers(0, 13, 400), rng.integers(0, 51, 400),
+    ])
+    features = build_features(inputs)
+    target = features[:, 0] * 2.5 + features[:, 1] * 0.5 + rng.normal(0, 2, 400)
+    
+    scaler = StandardScaler().fit(features)
+    model = GradientBoostingRegressor(
+        n_estimators=n_estimators, max_depth=4, learning_rate=0.1, loss='huber', random_state=seed
+    ).fit(scaler.transform(features), target)
+    return features, target, model, scaler
+
+
+def save_small_bundle(root, n_estimators=40, make_current=True):
+    """
+    Save a bundle for a small model under root and return its version.
+    """
+    features, target, model, scaler = train_small_model(n_estimators=n_estimators)
+    staged = staged_errors(model, scaler.transform(features), target)
+    return save_bundle(
+        root, CompiledEnsemble.from_sklearn(model, scaler), scaler, 'test-data-hash',
+        metrics={'test_mae': 1.0}, profiles=choose_profiles(staged['test_mae']), staged_errors=staged,
+        make_current=make_current
+    )
+
+
+_fixture_dir = None
+_previous_registry = None
+_previous_prediction_log = None
+
+
+def setUpModule():
+    """Serve a small fixture bundle, so API tests do not need a trained model"""
+    global _fixture_dir, _previous_registry, _previous_prediction_log
+    _fixture_dir = tempfile.TemporaryDirectory()
+    save_small_bundle(_fixture_dir.name)
+    _previous_registry = set_registry(ModelRegistry(_fixture_dir.name))
+    # Buffer prediction logs without a background writer thread
+    _previous_prediction_log = replace_prediction_log(PredictionLogWriter())
+
+
+def tearDownModule():
+    set_registry(_previous_registry)
+    replace_prediction_log(_previous_prediction_log)
+    _fixture_dir.cleanup()
 
 
 class PredictionAPITestCase(TestCase):
@@ -71,6 +172,1293 @@ class PredictionAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class BatchPredictionAPITestCase(TestCase):
+    """Test cases for the batch prediction API endpoint"""
+    
+    def setUp(self):
+        """Set up test client"""
+        self.client = APIClient()
+        self.valid_input = {
+            "hours_studied": 6,
+            "previous_scores": 78,
+            "extracurricular": True,
+            "sleep_hours": 7,
+            "sample_papers": 3
+        }
+    
+    def test_batch_matches_single_predictions(self):
+        """Test batch predictions match the single-row endpoint"""
+        other_input = dict(self.valid_input, hours_studied=2, sleep_hours=9)
+        response = self.client.post('/api/predict/batch/', [self.valid_input, other_input], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['succeeded'], 2)
+        
+        for row, result in zip([self.valid_input, other_input], response.data['results']):
+            single = self.client.post('/api/predict/', row, format='json')
+            self.assertEqual(
+                result['predicted_performance_index'],
+                single.data['predicted_performance_index']
+            )
+    
+    def test_batch_reports_errors_by_index(self):
+        """Test that invalid rows are reported without failing the batch"""
+        rows = [
+            self.valid_input,
+            dict(self.valid_input, hours_studied="six"),
+            dict(self.valid_input, hours_studied=20, sleep_hours=8),
+        ]
+        response = self.client.post('/api/predict/batch/', rows, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['succeeded'], 1)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertIn('predicted_performance_index', response.data['results'][0])
+        self.assertIn('hours_studied', response.data['results'][1]['errors'])
+        self.assertIn('non_field_errors', response.data['results'][2]['errors'])
+    
+    def test_vectorized_validation_matches_serializer(self):
+        """Test that batch validation gives the same results as validating each row with the serializer"""
+        rows = [
+            self.valid_input,
+            dict(self.valid_input, extracurricular=False, sample_papers=0),
+            dict(self.valid_input, hours_studied="6"),
+            dict(self.valid_input, hours_studied=6.0),
+            dict(self.valid_input, extracurricular="yes"),
+            dict(self.valid_input, extracurricular=1),
+            dict(self.valid_input, hours_studied=True),
+            dict(self.valid_input, previous_scores=101),
+            dict(self.valid_input, sample_papers=10 ** 30),
+            dict(self.valid_input, hours_studied=20, sleep_hours=8),
+            {key: value for key, value in self.valid_input.items() if key != 'sleep_hours'},
+            "not a row",
+        ]
+        results, valid_indices, valid_rows = views.validate_batch(rows)
+    
+        for index, row in enumerate(rows):
+            serializer = PredictionSerializer(data=row)
+            if not serializer.is_valid():
+                self.assertEqual(results[index], {'index': index, 'errors': serializer.errors})
+            elif views.day_length_error(serializer.validated_data) is not None:
+                self.assertEqual(list(results[index]['errors']), ['non_field_errors'])
+            else:
+                self.assertIsNone(results[index])
+                self.assertEqual(
+                    dict(valid_rows[valid_indices.index(index)]),
+                    dict(serializer.validated_data)
+                )
+        self.assertEqual(valid_indices, [i for i, result in enumerate(results) if result is None])
+    
+    def test_batch_rejects_non_list(self):
+        """Test that a non-array body is rejected"""
+        response = self.client.post('/api/predict/batch/', self.valid_input, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StreamingPredictionAPITestCase(TestCase):
+    """Test cases for the streaming CSV / NDJSON scoring endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.bundle = views.get_registry().get()
+    
+    def stream(self, body, content_type, query=''):
+        response = self.client.post(f'/api/predict/stream/{query}', body, content_type=content_type)
+        return response, b''.join(response.streaming_content).decode() if response.streaming else None
+    
+    def test_csv_stream_matches_batch(self):
+        """Test that dataset.csv rows are scored like the batch endpoint, across chunks"""
+        with open('dataset.csv') as f:
+            body = f.read()
+        
+        with self.settings(PREDICTION_STREAM_CHUNK_ROWS=7):
+            response, text = self.stream(body, 'text/csv')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Model-Version'], self.bundle.version)
+        lines = text.strip().split('\n')
+        self.assertEqual(lines[0], 'index,predicted_performance_index,error')
+        
+        import pandas as pd
+        df = pd.read_csv('dataset.csv')
+        inputs = np.column_stack([
+            df['Hours Studied'], df['Previous Scores'], (df['Extracurricular Activities'] == 'Yes').astype(int),
+            df['Sleep Hours'], df['Sample Question Papers Practiced'],
+        ])
+        expected = np.round(self.bundle.predict_inputs(inputs), 2)
+        
+        self.assertEqual(len(lines) - 1, len(df))
+        for i, line in enumerate(lines[1:]):
+            index, prediction, error = line.split(',')
+            self.assertEqual(int(index), i)
+            self.assertAlmostEqual(float(prediction), expected[i])
+            self.assertEqual(error, '')
+    
+    def test_ndjson_stream_reports_row_errors(self):
+        """Test that bad NDJSON rows get an error line without stopping the stream"""
+        rows = [
+            {"hours_studied": 6, "previous_scores": 78, "extracurricular": True, "sleep_hours": 7, "sample_papers": 3},
+            {"hours_studied": 20, "previous_scores": 78, "extracurricular": False, "sleep_hours": 8, "sample_papers": 3},
+            {"hours_studied": 6},
+            {"hours_studied": 6, "previous_scores": 178, "extracurricular": True, "sleep_hours": 7, "sample_papers": 3},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n'
+        response, text = self.stream(body, 'application/x-ndjson')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = [json.loads(line) for line in text.strip().split('\n')]
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3, 4])
+        self.assertIn('predicted_performance_index', results[0])
+        self.assertIn('exceeds 24', results[1]['error'])
+        self.assertIn('required', results[2]['error'])
+        self.assertIn('previous_scores', results[3]['error'])
+        self.assertIn('error', results[4])
+    
+    def test_oversized_and_undecodable_rows(self):
+        """Test that values beyond int64 and invalid UTF-8 become row errors, not a broken stream"""
+        body = (
+            b'{"hours_studied": 1e30, "previous_scores": 78, "extracurricular": true, "sleep_hours": 7, "sample_papers": 3}\n'
+            b'\xff\xfe not utf-8\n'
+            b'{"hours_studied": 6, "previous_scores": 78, "extracurricular": true, "sleep_hours": 7, "sample_papers": 3}\n'
+            b'{"hours_studied": Infinity, "previous_scores": 78, "extracurricular": true, "sleep_hours": 7, "sample_papers": 3}\n'
+            b'{"hours_studied": 6, "previous_scores": NaN, "extracurricular": true, "sleep_hours": 7, "sample_papers": 3}\n'
+        )
+        response, text = self.stream(body, 'application/x-ndjson')
+        results = [json.loads(line) for line in text.strip().split('\n')]
+        self.assertIn('hours_studied must be between 0 and', results[0]['error'])
+        self.assertIn('UTF-8', results[1]['error'])
+        self.assertIn('predicted_performance_index', results[2])
+        self.assertEqual(results[3]['error'], 'hours_studied must be an integer')
+        self.assertEqual(results[4]['error'], 'previous_scores must be an integer')
+        
+        header = 'Hours Studied,Previous Scores,Extracurricular Activities,Sleep Hours,Sample Question Papers Practiced\n'
+        response, text = self.stream(header + '5,99999999999999999999999,Yes,7,2\n5,70,Yes,7,2\n', 'text/csv')
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[1], ['0', '', 'previous_scores must be between 0 and 100'])
+        self.assertEqual(rows[2][2], '')
+    
+    def test_csv_error_cells_are_quoted(self):
+        """Test that CSV error messages with quotes and newlines stay one cell"""
+        text = format_chunk(0, np.array([np.nan]), ['bad "value"\non two lines'], 'csv')
+        self.assertEqual(list(csv.reader(io.StringIO(text))), [['0', '', 'bad "value"\non two lines']])
+    
+    def test_bad_csv_header(self):
+        """Test that a CSV without the dataset.csv columns is rejected up front"""
+        response, _ = self.stream('a,b\n1,2\n', 'text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response, _ = self.stream('1,2\n', 'text/csv', query='?format=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SweepAPITestCase(TestCase):
+    """Test cases for the what-if sweep endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.bundle = views.get_registry().get()
+        self.base = {
+            "hours_studied": 6, "previous_scores": 78, "extracurricular": True,
+            "sleep_hours": 7, "sample_papers": 3
+        }
+    
+    def predict(self, **changes):
+        row = {**self.base, **changes}
+        row['extracurricular'] = int(row['extracurricular'])
+        return round(float(self.bundle.predict_rows([row])[0]), 2)
+    
+    def test_one_dimensional_sweep(self):
+        """Test that a 1-D sweep matches single predictions"""
+        response = self.client.post('/api/predict/sweep/', {
+            'base': self.base, 'vary': [{'feature': 'sample_papers', 'start': 0, 'stop': 10, 'step': 2}]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['values'], [[0, 2, 4, 6, 8, 10]])
+        self.assertEqual(response.data['predictions'], [self.predict(sample_papers=v) for v in range(0, 11, 2)])
+    
+    def test_two_dimensional_grid_respects_day_length(self):
+        """Test a 2-D grid, with null where study + sleep hours exceed 24"""
+        response = self.client.post('/api/predict/sweep/', {
+            'base': self.base, 'vary': [
+                {'feature': 'hours_studied', 'start': 10, 'stop': 20, 'step': 5},
+                {'feature': 'sleep_hours', 'start': 4, 'stop': 12, 'step': 4},
+            ]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        grid = response.data['predictions']
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(len(grid[0]), 3)
+        self.assertEqual(grid[1][1], self.predict(hours_studied=15, sleep_hours=8))
+        self.assertIsNone(grid[1][2])
+        self.assertIsNotNone(grid[2][0])
+    
+    def test_invalid_sweeps(self):
+        """Test out-of-range axes, repeated axes and an invalid fixed base"""
+        bad_range = self.client.post('/api/predict/sweep/', {
+            'base': self.base, 'vary': [{'feature': 'sleep_hours', 'start': 0, 'stop': 30}]
+        }, format='json')
+        self.assertEqual(bad_range.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        repeated = self.client.post('/api/predict/sweep/', {
+            'base': self.base, 'vary': [{'feature': 'sample_papers', 'start': 0, 'stop': 3}] * 2
+        }, format='json')
+        self.assertEqual(repeated.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        bad_base = self.client.post('/api/predict/sweep/', {
+            'base': {**self.base, 'hours_studied': 20, 'sleep_hours': 8},
+            'vary': [{'feature': 'sample_papers', 'start': 0, 'stop': 3}]
+        }, format='json')
+        self.assertEqual(bad_base.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GoalSeekTestCase(TestCase):
+    """Test cases for the minimum-effort goal-seek search"""
+    
+    def setUp(self):
+        self.bundle = views.get_registry().get()
+        self.base = {
+            "hours_studied": 2, "previous_scores": 60, "extracurricular": False,
+            "sleep_hours": 7, "sample_papers": 1
+        }
+    
+    def brute_force(self, target, adjustable):
+        """Return the minimum cost over every allowed candidate reaching target"""
+        best = None
+        ranges = {'hours_studied': range(self.base['hours_studied'], 25), 'sample_papers': range(self.base['sample_papers'], 51)}
+        for hours in ranges['hours_studied'] if 'hours_studied' in adjustable else [self.base['hours_studied']]:
+            for papers in ranges['sample_papers'] if 'sample_papers' in adjustable else [self.base['sample_papers']]:
+                if hours + self.base['sleep_hours'] > 24:
+                    continue
+                row = {**self.base, 'hours_studied': hours, 'sample_papers': papers, 'extracurricular': 0}
+                if self.bundle.predict_rows([row])[0] >= target:
+                    cost = (hours - self.base['hours_studied']) + (papers - self.base['sample_papers'])
+                    best = cost if best is None else min(best, cost)
+        return best
+    
+    def test_matches_brute_force(self):
+        """Test that the pruned search finds the same minimum cost as exhaustive search"""
+        adjustable = ['hours_studied', 'sample_papers']
+        reachable = float(self.bundle.predict_rows([{**self.base, 'hours_studied': 17, 'sample_papers': 50}])[0])
+        target = round((reachable + float(self.bundle.predict_rows([self.base])[0])) / 2, 2)
+        
+        result = goal_seek(self.bundle, self.base, target, adjustable, batch_size=64)
+        expected = self.brute_force(target, adjustable)
+        
+        self.assertTrue(result['achievable'])
+        self.assertEqual(result['cost'], expected)
+        self.assertGreaterEqual(result['predicted_performance_index'], round(target, 2))
+        self.assertLess(result['evaluated'], result['candidates'])
+    
+    def test_base_already_meets_target(self):
+        """Test that no change is suggested when the base already reaches the target"""
+        result = goal_seek(self.bundle, self.base, 0.0, ['hours_studied'])
+        self.assertTrue(result['achievable'])
+        self.assertEqual(result['cost'], 0)
+        self.assertEqual(result['changes'], {})
+    
+    def test_endpoint(self):
+        """Test the goal-seek endpoint, including an unreachable target"""
+        client = APIClient()
+        response = client.post('/api/predict/goal/', {
+            'base': self.base, 'target': 100, 'adjustable': ['sample_papers'], 'costs': {'sample_papers': 0.5}
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['achievable'])
+        self.assertEqual(response.data['evaluated'], response.data['candidates'])
+        self.assertIn('predicted_performance_index', response.data)
+        
+        bad = client.post('/api/predict/goal/', {
+            'base': self.base, 'target': 80, 'adjustable': ['sample_papers'], 'costs': {'hours_studied': 1}
+        }, format='json')
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_large_search_without_cube_is_rejected(self):
+        """Test that a search too large to score without a prediction cube gets a 400"""
+        self.assertIsNone(self.bundle.cube)
+        adjustable = ['hours_studied', 'previous_scores', 'sample_papers']
+        self.assertEqual(candidate_count(self.base, adjustable), 23 * 41 * 50)
+        self.assertEqual(goal_seek(self.bundle, self.base, 100, ['sample_papers'])['candidates'],
+                         candidate_count(self.base, ['sample_papers']))
+    
+        client = APIClient()
+        body = {'base': self.base, 'target': 80, 'adjustable': adjustable}
+        with self.settings(GOAL_SEEK_MAX_CANDIDATES=10000):
+            response = client.post('/api/predict/goal/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('47150 candidates', response.data['error'])
+    
+            response = client.post('/api/predict/goal/', dict(body, adjustable=['sample_papers']), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+        all_inputs = {'base': self.base, 'target': 80, 'adjustable': INPUT_FIELDS, 'allow_decrease': True}
+        response = client.post('/api/predict/goal/', all_inputs, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FeatureEngineeringTestCase(TestCase):
+    """Test cases for the shared feature pipeline"""
+    
+    def test_feature_order_matches_saved_features(self):
+        """Test that FEATURE_NAMES matches the saved features.pkl order"""
+        features_path = os.path.join(os.path.dirname(__file__), 'features.pkl')
+        self.assertEqual(list(joblib.load(features_path)), FEATURE_NAMES)
+    
+    def test_build_features_values(self):
+        """Test advanced feature values for a known input row"""
+        features = build_features([[6, 78, 1, 8, 3]])
+        
+        self.assertEqual(features.shape, (1, len(FEATURE_NAMES)))
+        expected = [
+            6, 78, 1, 8, 3,
+            48, 18, 234,
+            36, 64, 9,
+            0.75, 0, 0.78,
+            (6 / 24 + 3 / 10 + 1) / 3,
+        ]
+        np.testing.assert_allclose(features[0], expected)
+    
+    def test_build_features_zero_sleep(self):
+        """Test that study efficiency is 0 when there is no sleep"""
+        features = build_features([[8, 75, 0, 0, 5]])
+        
+        self.assertEqual(features[0, FEATURE_NAMES.index('study_efficiency')], 0)
+        self.assertTrue(np.isfinite(features).all())
+
+
+class PredictionCubeTestCase(TestCase):
+    """Test cases for the precomputed prediction cube"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Build a cube from a cheap stand-in model once for all tests"""
+        super().setUpClass()
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.predict_features = staticmethod(lambda features: features[:, :5].sum(axis=1))
+        cls.path = build_cube(cls.predict_features, path=os.path.join(cls.tmpdir.name, 'cube.npy'))
+        cls.cube = load_cube(cls.path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        del cls.cube
+        cls.tmpdir.cleanup()
+        super().tearDownClass()
+    
+    def test_cube_covers_serializer_domain(self):
+        """Test that the cube shape matches PredictionSerializer bounds"""
+        fields = PredictionSerializer().fields
+        expected = tuple(
+            2 if field == 'extracurricular' else fields[field].max_value + 1
+            for field in INPUT_FIELDS
+        )
+        self.assertEqual(CUBE_SHAPE, expected)
+    
+    def test_lookup_matches_model(self):
+        """Test cube lookups against the model they were built from"""
+        inputs = np.array([[6, 78, 1, 7, 3], [0, 100, 0, 24, 50], [24, 0, 1, 0, 0]])
+        expected = np.clip(self.predict_features(build_features(inputs)), 0, 100)
+        
+        np.testing.assert_allclose(lookup(self.cube, inputs), expected)
+        self.assertTrue(verify_cube(self.cube, self.predict_features))
+    
+    def test_invalid_day_length_is_nan(self):
+        """Test that inputs with study + sleep > 24 are not scored"""
+        self.assertTrue(np.isnan(lookup(self.cube, [[20, 50, 0, 8, 5]])[0]))
+    
+    def test_stale_cube_is_rejected(self):
+        """Test that a cube built from another model fails verification"""
+        self.assertFalse(verify_cube(self.cube, lambda features: features[:, 0]))
+
+
+class PredictionCacheTestCase(TestCase):
+    """Test cases for the prediction LRU cache"""
+    
+    def test_hits_misses_and_evictions(self):
+        """Test LRU ordering and counters"""
+        cache = PredictionCache(max_size=2)
+        cache.put((1,), 'v1', 10.0)
+        cache.put((2,), 'v1', 20.0)
+        
+        self.assertEqual(cache.get((1,), 'v1'), 10.0)
+        cache.put((3,), 'v1', 30.0)
+        
+        # (2,) was least recently used, so it is evicted
+        self.assertIsNone(cache.get((2,), 'v1'))
+        self.assertEqual(cache.get((3,), 'v1'), 30.0)
+        
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['size'], 2)
+    
+    def test_new_model_version_invalidates(self):
+        """Test that entries for an older model version are dropped"""
+        cache = PredictionCache(max_size=10)
+        cache.put((1,), 'v1', 10.0)
+        
+        self.assertIsNone(cache.get((1,), 'v2'))
+        self.assertEqual(cache.stats()['size'], 0)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+    
+    def test_repeat_prediction_is_cache_hit(self):
+        """Test that repeating a prediction is served from the cache"""
+        client = APIClient()
+        data = {
+            "hours_studied": 3,
+            "previous_scores": 55,
+            "extracurricular": False,
+            "sleep_hours": 9,
+            "sample_papers": 1
+        }
+        views.prediction_cache.clear()
+        first = client.post('/api/predict/', data, format='json')
+        hits_before = views.prediction_cache.stats()['hits']
+        second = client.post('/api/predict/', data, format='json')
+        
+        self.assertEqual(first.data['predicted_performance_index'], second.data['predicted_performance_index'])
+        self.assertEqual(views.prediction_cache.stats()['hits'], hits_before + 1)
+        
+        metrics = client.get('/api/predict/metrics/')
+        self.assertEqual(metrics.status_code, status.HTTP_200_OK)
+        self.assertIn('cache', metrics.data)
+
+
+class MicroBatcherTestCase(TestCase):
+    """Test cases for coalescing concurrent predictions"""
+    
+    def setUp(self):
+        self.bundle = views.get_registry().get()
+        self.rows = [
+            {'hours_studied': h, 'previous_scores': 60 + h, 'extracurricular': h % 2,
+             'sleep_hours': 7, 'sample_papers': h}
+            for h in range(12)
+        ]
+    
+    def test_concurrent_rows_share_a_batch(self):
+        """Test that rows submitted within the window are scored together and correctly"""
+        batcher = MicroBatcher(window=0.2, max_batch_size=64)
+        try:
+            futures = []
+            threads = [
+                threading.Thread(target=lambda row=row: futures.append((row, batcher.submit(self.bundle, row))))
+                for row in self.rows
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            for row, future in futures:
+                expected = float(self.bundle.predict_rows([row])[0])
+                self.assertAlmostEqual(future.result(timeout=5), expected, places=6)
+            
+            stats = batcher.stats()
+            self.assertEqual(stats['rows_scored'], len(self.rows))
+            self.assertLess(stats['batches'], len(self.rows))
+            self.assertGreaterEqual(stats['max_queue_depth'], 1)
+        finally:
+            batcher.stop()
+    
+    def test_max_batch_size_closes_batch(self):
+        """Test that no batch exceeds max_batch_size"""
+        batcher = MicroBatcher(window=0.2, max_batch_size=4)
+        try:
+            futures = [batcher.submit(self.bundle, row) for row in self.rows]
+            for future in futures:
+                future.result(timeout=5)
+            self.assertLessEqual(batcher.stats()['largest_batch'], 4)
+        finally:
+            batcher.stop()
+    
+    def test_errors_reach_every_caller(self):
+        """Test that a failing model call raises in each waiting request"""
+        class BrokenBundle:
+            def predict_rows(self, rows, n_trees=None):
+                raise ValueError('broken')
+        
+        batcher = MicroBatcher(window=0.01, max_batch_size=8)
+        try:
+            with self.assertRaises(ValueError):
+                batcher.predict(BrokenBundle(), self.rows[0], timeout=5)
+            self.assertEqual(batcher.stats()['errors'], 1)
+        finally:
+            batcher.stop()
+    
+    def test_predict_endpoint_uses_batcher(self):
+        """Test that /api/predict/ goes through the batcher when it is enabled"""
+        batcher = MicroBatcher(window=0.001, max_batch_size=8)
+        previous, views.prediction_batcher = views.prediction_batcher, batcher
+        try:
+            views.prediction_cache.clear()
+            client = APIClient()
+            response = client.post('/api/predict/', {
+                "hours_studied": 4, "previous_scores": 66, "extracurricular": True,
+                "sleep_hours": 8, "sample_papers": 2
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(batcher.stats()['rows_scored'], 1)
+            
+            metrics = client.get('/api/predict/metrics/')
+            self.assertTrue(metrics.data['micro_batcher']['enabled'])
+        finally:
+            views.prediction_batcher = previous
+            batcher.stop()
+
+
+class ServingProfileTestCase(TestCase):
+    """Test cases for tree-count serving profiles"""
+    
+    def setUp(self):
+        self.bundle = views.get_registry().get()
+        self.client = APIClient()
+        self.data = {
+            "hours_studied": 6, "previous_scores": 72, "extracurricular": True,
+            "sleep_hours": 7, "sample_papers": 3
+        }
+        views.prediction_cache.clear()
+    
+    def test_choose_profiles_picks_smallest_prefix(self):
+        """Test that each profile gets the fewest trees within its tolerance"""
+        profiles = choose_profiles([10.0, 5.0, 4.1, 4.05, 4.0], {'fast': 0.05, 'balanced': 0.01, 'full': 0.0})
+        
+        self.assertEqual(profiles['fast']['n_trees'], 3)
+        self.assertEqual(profiles['balanced']['n_trees'], 5)
+        self.assertEqual(profiles['full']['n_trees'], 5)
+        self.assertAlmostEqual(profiles['fast']['mae_increase'], 0.1)
+    
+    def test_bundle_records_profiles(self):
+        """Test that the bundle manifest carries profiles and staged errors"""
+        profiles = self.bundle.profiles
+        
+        self.assertEqual(set(profiles), {'fast', 'balanced', 'full'})
+        self.assertLessEqual(profiles['fast']['n_trees'], profiles['balanced']['n_trees'])
+        self.assertEqual(profiles['full']['n_trees'], self.bundle.compiled.n_trees)
+        self.assertEqual(len(self.bundle.manifest['staged_errors']['test_mae']), self.bundle.compiled.n_trees)
+        self.assertEqual(self.bundle.serving_profile('full'), ('full', None))
+    
+    def test_fast_profile_uses_first_trees(self):
+        """Test that ?profile=fast scores with the profile's prefix of trees"""
+        n_trees = self.bundle.profiles['fast']['n_trees']
+        expected = round(float(self.bundle.predict_rows([self.data], n_trees=n_trees)[0]), 2)
+        
+        response = self.client.post('/api/predict/?profile=fast', self.data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['profile'], 'fast')
+        self.assertEqual(response.data['predicted_performance_index'], expected)
+    
+    def test_profiles_are_cached_separately(self):
+        """Test that a cached full prediction is not served for another profile"""
+        full = self.client.post('/api/predict/', self.data, format='json').data
+        fast = self.client.post('/api/predict/?profile=fast', self.data, format='json').data
+        
+        n_trees = self.bundle.profiles['fast']['n_trees']
+        self.assertEqual(full['profile'], 'full')
+        self.assertEqual(fast['predicted_performance_index'],
+                         round(float(self.bundle.predict_rows([self.data], n_trees=n_trees)[0]), 2))
+    
+    def test_batch_profile(self):
+        """Test that batch requests honour ?profile="""
+        n_trees = self.bundle.profiles['balanced']['n_trees']
+        response = self.client.post('/api/predict/batch/?profile=balanced', [self.data], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['profile'], 'balanced')
+        self.assertEqual(response.data['results'][0]['predicted_performance_index'],
+                         round(float(self.bundle.predict_rows([self.data], n_trees=n_trees)[0]), 2))
+    
+    def test_unknown_profile(self):
+        """Test that an unknown profile is rejected"""
+        response = self.client.post('/api/predict/?profile=turbo', self.data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fast', response.data['error'])
+    
+    def test_cube_bundle_reports_full_profile(self):
+        """Test that a bundle with a prediction cube serves and reports every profile as full"""
+        _, _, model, scaler = train_small_model(n_estimators=10)
+        compiled = CompiledEnsemble.from_sklearn(model, scaler)
+        profiles = {name: {'n_trees': n_trees} for name, n_trees in (('fast', 3), ('balanced', 6), ('full', 10))}
+        with tempfile.TemporaryDirectory() as root:
+            save_bundle(root, compiled, scaler, 'test-data-hash', cube_predict=compiled.predict, profiles=profiles)
+            previous = set_registry(ModelRegistry(root))
+            try:
+                bundle = views.get_registry().get()
+                self.assertIsNotNone(bundle.cube)
+                self.assertLess(bundle.profiles['fast']['n_trees'], 10)
+                self.assertEqual(bundle.serving_profile('fast'), ('full', None))
+                
+                response = self.client.post('/api/predict/?profile=fast', self.data, format='json')
+                self.assertEqual(response.data['profile'], 'full')
+                self.assertEqual(response.data['n_trees'], 10)
+                self.assertEqual(response.data['predicted_performance_index'],
+                                 round(float(bundle.predict_rows([self.data])[0]), 2))
+                
+                batch = self.client.post('/api/predict/batch/?profile=balanced', [self.data], format='json')
+                self.assertEqual((batch.data['profile'], batch.data['n_trees']), ('full', 10))
+                
+                profiles = self.client.get('/api/predict/metrics/').data['profiles']
+                self.assertEqual(profiles['fast']['n_trees'], 10)
+                self.assertEqual(profiles['fast']['served_as'], 'full')
+            finally:
+                set_registry(previous)
+
+
+class CompiledEnsembleTestCase(TestCase):
+    """Test cases for the array-based ensemble evaluator"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model on the engineered features once"""
+        super().setUpClass()
+        cls.features, cls.target, cls.model, cls.scaler = train_small_model()
+        cls.compiled = CompiledEnsemble.from_sklearn(cls.model, cls.scaler)
+    
+    def test_matches_sklearn_predict(self):
+        """Test that the compiled ensemble reproduces model.predict"""
+        expected = self.model.predict(self.scaler.transform(self.features))
+        
+        np.testing.assert_allclose(self.compiled.predict(self.features), expected, atol=1e-9)
+    
+    def test_truncated_matches_staged_predict(self):
+        """Test that evaluating the first n trees matches staged predictions"""
+        staged = list(self.model.staged_predict(self.scaler.transform(self.features)))
+        
+        np.testing.assert_allclose(self.compiled.predict(self.features, n_trees=10), staged[9], atol=1e-9)
+    
+    def test_arrays_round_trip(self):
+        """Test rebuilding the ensemble from its exported arrays"""
+        rebuilt = CompiledEnsemble.from_arrays(self.compiled.arrays(), self.compiled.baseline)
+        
+        np.testing.assert_array_equal(rebuilt.predict(self.features[:20]), self.compiled.predict(self.features[:20]))
+
+
+class ModelBundleTestCase(TestCase):
+    """Test cases for versioned model bundles"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model once"""
+        super().setUpClass()
+        cls.features, cls.target, cls.model, cls.scaler = train_small_model()
+    
+    def setUp(self):
+        """Create an empty bundle directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def save(self, **kwargs):
+        return save_bundle(
+            self.root, CompiledEnsemble.from_sklearn(self.model, self.scaler), self.scaler,
+            'test-data-hash', metrics={'test_mae': 1.0}, **kwargs
+        )
+    
+    def test_save_and_load_round_trip(self):
+        """Test that a loaded bundle reproduces the model from mmap arrays"""
+        version = self.save()
+        bundle = load_bundle(self.root)
+        
+        self.assertEqual(current_version(self.root), version)
+        self.assertEqual(bundle.version, version)
+        self.assertEqual(bundle.manifest['training_data_hash'], 'test-data-hash')
+        self.assertIsInstance(bundle.compiled.threshold, np.memmap)
+        np.testing.assert_allclose(
+            bundle.predict_features(self.features),
+            np.clip(self.model.predict(self.scaler.transform(self.features)), 0, 100),
+            atol=1e-9
+        )
+    
+    def test_version_is_content_addressed(self):
+        """Test that saving the same model twice yields the same version"""
+        self.assertEqual(self.save(), self.save())
+    
+    def test_missing_bundle_raises(self):
+        """Test loading from a directory without a current bundle"""
+        with self.assertRaises(BundleError):
+            load_bundle(self.root)
+        with self.assertRaises(BundleError):
+            set_current_version(self.root, 'does-not-exist')
+    
+    def test_mismatched_features_raise(self):
+        """Test that a bundle built for another feature order is rejected"""
+        version = self.save()
+        manifest_path = os.path.join(self.root, version, 'manifest.json')
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['feature_names'] = list(reversed(manifest['feature_names']))
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        
+        with self.assertRaises(BundleError):
+            load_bundle(self.root)
+    
+    def test_corrupt_array_raises(self):
+        """Test that an array not matching the manifest is rejected"""
+        version = self.save()
+        np.save(os.path.join(self.root, version, 'threshold.npy'), np.zeros(3))
+        
+        with self.assertRaises(BundleError):
+            load_bundle(self.root)
+    
+    def test_export_bundle_command_converts_pickles(self):
+        """Test that export_bundle turns an existing model.pkl into the CURRENT bundle"""
+        paths = {name: os.path.join(self.root, f'{name}.pkl') for name in ('model', 'scaler', 'features')}
+        joblib.dump(self.model, paths['model'])
+        joblib.dump(self.scaler, paths['scaler'])
+        joblib.dump(list(FEATURE_NAMES), paths['features'])
+        bundle_dir = os.path.join(self.root, 'bundles')
+        
+        call_command('export_bundle', model=paths['model'], scaler=paths['scaler'], features=paths['features'],
+                     bundle_dir=bundle_dir, no_cube=True, stdout=io.StringIO())
+        bundle = load_bundle(bundle_dir)
+        self.assertTrue(bundle.manifest['training_data_hash'].startswith('model.pkl:'))
+        np.testing.assert_allclose(
+            bundle.predict_features(self.features),
+            np.clip(self.model.predict(self.scaler.transform(self.features)), 0, 100),
+            atol=1e-9
+        )
+        
+        joblib.dump(list(reversed(FEATURE_NAMES)), paths['features'])
+        with self.assertRaises(CommandError):
+            call_command('export_bundle', model=paths['model'], scaler=paths['scaler'], features=paths['features'],
+                         bundle_dir=bundle_dir, no_cube=True)
+
+
+class ModelRegistryTestCase(TestCase):
+    """Test cases for hot reloading model bundles"""
+    
+    def setUp(self):
+        """Create a bundle directory with two model versions"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.new_version = save_small_bundle(self.root, n_estimators=20, make_current=False)
+        self.old_version = save_small_bundle(self.root)
+        self.registry = ModelRegistry(self.root)
+    
+    def tearDown(self):
+        self.registry.stop_watching()
+        self.tmpdir.cleanup()
+    
+    def test_reload_swaps_version(self):
+        """Test that reload serves the new CURRENT while old references stay usable"""
+        old_bundle = self.registry.get()
+        self.assertEqual(old_bundle.version, self.old_version)
+        
+        set_current_version(self.root, self.new_version)
+        self.registry.reload()
+        
+        self.assertEqual(self.registry.get().version, self.new_version)
+        self.assertEqual(self.registry.reloads, 1)
+        # An in-flight request holding the old bundle can still finish on it
+        self.assertEqual(old_bundle.predict_inputs(np.array([[6, 78, 1, 7, 3]])).shape, (1,))
+    
+    def test_failed_reload_keeps_old_version(self):
+        """Test that a broken bundle is never swapped in"""
+        self.registry.get()
+        np.save(os.path.join(self.root, self.new_version, 'value.npy'), np.zeros(3))
+        
+        with self.assertRaises(BundleError):
+            self.registry.promote(self.new_version)
+        
+        self.assertEqual(self.registry.version, self.old_version)
+        self.assertEqual(current_version(self.root), self.old_version)
+        self.assertEqual(self.registry.failed_reloads, 1)
+    
+    def test_failed_load_backs_off(self):
+        """Test that requests do not retry loading a missing bundle on every call"""
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root, retry_interval=60)
+            self.assertIsNone(registry.get())
+            self.assertIsNone(registry.get())
+            self.assertEqual(registry.failed_reloads, 1)
+            
+            save_small_bundle(root, n_estimators=5)
+            self.assertIsNone(registry.get())
+            registry._retry_at = 0
+            self.assertIsNotNone(registry.get())
+    
+    def test_promote_writes_current_before_swapping(self):
+        """Test that a promoted version is on disk by the time it is served"""
+        self.registry.get()
+        served = []
+        original_swap = self.registry._swap
+        
+        def swap(new):
+            served.append(current_version(self.root))
+            original_swap(new)
+        
+        self.registry._swap = swap
+        self.registry.promote(self.new_version)
+        self.assertEqual(served, [self.new_version])
+        # A watcher pass after the promotion keeps the new version
+        self.registry.reload()
+        self.assertEqual(self.registry.version, self.new_version)
+    
+    def test_watcher_picks_up_new_version(self):
+        """Test that the watcher reloads when CURRENT changes"""
+        self.registry.get()
+        self.registry.start_watching(0.02)
+        set_current_version(self.root, self.new_version)
+        
+        deadline = time.time() + 5
+        while self.registry.version != self.new_version and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.registry.version, self.new_version)
+    
+    def test_reload_endpoint_requires_admin(self):
+        """Test that only admins can trigger a reload"""
+        client = APIClient()
+        response = client.post('/api/model/reload/', {}, format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+    
+    def test_reload_endpoint_promotes_version(self):
+        """Test promoting a version through the admin endpoint"""
+        previous = set_registry(self.registry)
+        try:
+            client = APIClient()
+            client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+            response = client.post('/api/model/reload/', {'version': self.new_version}, format='json')
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['model_version'], self.new_version)
+            self.assertEqual(current_version(self.root), self.new_version)
+            
+            prediction = client.post('/api/predict/', {
+                "hours_studied": 6, "previous_scores": 78, "extracurricular": True,
+                "sleep_hours": 7, "sample_papers": 3
+            }, format='json')
+            self.assertEqual(prediction.data['model_version'], self.new_version)
+        finally:
+            set_registry(previous)
+
+
+class ColdStartTestCase(TestCase):
+    """Test cases for lazy imports and the startup warm-up hook"""
+    
+    def test_views_import_without_numpy(self):
+        """Test that importing the views does not pull in NumPy or the model stack"""
+        code = (
+            'import django, os, sys\n'
+            'os.environ.setdefault("DJANGO_SETTINGS_MODULE", "student_ml.settings")\n'
+            'django.setup()\n'
+            'import performance.views\n'
+            'print(sorted(m for m in ("numpy", "pandas", "sklearn", "joblib") if m in sys.modules))\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            env=dict(os.environ, MODEL_WARMUP='0'), cwd=os.path.dirname(os.path.dirname(__file__))
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '[]')
+    
+    def test_ready_warms_up_registry(self):
+        """Test that AppConfig.ready loads the bundle when MODEL_WARMUP is on"""
+        import performance
+        
+        with tempfile.TemporaryDirectory() as root:
+            version = save_small_bundle(root)
+            registry = ModelRegistry(root)
+            previous = set_registry(registry)
+            try:
+                config = PerformanceConfig('performance', performance)
+                with self.settings(MODEL_WARMUP=False):
+                    config.ready()
+                self.assertIsNone(registry.version)
+                with self.settings(MODEL_WARMUP=True):
+                    config.ready()
+                self.assertEqual(registry.version, version)
+            finally:
+                set_registry(previous)
+
+
+class AsyncAPITestCase(TestCase):
+    """Test cases for the async endpoints and the bounded executor"""
+    
+    def setUp(self):
+        self.client = AsyncClient()
+        self.data = {
+            "hours_studied": 6, "previous_scores": 78, "extracurricular": True,
+            "sleep_hours": 7, "sample_papers": 3
+        }
+        StudentPerformance.objects.create(
+            hours_studied=5, previous_scores=70, extracurricular=True,
+            sleep_hours=7, sample_papers=2, performance_index=66.0
+        )
+    
+    async def test_async_predict_matches_sync(self):
+        """Test that the async endpoint returns the same prediction as the sync one"""
+        response = await self.client.post('/api/async/predict/', self.data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        expected = views.get_registry().get().predict_rows([{**self.data, 'extracurricular': 1}])[0]
+        self.assertAlmostEqual(response.json()['predicted_performance_index'], round(float(expected), 2))
+        self.assertIn('model_version', response.json())
+    
+    async def test_async_predict_validation(self):
+        """Test that invalid inputs are rejected like the sync endpoint"""
+        response = await self.client.post(
+            '/api/async/predict/', {**self.data, 'hours_studied': 20, 'sleep_hours': 8}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('exceeds 24 hours', response.json()['error'])
+        
+        response = await self.client.post('/api/async/predict/', 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    async def test_async_views_stay_coroutines(self):
+        """Test that method and CSRF handling keep the views async (Django 4.2 wraps them in sync functions)"""
+        from asgiref.sync import iscoroutinefunction
+        from . import async_views
+        
+        for view in (async_views.predict_performance, async_views.predict_batch, async_views.get_all_records,
+                     async_views.get_record_by_id, async_views.get_statistics):
+            self.assertTrue(iscoroutinefunction(view), view.__name__)
+        self.assertTrue(async_views.predict_performance.csrf_exempt)
+        
+        response = await self.client.get('/api/async/predict/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        response = await self.client.post('/api/async/statistics/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    async def test_async_batch(self):
+        """Test batch scoring through the executor"""
+        response = await self.client.post(
+            '/api/async/predict/batch/', [self.data, {**self.data, 'sample_papers': 99}], content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['succeeded'], 1)
+        self.assertEqual(response.json()['failed'], 1)
+    
+    async def test_async_read_endpoints(self):
+        """Test the async records and statistics endpoints"""
+        records = await self.client.get('/api/async/records/')
+        self.assertEqual(records.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(records.json()['results']), 1)
+        
+        record = await self.client.get(f'/api/async/records/{records.json()["results"][0]["id"]}/')
+        self.assertEqual(record.status_code, status.HTTP_200_OK)
+        missing = await self.client.get('/api/async/records/9999/')
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        
+        stats = await self.client.get('/api/async/statistics/')
+        self.assertEqual(stats.status_code, status.HTTP_200_OK)
+        self.assertEqual(stats.json()['total_records'], 1)
+    
+    def test_executor_rejects_when_full(self):
+        """Test that the executor refuses work beyond max_pending"""
+        executor = BoundedExecutor(workers=1, max_pending=1)
+        release = threading.Event()
+        
+        async def scenario():
+            first = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorBusy):
+                await executor.run(time.time)
+            release.set()
+            await first
+        
+        try:
+            asyncio.run(scenario())
+            self.assertEqual(executor.stats()['rejected'], 1)
+            self.assertEqual(executor.stats()['pending'], 0)
+        finally:
+            executor.shutdown()
+    
+    def test_cancelled_job_stays_pending_until_done(self):
+        """Test that cancelling the awaiting request does not free the slot of a running job"""
+        executor = BoundedExecutor(workers=1, max_pending=1)
+        release = threading.Event()
+        
+        async def scenario():
+            first = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await asyncio.sleep(0.05)
+            self.assertEqual(executor.stats()['pending'], 1)
+            with self.assertRaises(ExecutorBusy):
+                await executor.run(time.time)
+            release.set()
+            deadline = time.monotonic() + 5
+            while executor.stats()['pending'] and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        
+        try:
+            asyncio.run(scenario())
+            self.assertEqual(executor.stats()['pending'], 0)
+            self.assertEqual(executor.stats()['completed'], 1)
+        finally:
+            executor.shutdown()
+
+
+class ScoreCsvCommandTestCase(TestCase):
+    """Test cases for the offline score_csv management command"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmpdir.name, 'scored.csv')
+        self.bundle = views.get_registry().get()
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def score(self, source, **options):
+        out = io.StringIO()
+        call_command('score_csv', source, self.output, bundle_dir=_fixture_dir.name, stdout=out, **options)
+        return out.getvalue()
+    
+    def test_scores_in_order_with_process_pool(self):
+        """Test that chunks scored by worker processes come back in input order"""
+        import pandas as pd
+        
+        summary = self.score('dataset.csv', chunk_size=4, workers=2)
+        self.assertIn('throughput', summary)
+        
+        source = pd.read_csv('dataset.csv')
+        scored = pd.read_csv(self.output)
+        inputs = np.column_stack([
+            source['Hours Studied'], source['Previous Scores'], (source['Extracurricular Activities'] == 'Yes').astype(int),
+            source['Sleep Hours'], source['Sample Question Papers Practiced'],
+        ])
+        self.assertEqual(len(scored), len(source))
+        np.testing.assert_allclose(scored['Predicted Performance Index'], np.round(self.bundle.predict_inputs(inputs), 2))
+        self.assertTrue(scored['Error'].isna().all())
+    
+    def test_invalid_rows_are_reported(self):
+        """Test that unparseable and out-of-range rows get an error instead of a prediction"""
+        source = os.path.join(self.tmpdir.name, 'input.csv')
+        with open(source, 'w') as f:
+            f.write('Hours Studied,Previous Scores,Extracurricular Activities,Sleep Hours,Sample Question Papers Practiced\n')
+            f.write('5,70,Yes,7,2\nabc,70,Yes,7,2\n20,70,No,8,2\n5,70,Maybe,7,2\n')
+        
+        summary = self.score(source, workers=0)
+        self.assertIn('failed:      3', summary)
+        
+        with open(self.output) as f:
+            lines = f.read().strip().split('\n')[1:]
+        self.assertTrue(lines[0].split(',')[-1] == '')
+        self.assertIn('must be an integer', lines[1])
+        self.assertIn('exceeds 24', lines[2])
+        self.assertIn('must be Yes/No', lines[3])
+    
+    @skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_output_with_errors_after_a_clean_chunk(self):
+        """Test that a Parquet file accepts error rows after a first chunk without any"""
+        import pandas as pd
+        
+        source = os.path.join(self.tmpdir.name, 'input.csv')
+        with open(source, 'w') as f:
+            f.write('Hours Studied,Previous Scores,Extracurricular Activities,Sleep Hours,Sample Question Papers Practiced\n')
+            f.write('5,70,Yes,7,2\n6,80,No,7,3\n7,90,Yes,8,4\n')
+            f.write('30,70,Yes,7,2\n5,170,No,7,2\n5,70,Yes,7,99\n')
+        self.output = os.path.join(self.tmpdir.name, 'scored.parquet')
+        
+        self.score(source, chunk_size=3, workers=0)
+        scored = pd.read_parquet(self.output)
+        self.assertEqual(len(scored), 6)
+        self.assertTrue(scored['Error'][:3].isna().all())
+        self.assertTrue(scored['Error'][3:].notna().all())
+        self.assertTrue(scored['Predicted Performance Index'][3:].isna().all())
+    
+    def test_missing_columns(self):
+        """Test that an input without the dataset.csv columns is rejected"""
+        source = os.path.join(self.tmpdir.name, 'input.csv')
+        with open(source, 'w') as f:
+            f.write('a,b\n1,2\n')
+        with self.assertRaises(CommandError):
+            self.score(source, workers=0)
+
+
+class ShadowScoringTestCase(TestCase):
+    """Test cases for shadow (challenger) scoring"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.shadow_version = save_small_bundle(_fixture_dir.name, n_estimators=20, make_current=False)
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.data = {
+            "hours_studied": 6, "previous_scores": 78, "extracurricular": True,
+            "sleep_hours": 7, "sample_papers": 3
+        }
+    
+    def test_requests_are_recorded_in_batches(self):
+        """Test that served requests are queued, then scored and stored together"""
+        scorer = ShadowScorer(_fixture_dir.name, self.shadow_version, batch_size=10)
+        previous = replace_shadow(scorer)
+        try:
+            views.prediction_cache.clear()
+            for papers in range(3):
+                response = self.client.post('/api/predict/', {**self.data, 'sample_papers': papers}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            
+            # Nothing is written on the request path
+            self.assertEqual(ShadowPrediction.objects.count(), 0)
+            self.assertEqual(scorer.status()['queue_depth'], 3)
+            
+            self.assertEqual(scorer.flush(), 3)
+            self.assertEqual(ShadowPrediction.objects.count(), 3)
+            
+            record = ShadowPrediction.objects.get(sample_papers=1)
+            shadow_bundle = load_bundle(_fixture_dir.name, self.shadow_version)
+            expected = shadow_bundle.predict_rows([{**self.data, 'sample_papers': 1}])[0]
+            self.assertEqual(record.shadow_prediction, round(float(expected), 2))
+            self.assertEqual(record.primary_version, views.get_registry().version)
+            self.assertEqual(scorer.status()['recorded'], 3)
+        finally:
+            replace_shadow(previous)
+    
+    async def test_async_predict_feeds_shadow(self):
+        """Test that the async predict endpoint queues requests for the shadow model too"""
+        scorer = ShadowScorer(_fixture_dir.name, self.shadow_version)
+        previous = replace_shadow(scorer)
+        try:
+            response = await AsyncClient().post('/api/async/predict/', self.data, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(scorer.status()['queue_depth'], 1)
+            row, primary_version, primary_prediction = scorer._queue.get_nowait()
+            self.assertEqual(primary_prediction, response.json()['predicted_performance_index'])
+            self.assertEqual(primary_version, response.json()['model_version'])
+        finally:
+            replace_shadow(previous)
+    
+    async def test_truncated_profiles_are_not_shadowed(self):
+        """Test that only full-model predictions are queued for the shadow model"""
+        bundle = views.get_registry().get()
+        self.assertIsNotNone(bundle.serving_profile('fast')[1])
+        scorer = ShadowScorer(_fixture_dir.name, self.shadow_version)
+        previous = replace_shadow(scorer)
+        try:
+            client = AsyncClient()
+            for path in ('/api/predict/?profile=fast', '/api/async/predict/?profile=fast'):
+                response = await client.post(path, self.data, content_type='application/json')
+                self.assertEqual(response.json()['profile'], 'fast')
+            self.assertEqual(scorer.status()['queue_depth'], 0)
+    
+            response = await client.post('/api/predict/?profile=full', self.data, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(scorer.status()['queue_depth'], 1)
+        finally:
+            replace_shadow(previous)
+    
+    def test_full_queue_drops_without_blocking(self):
+        """Test that overflow is counted instead of blocking the request"""
+        scorer = ShadowScorer(_fixture_dir.name, self.shadow_version, queue_size=1)
+        self.assertTrue(scorer.submit(self.data, 'v1', 50.0))
+        self.assertFalse(scorer.submit(self.data, 'v1', 50.0))
+        self.assertEqual(scorer.status()['dropped'], 1)
+    
+    def test_shadow_endpoint(self):
+        """Test enabling and disabling shadow mode through the admin endpoint"""
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        previous = replace_shadow(None)
+        try:
+            response = self.client.post('/api/model/shadow/', {'version': self.shadow_version}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['shadow']['shadow_version'], self.shadow_version)
+            
+            bad = self.client.post('/api/model/shadow/', {'version': 'missing'}, format='json')
+            self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+            
+            response = self.client.post('/api/model/shadow/', {'version': None}, format='json')
+            self.assertFalse(response.data['shadow']['enabled'])
+        finally:
+            replace_shadow(previous)
+
+
+class PredictionLogTestCase(TestCase):
+    """Test cases for the buffered prediction log"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.data = {
+            "hours_studied": 6, "previous_scores": 78, "extracurricular": True,
+            "sleep_hours": 7, "sample_papers": 3
+        }
+        self.writer = PredictionLogWriter(batch_size=2)
+        self.previous = replace_prediction_log(self.writer)
+        views.prediction_cache.clear()
+    
+    def tearDown(self):
+        replace_prediction_log(self.previous)
+    
+    def test_requests_are_written_in_batches(self):
+        """Test that served predictions are buffered, then written with bulk_create"""
+        for papers in range(3):
+            response = self.client.post('/api/predict/', {**self.data, 'sample_papers': papers}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # Nothing is written on the request path
+        self.assertEqual(PredictionLog.objects.count(), 0)
+        self.assertEqual(self.writer.status()['queue_depth'], 3)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(self.writer.flush(), 1)
+        self.assertEqual(self.writer.flush(), 0)
+        
+        log = PredictionLog.objects.get(sample_papers=1)
+        bundle = views.get_registry().get()
+        self.assertEqual(log.predicted_performance_index, round(float(bundle.predict_rows([{**self.data, 'sample_papers': 1}])[0]), 2))
+        self.assertEqual(log.model_version, bundle.version)
+        self.assertEqual(log.profile, 'full')
+        self.assertEqual(self.writer.status()['written'], 3)
+        self.assertEqual(self.writer.status()['flushes'], 2)
+    
+    def test_full_buffer_drops_without_blocking(self):
+        """Test that overflow is counted instead of blocking the request"""
+        writer = PredictionLogWriter(queue_size=1)
+        self.assertTrue(writer.submit(self.data, 'v1', 'full', 50.0))
+        self.assertFalse(writer.submit(self.data, 'v1', 'full', 50.0))
+        self.assertEqual(writer.status()['dropped'], 1)
+    
+    def test_invalid_requests_are_not_logged(self):
+        """Test that rejected inputs never reach the log"""
+        self.client.post('/api/predict/', {**self.data, 'hours_studied': 20, 'sleep_hours': 10}, format='json')
+        self.assertEqual(self.writer.status()['submitted'], 0)
+    
+    def test_background_writer_flushes_on_interval(self):
+        """Test that the writer thread flushes a partial batch after flush_interval"""
+        writer = PredictionLogWriter(batch_size=100, flush_interval=0.05)
+        written = []
+        # Record batches in memory; the thread has its own database connection
+        writer._record = written.append
+        writer.submit(self.data, 'v1', 'fast', 50.0)
+        writer.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not written and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.stop()
+        self.assertEqual([len(batch) for batch in written], [1])
+    
+    def test_idle_writer_blocks_until_stopped(self):
+        """Test that an idle writer thread blocks on the queue and stop() wakes it at once"""
+        writer = PredictionLogWriter(flush_interval=60)
+        written = []
+        writer._record = written.append
+        writer.start()
+        started = time.monotonic()
+        writer.stop()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(writer._worker.is_alive())
+        self.assertEqual(written, [])
+    
+    def test_metrics_report_log(self):
+        """Test that the metrics endpoint reports the log writer"""
+        self.client.post('/api/predict/', self.data, format='json')
+        metrics = self.client.get('/api/predict/metrics/')
+        self.assertEqual(metrics.data['prediction_log']['submitted'], 1)
+
+
 class StudentPerformanceModelTestCase(TestCase):
     """Test cases for StudentPerformance model"""
     
@@ -97,6 +1485,55 @@ class StudentPerformanceModelTestCase(TestCase):
         self.assertEqual(str(self.record), expected_str)
 
 
+class RescoringTestCase(TestCase):
+    """Test cases for storing predictions on records"""
+    
+    def setUp(self):
+        self.bundle = views.get_registry().get()
+        for i in range(5):
+            StudentPerformance.objects.create(
+                hours_studied=3 + i, previous_scores=60 + i, extracurricular=bool(i % 2),
+                sleep_hours=7, sample_papers=i, performance_index=60.0 + i
+            )
+    
+    def test_rescore_stores_predictions(self):
+        """Test that every record gets the bundle's prediction and version"""
+        summary = rescore_records(self.bundle, batch_size=2)
+        self.assertEqual(summary['scored'], 5)
+        self.assertEqual(summary['batches'], 3)
+        
+        for record in StudentPerformance.objects.all():
+            inputs = np.array([[record.hours_studied, record.previous_scores, int(record.extracurricular),
+                                record.sleep_hours, record.sample_papers]])
+            expected = round(float(self.bundle.predict_features(build_features(inputs))[0]), 2)
+            self.assertEqual(record.predicted_performance_index, expected)
+            self.assertEqual(record.prediction_model_version, self.bundle.version)
+            self.assertIsNotNone(record.predicted_at)
+    
+    def test_rescore_is_incremental(self):
+        """Test that only new records or records from older versions are rescored"""
+        rescore_records(self.bundle)
+        self.assertEqual(rescore_records(self.bundle)['scored'], 0)
+        
+        StudentPerformance.objects.create(
+            hours_studied=4, previous_scores=80, extracurricular=True,
+            sleep_hours=8, sample_papers=2, performance_index=70.0
+        )
+        StudentPerformance.objects.filter(pk=StudentPerformance.objects.order_by('id').first().pk).update(
+            prediction_model_version='old-version'
+        )
+        self.assertEqual(rescore_records(self.bundle)['scored'], 2)
+    
+    def test_rescore_command(self):
+        """Test the rescore_records management command"""
+        out = io.StringIO()
+        call_command('rescore_records', bundle_dir=_fixture_dir.name, stdout=out)
+        self.assertIn('Scored 5 records', out.getvalue())
+        
+        response = APIClient().get('/api/records/')
+        self.assertEqual(response.data['results'][0]['prediction_model_version'], self.bundle.version)
+
+
 class RecordsAPITestCase(TestCase):
     """Test cases for records endpoints"""
     
@@ -120,7 +1557,45 @@ class RecordsAPITestCase(TestCase):
         response = self.client.get('/api/records/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['next_cursor'])
+    
+    def test_cursor_pagination_walks_every_record_once(self):
+        """Test that following next cursors visits each record once, newest first"""
+        # Records sharing a timestamp are ordered by id
+        StudentPerformance.objects.filter(id__in=StudentPerformance.objects.values('id')[:2]).update(
+            created_at=StudentPerformance.objects.first().created_at
+        )
+        expected = list(StudentPerformance.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        
+        seen = []
+        url = '/api/records/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(record['id'] for record in response.data['results'])
+            url = response.data['next']
+        
+        self.assertEqual(seen, expected)
+    
+    def test_deep_page_is_one_indexed_query(self):
+        """Test that a later page is a single range query with no OFFSET"""
+        first = self.client.get('/api/records/?page_size=1')
+        cursor = first.data['next_cursor']
+        
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(f'/api/records/?page_size=1&cursor={cursor}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('OFFSET', queries.captured_queries[0]['sql'].upper())
+    
+    def test_invalid_cursor_and_page_size(self):
+        """Test that malformed pagination parameters are rejected"""
+        self.assertEqual(self.client.get('/api/records/?cursor=not-a-cursor').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/records/?page_size=0').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/records/?page_size=ten')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'page_size must be an integer')
     
     def test_get_record_by_id(self):
         """Test retrieving specific record"""
@@ -137,6 +1612,71 @@ class RecordsAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class QueryPlanTestCase(TestCase):
+    """Query-plan regression tests: hot queries must use an index, not a full scan"""
+    
+    def setUp(self):
+        for i in range(5):
+            StudentPerformance.objects.create(
+                hours_studied=i, previous_scores=70, extracurricular=False,
+                sleep_hours=7, sample_papers=2, performance_index=60.0 + i
+            )
+    
+    def query_plan(self, queryset):
+        """Return the detail column of EXPLAIN QUERY PLAN for a queryset"""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+    
+    def assertUsesIndex(self, queryset, index):
+        plan = self.query_plan(queryset)
+        self.assertTrue(any(index in step for step in plan), plan)
+        for step in plan:
+            self.assertFalse(step.startswith('SCAN') and 'USING' not in step, f'Full table scan: {plan}')
+            self.assertNotIn('TEMP B-TREE', step, f'Sort without an index: {plan}')
+    
+    def test_default_ordering_uses_index(self):
+        """Test that the -created_at listing reads the index in order"""
+        self.assertUsesIndex(StudentPerformance.objects.all()[:10], 'perf_created_id_idx')
+    
+    def test_keyset_page_seeks_index(self):
+        """Test that a later records page searches the index from the cursor"""
+        cursor = encode_cursor(StudentPerformance.objects.order_by('-created_at', 'id')[2])
+        plan = self.query_plan(keyset_page(StudentPerformance.objects.all(), cursor, 10))
+        
+        self.assertTrue(any(step.startswith('SEARCH') and 'perf_created_id_idx' in step for step in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+    
+    def test_load_data_duplicate_check_uses_index(self):
+        """Test that load_data's per-row duplicate lookup is an index search"""
+        queryset = StudentPerformance.objects.filter(
+            hours_studied=3, previous_scores=70, performance_index=63.0
+        ).order_by()
+        self.assertUsesIndex(queryset, 'perf_dedup_idx')
+    
+    def test_rescoring_batch_uses_primary_key(self):
+        """Test that each rescoring batch is a primary-key range read"""
+        queryset = stale_records('v1').filter(id__gt=2).order_by('id')[:100]
+        self.assertUsesIndex(queryset, 'PRIMARY KEY')
+    
+    def test_grouped_statistics_use_covering_index(self):
+        """Test that grouped statistics scan the covering index, in order for extracurricular"""
+        rows = StudentPerformance.objects.order_by().values('extracurricular').annotate(n=Count('id'))
+        self.assertUsesIndex(rows, 'COVERING INDEX perf_group_idx')
+    
+    def test_trend_range_uses_index(self):
+        """Test that a trend bucket's created_at range is an index search"""
+        queryset = StudentPerformance.objects.order_by().filter(created_at__gte=timezone.now() - timedelta(days=7))
+        plan = self.query_plan(queryset.values('performance_index'))
+        self.assertTrue(any(step.startswith('SEARCH') and 'perf_created_id_idx' in step for step in plan), plan)
+    
+    def test_prediction_log_recent_uses_index(self):
+        """Test that the newest prediction logs are read from the created_at index"""
+        self.assertUsesIndex(PredictionLog.objects.all()[:50], 'created_at')
+
+
 class StatisticsAPITestCase(TestCase):
     """Test cases for statistics endpoint"""
     
@@ -163,3 +1703,371 @@ class StatisticsAPITestCase(TestCase):
         self.assertIn('average_performance', response.data)
         self.assertIn('max_performance', response.data)
         self.assertIn('min_performance', response.data)
+    
+    def test_statistics_values(self):
+        """Test that every numeric field is summarized correctly"""
+        response = self.client.get('/api/statistics/')
+        
+        self.assertEqual(response.data['total_records'], 2)
+        self.assertEqual(response.data['average_performance'], 75.0)
+        self.assertEqual(response.data['max_performance'], 85.0)
+        self.assertEqual(response.data['min_performance'], 65.0)
+        self.assertEqual(response.data['average_hours_studied'], 6.5)
+        self.assertEqual(response.data['average_sleep_hours'], 7.0)
+        self.assertEqual(response.data['extracurricular_rate'], 0.5)
+        self.assertEqual(response.data['fields']['previous_scores'], {'count': 2, 'average': 80.0, 'min': 70, 'max': 90, 'std': 10.0})
+        self.assertEqual(response.data['fields']['predicted_performance_index']['count'], 0)
+        self.assertIsNone(response.data['fields']['predicted_performance_index']['average'])
+    
+    def test_statistics_single_query(self):
+        """Test that statistics are computed in one database query"""
+        with self.assertNumQueries(1):
+            self.client.get('/api/statistics/')
+    
+    def test_statistics_empty(self):
+        """Test statistics without records"""
+        StudentPerformance.objects.all().delete()
+        response = self.client.get('/api/statistics/')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RunningStatisticsTestCase(TestCase):
+    """Test cases for the incrementally maintained statistics row"""
+    
+    def make_record(self, i):
+        return StudentPerformance(
+            hours_studied=i % 10, previous_scores=40 + i % 60, extracurricular=bool(i % 3),
+            sleep_hours=4 + i % 6, sample_papers=i % 9, performance_index=20.0 + (i * 7) % 80
+        )
+    
+    def assertMatchesTable(self):
+        """The statistics row must agree with a fresh aggregate over the table"""
+        self.assertEqual(statistics_differences(materialized_statistics(), aggregate_statistics()), [])
+    
+    def test_merge_and_subtract_match_direct_summary(self):
+        """Test Welford merge and removal against summaries computed directly"""
+        rng = np.random.default_rng(0)
+        values = list(rng.normal(70, 15, 500))
+        merged = merge(summarize(values[:123]), summarize(values[123:]))
+        remaining = subtract(summarize(values), summarize(values[400:]))
+        
+        for summary, expected in ((merged, values), (remaining, values[:400])):
+            self.assertEqual(summary['count'], len(expected))
+            self.assertAlmostEqual(summary['mean'], np.mean(expected), places=9)
+            self.assertAlmostEqual(summary['m2'] / len(expected), np.var(expected), places=6)
+    
+    def test_create_record_updates_row(self):
+        """Test that /api/records/create/ updates the row and statistics stay one read"""
+        response = APIClient().post('/api/records/create/', {
+            'hours_studied': 7, 'previous_scores': 85, 'extracurricular': True,
+            'sleep_hours': 8, 'sample_papers': 4, 'performance_index': 82.5
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        row = RecordStatistics.objects.get()
+        self.assertEqual(row.total_records, 1)
+        self.assertEqual(row.fields['performance_index']['max'], 82.5)
+        with self.assertNumQueries(1):
+            stats = APIClient().get('/api/statistics/')
+        self.assertEqual(stats.data['average_performance'], 82.5)
+    
+    def test_saves_bulk_loads_and_deletes(self):
+        """Test that every write path keeps the row equal to the table"""
+        bulk_create_records([self.make_record(i) for i in range(200)])
+        self.assertMatchesTable()
+        
+        record = StudentPerformance.objects.order_by('id').first()
+        record.performance_index = 99.5
+        record.save()
+        self.assertMatchesTable()
+        
+        # Deleting the maximum makes it stale; the next read recomputes it
+        record.delete()
+        self.assertMatchesTable()
+        
+        StudentPerformance.objects.filter(hours_studied__lt=3).delete()
+        self.assertMatchesTable()
+        self.assertEqual(RecordStatistics.objects.get().total_records, StudentPerformance.objects.count())
+    
+    def test_batched_changes_apply_once(self):
+        """Test that a mass delete updates the row once, not per record"""
+        bulk_create_records([self.make_record(i) for i in range(50)])
+        
+        with batched_changes():
+            StudentPerformance.objects.filter(sleep_hours=5).delete()
+        
+        self.assertMatchesTable()
+    
+    def test_rescoring_updates_predictions(self):
+        """Test that rescoring updates the stored-prediction statistics"""
+        bulk_create_records([self.make_record(i) for i in range(20)])
+        rescore_records(views.get_registry().get())
+        
+        self.assertEqual(materialized_statistics()['fields']['predicted_performance_index']['count'], 20)
+        self.assertMatchesTable()
+    
+    def test_rebuild_stats_command(self):
+        """Test that rebuild_stats detects drift and repairs the row"""
+        bulk_create_records([self.make_record(i) for i in range(30)])
+        StudentPerformance.objects.filter(hours_studied=1).update(performance_index=0.0)
+        
+        with self.assertRaises(CommandError):
+            call_command('rebuild_stats', check=True, stdout=io.StringIO())
+        
+        out = io.StringIO()
+        call_command('rebuild_stats', stdout=out)
+        self.assertIn('Rebuilt statistics over 30 records', out.getvalue())
+        self.assertMatchesTable()
+        call_command('rebuild_stats', check=True, stdout=io.StringIO())
+    
+    def test_rebuild_stats_check_does_not_write(self):
+        """Test that rebuild_stats --check leaves stale bounds for the next read"""
+        bulk_create_records([self.make_record(i) for i in range(30)])
+        StudentPerformance.objects.order_by('-performance_index').first().delete()
+        before = RecordStatistics.objects.get()
+        self.assertTrue(before.fields['performance_index']['stale_bounds'])
+        
+        call_command('rebuild_stats', check=True, stdout=io.StringIO())
+        
+        after = RecordStatistics.objects.get()
+        self.assertEqual((after.fields, after.generation, after.updated_at), (before.fields, before.generation, before.updated_at))
+    
+    def test_migration_backfill_matches_compute_statistics(self):
+        """Test that the frozen 0007/0008 backfills build the same row as compute_statistics"""
+        from django.apps import apps
+        from importlib import import_module
+        
+        bulk_create_records([self.make_record(i) for i in range(30)])
+        RecordStatistics.objects.all().delete()
+        import_module('performance.migrations.0007_record_statistics').build_statistics(apps, None)
+        
+        row = RecordStatistics.objects.get()
+        expected = compute_statistics(StudentPerformance.objects.all())
+        self.assertEqual((row.total_records, row.extracurricular_count), (30, expected['extracurricular_count']))
+        for field, summary in expected['fields'].items():
+            self.assertEqual(row.fields[field]['count'], summary['count'])
+            self.assertAlmostEqual(row.fields[field]['mean'], summary['mean'])
+            self.assertAlmostEqual(row.fields[field]['m2'], summary['m2'])
+        
+        import_module('performance.migrations.0008_statistics_histograms').build_histograms(apps, None)
+        self.assertEqual(RecordStatistics.objects.get().histograms, expected['histograms'])
+
+
+class DistributionStatisticsTestCase(TestCase):
+    """Test cases for histogram percentiles and /api/statistics/distribution/"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        rng = np.random.default_rng(1)
+        self.hours = rng.integers(0, 13, 300)
+        self.performance = np.round(rng.uniform(10, 100, 300), 1)
+        bulk_create_records([
+            StudentPerformance(
+                hours_studied=int(hours), previous_scores=70, extracurricular=False,
+                sleep_hours=7, sample_papers=2, performance_index=float(performance)
+            )
+            for hours, performance in zip(self.hours, self.performance)
+        ])
+    
+    def test_discrete_percentiles_are_exact(self):
+        """Test that integer fields give the same percentiles as sorting"""
+        histogram = add_values(empty_histogram('hours_studied'), 'hours_studied', self.hours.tolist())
+        for q in (5, 25, 50, 90, 100):
+            self.assertEqual(percentile(histogram, 'hours_studied', q), np.percentile(self.hours, q, method='inverted_cdf'))
+    
+    def test_continuous_percentiles_within_a_bin(self):
+        """Test that performance percentiles are within one bin width of the exact values"""
+        histogram = add_values(empty_histogram('performance_index'), 'performance_index', self.performance.tolist())
+        for q in (10, 50, 75, 95):
+            self.assertAlmostEqual(percentile(histogram, 'performance_index', q), np.percentile(self.performance, q), delta=0.5)
+    
+    def test_out_of_range_values(self):
+        """Test that values outside the bins are counted at the edges"""
+        histogram = add_values(empty_histogram('performance_index'), 'performance_index', [-5.0, 100.0, 120.0])
+        self.assertEqual((histogram['underflow'], histogram['overflow'], histogram['counts'][-1]), (1, 1, 1))
+        self.assertEqual(percentile(histogram, 'performance_index', 0), 0)
+    
+    def test_distribution_endpoint(self):
+        """Test the distribution endpoint and its incremental updates"""
+        response = self.client.get('/api/statistics/distribution/?fields=hours_studied,performance_index&percentiles=50,90')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['fields']), {'hours_studied', 'performance_index'})
+        hours = response.data['fields']['hours_studied']
+        self.assertEqual(hours['count'], 300)
+        self.assertEqual(hours['median'], np.percentile(self.hours, 50, method='inverted_cdf'))
+        self.assertEqual(set(hours['percentiles']), {'p50', 'p90'})
+        self.assertEqual(sum(hours['histogram']['counts']), 300)
+        
+        StudentPerformance.objects.filter(hours_studied__gte=6).delete()
+        response = self.client.get('/api/statistics/distribution/?fields=hours_studied')
+        self.assertEqual(response.data['fields']['hours_studied']['percentiles']['p95'], 5)
+        call_command('rebuild_stats', check=True, stdout=io.StringIO())
+    
+    def test_median_in_statistics(self):
+        """Test that /api/statistics/ reports the median performance"""
+        response = self.client.get('/api/statistics/')
+        self.assertAlmostEqual(response.data['median_performance'], np.median(self.performance), delta=0.5)
+    
+    def test_invalid_parameters(self):
+        """Test that unknown fields and bad percentiles are rejected"""
+        self.assertEqual(self.client.get('/api/statistics/distribution/?fields=shoe_size').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/statistics/distribution/?percentiles=150').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/statistics/distribution/?percentiles=half').status_code, status.HTTP_400_BAD_REQUEST)
+        
+        StudentPerformance.objects.all().delete()
+        self.assertEqual(self.client.get('/api/statistics/distribution/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GroupStatisticsTestCase(TestCase):
+    """Test cases for /api/statistics/groups/"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        views.group_statistics_cache.clear()
+        bulk_create_records([
+            StudentPerformance(
+                hours_studied=i % 10, previous_scores=50 + i % 50, extracurricular=bool(i % 2),
+                sleep_hours=4 + i % 6, sample_papers=i % 5, performance_index=float(30 + i % 70)
+            )
+            for i in range(120)
+        ])
+    
+    def test_group_by_extracurricular(self):
+        """Test grouping by one field against values computed in Python"""
+        response = self.client.get('/api/statistics/groups/?group_by=extracurricular')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([group['extracurricular'] for group in response.data['groups']], [False, True])
+        for group in response.data['groups']:
+            values = list(StudentPerformance.objects.filter(
+                extracurricular=group['extracurricular']
+            ).values_list('performance_index', flat=True))
+            self.assertEqual(group['count'], len(values))
+            self.assertEqual(group['average_performance'], round(sum(values) / len(values), 2))
+            self.assertEqual(group['max_performance'], max(values))
+    
+    def test_binned_groups(self):
+        """Test that bin widths group values into bands"""
+        groups = grouped_statistics(['extracurricular', 'sleep_hours'], {'sleep_hours': 3})
+        
+        self.assertEqual([group['sleep_hours'] for group in groups[:2]], [{'min': 3, 'max': 5}, {'min': 6, 'max': 8}])
+        self.assertEqual(sum(group['count'] for group in groups), 120)
+        band = StudentPerformance.objects.filter(extracurricular=False, sleep_hours__gte=3, sleep_hours__lte=5).count()
+        self.assertEqual(groups[0]['count'], band)
+    
+    def test_cached_until_next_write(self):
+        """Test that results are cached per parameter set and expire on writes"""
+        url = '/api/statistics/groups/?group_by=sleep_hours,extracurricular&bins=sleep_hours:2'
+        first = self.client.get(url)
+        self.assertFalse(first.data['cached'])
+        
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertTrue(second.data['cached'])
+        self.assertEqual(second.data['groups'], first.data['groups'])
+        
+        StudentPerformance.objects.create(
+            hours_studied=1, previous_scores=60, extracurricular=True,
+            sleep_hours=4, sample_papers=1, performance_index=55.0
+        )
+        third = self.client.get(url)
+        self.assertFalse(third.data['cached'])
+        self.assertEqual(sum(group['count'] for group in third.data['groups']), 121)
+    
+    def test_statistics_cache_is_separate_from_prediction_cache(self):
+        """Test that grouped statistics caching does not touch the prediction cache counters"""
+        before = views.prediction_cache.stats()
+        hits = views.group_statistics_cache.stats()['hits']
+        for _ in range(2):
+            self.client.get('/api/statistics/groups/?group_by=extracurricular')
+        
+        self.assertNotIsInstance(views.group_statistics_cache, PredictionCache)
+        self.assertEqual(views.group_statistics_cache.stats()['hits'], hits + 1)
+        self.assertEqual(views.prediction_cache.stats(), before)
+    
+    def test_invalid_parameters(self):
+        """Test that bad grouping parameters are rejected"""
+        for query in ('', '?group_by=shoe_size', '?group_by=sleep_hours,sleep_hours',
+                      '?group_by=extracurricular&bins=extracurricular:2', '?group_by=sleep_hours&bins=sleep_hours:0',
+                      '?group_by=sleep_hours&bins=sleep_hours:wide', '?group_by=sleep_hours&bins=hours_studied:2'):
+            response = self.client.get(f'/api/statistics/groups/{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class TrendStatisticsTestCase(TestCase):
+    """Test cases for /api/statistics/trends/"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        views.trend_cache.clear()
+        self.now = timezone.now()
+        # Two records per day over the last five days, including today
+        for days in range(5):
+            for score in (40.0, 60.0 + days):
+                record = StudentPerformance.objects.create(
+                    hours_studied=days + 1, previous_scores=70, extracurricular=False,
+                    sleep_hours=7, sample_papers=2, performance_index=score
+                )
+                StudentPerformance.objects.filter(pk=record.pk).update(created_at=self.now - timedelta(days=days))
+    
+    def test_daily_buckets(self):
+        """Test bucket counts and averages against the records of each day"""
+        buckets, cached = trend_statistics('day', 7, now=self.now)
+        
+        self.assertEqual(cached, 0)
+        self.assertEqual(len(buckets), 7)
+        self.assertEqual([bucket['count'] for bucket in buckets], [0, 0, 2, 2, 2, 2, 2])
+        self.assertEqual([bucket['closed'] for bucket in buckets], [True] * 6 + [False])
+        self.assertIsNone(buckets[0]['average_performance'])
+        self.assertEqual(buckets[-1]['average_performance'], 50.0)
+        self.assertEqual(buckets[-2]['max_performance'], 61.0)
+        self.assertEqual(buckets[-3]['average_hours_studied'], 3.0)
+        self.assertEqual(buckets[-1]['start'], bucket_start(self.now, 'day').isoformat())
+    
+    def test_weekly_and_monthly_buckets(self):
+        """Test that every record falls in exactly one week and one month bucket"""
+        for period in ('week', 'month'):
+            buckets, _ = trend_statistics(period, 3, now=self.now)
+            self.assertEqual(sum(bucket['count'] for bucket in buckets), 10, period)
+        
+        moment = datetime(2024, 3, 14, 15, 30, tzinfo=timezone.get_current_timezone())
+        self.assertEqual(bucket_start(moment, 'week').date().isoformat(), '2024-03-11')
+        self.assertEqual(bucket_start(moment, 'month').date().isoformat(), '2024-03-01')
+    
+    def test_closed_buckets_cached(self):
+        """Test that closed buckets are cached and only the open bucket is recomputed"""
+        first = self.client.get('/api/statistics/trends/?buckets=5')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['cached_buckets'], 0)
+        
+        # One query for the statistics generation, one for the open bucket
+        with self.assertNumQueries(2):
+            second = self.client.get('/api/statistics/trends/?buckets=5')
+        self.assertEqual(second.data['cached_buckets'], 4)
+        self.assertEqual(second.data['buckets'], first.data['buckets'])
+        
+        StudentPerformance.objects.create(
+            hours_studied=1, previous_scores=60, extracurricular=True,
+            sleep_hours=4, sample_papers=1, performance_index=70.0
+        )
+        third = self.client.get('/api/statistics/trends/?buckets=5')
+        self.assertEqual(third.data['cached_buckets'], 4)
+        self.assertEqual(third.data['buckets'][-1]['count'], first.data['buckets'][-1]['count'] + 1)
+        self.assertEqual(third.data['buckets'][:-1], first.data['buckets'][:-1])
+    
+    def test_delete_invalidates_closed_buckets(self):
+        """Test that deleting a past record recomputes the closed buckets"""
+        self.client.get('/api/statistics/trends/?buckets=5')
+        StudentPerformance.objects.filter(hours_studied=3).first().delete()
+        
+        response = self.client.get('/api/statistics/trends/?buckets=5')
+        self.assertEqual(response.data['cached_buckets'], 0)
+        self.assertEqual(sum(bucket['count'] for bucket in response.data['buckets']), 9)
+    
+    def test_invalid_parameters(self):
+        """Test that bad trend parameters are rejected"""
+        for query in ('?period=year', '?buckets=0', '?buckets=many', '?buckets=367'):
+            response = self.client.get(f'/api/statistics/trends/{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
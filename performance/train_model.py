@@ -13,6 +13,10 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
+from performance.features import INPUT_COLUMNS, FEATURE_NAMES, build_features
+from performance.compiled import CompiledEnsemble
+from performance.bundle import save_bundle, hash_arrays
+from performance.profiles import staged_errors, choose_profiles
 
 
 def generate_bias_resistant_data(df):
@@ -144,44 +148,27 @@ def generate_bias_resistant_data(df):
     return combined_df
 
 
-def create_advanced_features(X):
+def export_bundle(model, scaler, training_data_hash, metrics, bundle_dir=os.path.join('performance', 'bundles'),
+                  staged=None, cube=True):
     """
-    Create advanced features to capture non-linear relationships
-    and interactions that reduce bias.
+    Flatten the trained model into a versioned bundle, with its scaler,
+    feature order, metrics and (unless cube is False) a prediction cube for
+    every valid input, and make it the current bundle for serving.
+    staged holds per-stage held-out errors (see profiles.staged_errors),
+    from which the fast/balanced/full serving profiles are chosen.
     """
-    X_enhanced = X.copy()
-    
-    # Interaction features
-    X_enhanced['study_sleep_interaction'] = X_enhanced['Hours Studied'] * X_enhanced['Sleep Hours']
-    X_enhanced['study_papers_interaction'] = X_enhanced['Hours Studied'] * X_enhanced['Sample Question Papers Practiced']
-    X_enhanced['papers_score_interaction'] = X_enhanced['Sample Question Papers Practiced'] * X_enhanced['Previous Scores']
-    
-    # Non-linear features
-    X_enhanced['hours_squared'] = X_enhanced['Hours Studied'] ** 2
-    X_enhanced['sleep_squared'] = X_enhanced['Sleep Hours'] ** 2
-    X_enhanced['papers_squared'] = X_enhanced['Sample Question Papers Practiced'] ** 2
-    
-    # Efficiency metrics
-    X_enhanced['study_efficiency'] = np.where(
-        X_enhanced['Sleep Hours'] > 0,
-        X_enhanced['Hours Studied'] / X_enhanced['Sleep Hours'],
-        0
+    params = model.get_params()
+    return save_bundle(
+        bundle_dir,
+        CompiledEnsemble.from_sklearn(model, scaler),
+        scaler,
+        training_data_hash,
+        metrics=metrics,
+        model_params={name: params[name] for name in ('n_estimators', 'learning_rate', 'max_depth', 'loss')},
+        cube_predict=(lambda features: model.predict(scaler.transform(features))) if cube else None,
+        profiles=choose_profiles(staged['test_mae']) if staged else None,
+        staged_errors=staged,
     )
-    
-    # Sleep quality indicator (optimal range is 7-9 hours)
-    X_enhanced['sleep_quality'] = np.abs(X_enhanced['Sleep Hours'] - 8)
-    
-    # Normalized previous scores
-    X_enhanced['score_percentile'] = X_enhanced['Previous Scores'] / 100.0
-    
-    # Combined effort metric
-    X_enhanced['total_effort'] = (
-        (X_enhanced['Hours Studied'] / 24) +
-        (X_enhanced['Sample Question Papers Practiced'] / 10) +
-        X_enhanced['Extracurricular Activities']
-    ) / 3
-    
-    return X_enhanced
 
 
 def train():
@@ -204,19 +191,17 @@ def train():
         df['Extracurricular Activities'] = le.fit_transform(df['Extracurricular Activities'])
         
         # Prepare features and target
-        X = df.drop('Performance Index', axis=1)
-        y = df['Performance Index']
+        y = df['Performance Index'].to_numpy()
         
         # Create advanced features
-        X = create_advanced_features(X)
+        X = build_features(df[INPUT_COLUMNS].to_numpy())
         
         print(f"Features after enhancement: {X.shape[1]} features")
-        print(f"Feature names: {X.columns.tolist()}")
+        print(f"Feature names: {FEATURE_NAMES}")
         
         # Standardize features
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
-        X_scaled = pd.DataFrame(X_scaled, columns=X.columns)
         
         # Split with stratified approach for better distribution
         X_train, X_test, y_train, y_test = train_test_split(
@@ -252,6 +237,9 @@ def train():
         train_mae = mean_absolute_error(y_train, y_pred_train)
         test_mae = mean_absolute_error(y_test, y_pred_test)
         
+        # Held-out error after every boosting stage, for the serving profiles
+        staged = staged_errors(model, X_test, y_test)
+        
         # Cross-validation score
         cv_scores = cross_val_score(model, X_scaled, y, cv=5, scoring='r2')
         
@@ -268,9 +256,13 @@ def train():
         print(f"Cross-validation R² (std): {cv_scores.std():.4f}")
         print("="*60)
         
+        print("\nServing profiles (trees evaluated, held-out MAE):")
+        for name, profile in choose_profiles(staged['test_mae']).items():
+            print(f"  {name:<9} {profile['n_trees']:>4} trees  MAE {profile['test_mae']:.4f} (+{profile['mae_increase']:.4f})")
+        
         # Feature importance
         feature_importance = pd.DataFrame({
-            'feature': X.columns,
+            'feature': FEATURE_NAMES,
             'importance': model.feature_importances_
         }).sort_values('importance', ascending=False)
         
@@ -290,12 +282,33 @@ def train():
         
         # Save feature names
         features_path = os.path.join(model_dir, 'features.pkl')
-        joblib.dump(X.columns.tolist(), features_path)
+        joblib.dump(FEATURE_NAMES, features_path)
         
         print(f"\nModel saved at: {model_path}")
         print(f"Scaler saved at: {scaler_path}")
         print(f"Features saved at: {features_path}")
         
+        # Save the serving bundle (compiled model, scaler, features, metrics
+        # and a precomputed prediction for every valid input)
+        print("\nBuilding model bundle...")
+        metrics = {
+            'train_mse': train_mse,
+            'test_mse': test_mse,
+            'train_r2': train_r2,
+            'test_r2': test_r2,
+            'train_mae': train_mae,
+            'test_mae': test_mae,
+            'cv_r2_mean': cv_scores.mean(),
+            'cv_r2_std': cv_scores.std(),
+        }
+        version = export_bundle(
+            model, scaler, hash_arrays(X, y),
+            {name: float(value) for name, value in metrics.items()},
+            bundle_dir=os.path.join(model_dir, 'bundles'),
+            staged=staged
+        )
+        print(f"Model bundle {version} saved in: {os.path.join(model_dir, 'bundles')}")
+        
     except FileNotFoundError:
         print("Error: dataset.csv not found. Make sure it's in the project root directory.")
     except Exception as e:
@@ -4,23 +4,51 @@ URL configuration for the performance app.
 from django.urls import path
 from .views import (
     predict_performance,
+    predict_batch,
+    predict_stream,
+    predict_sweep,
+    predict_goal_seek,
+    prediction_metrics,
+    reload_model,
+    set_shadow_model,
     get_all_records,
     get_record_by_id,
     create_record,
-    get_statistics
+    get_statistics,
+    get_distribution,
+    get_group_statistics,
+    get_trends
 )
+from . import async_views
 
 app_name = 'performance'
 
 urlpatterns = [
     # Prediction endpoints
     path('predict/', predict_performance, name='predict_performance'),
+    path('predict/batch/', predict_batch, name='predict_batch'),
+    path('predict/stream/', predict_stream, name='predict_stream'),
+    path('predict/sweep/', predict_sweep, name='predict_sweep'),
+    path('predict/goal/', predict_goal_seek, name='predict_goal_seek'),
+    path('predict/metrics/', prediction_metrics, name='prediction_metrics'),
+    path('model/reload/', reload_model, name='reload_model'),
+    path('model/shadow/', set_shadow_model, name='set_shadow_model'),
     
     # Database CRUD endpoints
     path('records/', get_all_records, name='get_all_records'),
     path('records/create/', create_record, name='create_record'),
     path('records/<int:pk>/', get_record_by_id, name='get_record_by_id'),
     
-    # Statistics endpoint
+    # Statistics endpoints
     path('statistics/', get_statistics, name='get_statistics'),
+    path('statistics/distribution/', get_distribution, name='get_distribution'),
+    path('statistics/groups/', get_group_statistics, name='get_group_statistics'),
+    path('statistics/trends/', get_trends, name='get_trends'),
+    
+    # Async endpoints for ASGI deployments (scoring runs on a bounded executor)
+    path('async/predict/', async_views.predict_performance, name='async_predict_performance'),
+    path('async/predict/batch/', async_views.predict_batch, name='async_predict_batch'),
+    path('async/records/', async_views.get_all_records, name='async_get_all_records'),
+    path('async/records/<int:pk>/', async_views.get_record_by_id, name='async_get_record_by_id'),
+    path('async/statistics/', async_views.get_statistics, name='async_get_statistics'),
 ]
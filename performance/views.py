@@ -2,83 +2,252 @@
 API Views for the performance prediction endpoints.
 Includes bias-resistant predictions using advanced feature engineering.
 """
-import joblib
-import numpy as np
-import pandas as pd
-import os
-from rest_framework.decorators import api_view
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import StudentPerformanceSerializer, PredictionSerializer
+from .serializers import StudentPerformanceSerializer, PredictionSerializer, SweepSerializer, GoalSeekSerializer
 from .models import StudentPerformance
+from .cache import PredictionCache, VersionedLRUCache
+from .batcher import MicroBatcher
+from .exceptions import BundleError
+from .registry import get_registry
+from .executor import get_executor
+from .shadow import get_shadow, set_shadow
+from .prediction_log import get_prediction_log
+from .pagination import keyset_page, page_payload, page_size, split_page
+from .running_stats import distribution_statistics, history_generation, materialized_statistics, statistics_generation
+from .stats import GROUP_FIELDS, MAX_GROUP_FIELDS, TREND_PERIODS, grouped_statistics, trend_statistics
+from .histograms import DEFAULT_PERCENTILES, HISTOGRAM_BINS
 
 
-# Load the pre-trained model, scaler, and features
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'model.pkl')
-SCALER_PATH = os.path.join(os.path.dirname(__file__), 'scaler.pkl')
-FEATURES_PATH = os.path.join(os.path.dirname(__file__), 'features.pkl')
+# LRU cache for repeated single-row predictions
+prediction_cache = PredictionCache(settings.PREDICTION_CACHE_SIZE)
 
-try:
-    model = joblib.load(MODEL_PATH)
-except FileNotFoundError:
-    model = None
+# Grouped statistics per parameter set, valid until the next record write
+group_statistics_cache = VersionedLRUCache(settings.STATISTICS_CACHE_SIZE)
 
-try:
-    scaler = joblib.load(SCALER_PATH)
-except FileNotFoundError:
-    scaler = None
+# Closed trend buckets, valid until existing records are changed or deleted
+trend_cache = VersionedLRUCache(settings.TREND_CACHE_SIZE)
 
-try:
-    feature_names = joblib.load(FEATURES_PATH)
-except FileNotFoundError:
-    feature_names = None
+# Coalesces concurrent single-row predictions into one model call (None when disabled)
+prediction_batcher = (
+    MicroBatcher(settings.PREDICTION_MICROBATCH_WINDOW_MS / 1000, settings.PREDICTION_MICROBATCH_MAX_SIZE)
+    if settings.PREDICTION_MICROBATCH_WINDOW_MS > 0 else None
+)
 
 
-def create_advanced_features_for_prediction(hours_studied, previous_scores, 
-                                           extracurricular, sleep_hours, sample_papers):
+def day_length_error(data):
     """
-    Create the same advanced features used during training
-    to ensure consistent predictions without bias.
+    Return an error message if study_hours + sleep_hours exceeds 24,
+    otherwise None.
     """
-    features_dict = {
-        'Hours Studied': hours_studied,
-        'Previous Scores': previous_scores,
-        'Extracurricular Activities': 1 if extracurricular else 0,
-        'Sleep Hours': sleep_hours,
-        'Sample Question Papers Practiced': sample_papers,
+    total = data['hours_studied'] + data['sleep_hours']
+    if total > 24:
+        return (
+            f'Invalid input: Hours Studied ({data["hours_studied"]}) + Sleep Hours ({data["sleep_hours"]}) = {total}, '
+            'which exceeds 24 hours in a day. Please reduce one of these values.'
+        )
+    return None
+
+
+def cache_key(data):
+    """
+    Return the prediction cache key for validated inputs.
+    """
+    return tuple(int(value) for value in data.values())
+
+
+def resolve_profile(bundle, profile):
+    """
+    Return (served profile, n_trees, error) for a requested serving profile
+    name (the default profile if None). The served profile is 'full' when
+    the bundle answers every profile from its prediction cube; n_trees is
+    None when the full model is used.
+    """
+    profile = profile or settings.PREDICTION_DEFAULT_PROFILE
+    try:
+        served, n_trees = bundle.serving_profile(profile)
+    except KeyError:
+        return None, None, f'Unknown profile {profile!r}. Available profiles: {", ".join(bundle.profiles)}.'
+    return served, n_trees, None
+
+
+def score_single(bundle, data, n_trees=None):
+    """
+    Predict one validated row, using the LRU cache and the micro-batcher
+    when they are enabled. n_trees limits the model to its first trees.
+    """
+    key = cache_key(data) + (n_trees,)
+    prediction = prediction_cache.get(key, bundle.version)
+    if prediction is None:
+        # Create advanced features, scale, predict and clip to realistic range (0-100)
+        if prediction_batcher is not None:
+            prediction = round(prediction_batcher.predict(bundle, data, n_trees=n_trees), 2)
+        else:
+            prediction = round(float(bundle.predict_rows([data], n_trees=n_trees)[0]), 2)
+        prediction_cache.put(key, bundle.version, prediction)
+    return prediction
+
+
+def log_prediction(bundle, data, prediction, profile, source='sync'):
+    """
+    Queue a served prediction for the prediction log, if logging is on.
+    profile is the served profile from resolve_profile().
+    """
+    writer = get_prediction_log()
+    if writer is not None:
+        writer.submit(data, bundle.version, profile, prediction, source)
+
+
+def prediction_payload(bundle, data, prediction, profile, n_trees=None):
+    """
+    Build the /api/predict/ response body. profile and n_trees are the
+    served profile and tree count from resolve_profile().
+    """
+    return {
+        'predicted_performance_index': prediction,
+        'input_features': {
+            'hours_studied': data['hours_studied'],
+            'previous_scores': data['previous_scores'],
+            'extracurricular': data['extracurricular'],
+            'sleep_hours': data['sleep_hours'],
+            'sample_papers': data['sample_papers'],
+        },
+        'model_info': 'Bias-resistant prediction using advanced feature engineering',
+        'model_version': bundle.version,
+        'profile': profile,
+        'n_trees': n_trees or bundle.compiled.n_trees,
     }
+
+
+def validate_batch(rows):
+    """
+    Validate each row of a batch on its own.
+    Returns (results, valid_indices, valid_rows), where results holds the
+    error entry for every invalid row and None for every valid one.
     
-    # Base features
-    base_df = pd.DataFrame([features_dict])
-    
-    # Create advanced features (same as training)
-    base_df_copy = base_df.copy()
+    Rows of plain JSON integers are checked together in one vectorized
+    pass; only the rest go through PredictionSerializer, so invalid rows get
+    the same error messages either way.
+    """
+    import numpy as np
+    from .features import INPUT_FIELDS
+    from .streaming import plain_inputs, validate_inputs
     
-    base_df['study_sleep_interaction'] = base_df['Hours Studied'] * base_df['Sleep Hours']
-    base_df['study_papers_interaction'] = base_df['Hours Studied'] * base_df['Sample Question Papers Practiced']
-    base_df['papers_score_interaction'] = base_df['Sample Question Papers Practiced'] * base_df['Previous Scores']
+    results = [None] * len(rows)
+    valid = {}
+    checked_indices = []
+    checked_values = []
+    for index, row in enumerate(rows):
+        values = plain_inputs(row)
+        if values is not None:
+            checked_indices.append(index)
+            checked_values.append(values)
     
-    base_df['hours_squared'] = base_df['Hours Studied'] ** 2
-    base_df['sleep_squared'] = base_df['Sleep Hours'] ** 2
-    base_df['papers_squared'] = base_df['Sample Question Papers Practiced'] ** 2
+    if checked_values:
+        errors = validate_inputs(np.array(checked_values, dtype=np.int64))
+        for index, values, error in zip(checked_indices, checked_values, errors):
+            if error is None:
+                data = dict(zip(INPUT_FIELDS, values))
+                data['extracurricular'] = bool(data['extracurricular'])
+                valid[index] = data
     
-    base_df['study_efficiency'] = np.where(
-        base_df['Sleep Hours'] > 0,
-        base_df['Hours Studied'] / base_df['Sleep Hours'],
-        0
-    )
+    for index, row in enumerate(rows):
+        if index in valid:
+            continue
+        serializer = PredictionSerializer(data=row)
+        if not serializer.is_valid():
+            results[index] = {'index': index, 'errors': serializer.errors}
+            continue
+        
+        data = serializer.validated_data
+        error = day_length_error(data)
+        if error is not None:
+            results[index] = {'index': index, 'errors': {'non_field_errors': [error]}}
+            continue
+        
+        valid[index] = data
     
-    base_df['sleep_quality'] = np.abs(base_df['Sleep Hours'] - 8)
+    valid_indices = sorted(valid)
+    valid_rows = [valid[index] for index in valid_indices]
+    return results, valid_indices, valid_rows
+
+
+def batch_size_error(rows):
+    """
+    Return an error message if rows is not an acceptable batch, otherwise None.
+    """
+    if not isinstance(rows, list) or not rows:
+        return 'Expected a non-empty JSON array of prediction inputs.'
+    max_size = settings.PREDICTION_BATCH_MAX_SIZE
+    if len(rows) > max_size:
+        return f'Batch too large: {len(rows)} rows (maximum is {max_size}).'
+    return None
+
+
+def score_batch(bundle, results, valid_indices, valid_rows, n_trees=None, profile='full'):
+    """
+    Score the valid rows of a batch in one model call and fill in results.
+    profile and n_trees are the served profile and tree count from
+    resolve_profile(). Returns the response body.
+    """
+    if valid_rows:
+        predictions = bundle.predict_rows(valid_rows, n_trees=n_trees)
+        for index, prediction in zip(valid_indices, predictions):
+            results[index] = {
+                'index': index,
+                'predicted_performance_index': round(float(prediction), 2),
+            }
     
-    base_df['score_percentile'] = base_df['Previous Scores'] / 100.0
+    return {
+        'count': len(results),
+        'succeeded': len(valid_rows),
+        'failed': len(results) - len(valid_rows),
+        'results': results,
+        'model_version': bundle.version,
+        'profile': profile,
+        'n_trees': n_trees or bundle.compiled.n_trees,
+    }
+
+
+def statistics_payload():
+    """
+    Return the /api/statistics/ body, or None if there are no records.
+    Read from the incrementally maintained statistics row (see running_stats.py).
+    """
+    stats = materialized_statistics()
     
-    base_df['total_effort'] = (
-        (base_df['Hours Studied'] / 24) +
-        (base_df['Sample Question Papers Practiced'] / 10) +
-        base_df['Extracurricular Activities']
-    ) / 3
+    if stats is None:
+        return None
     
-    return base_df
+    fields = stats['fields']
+    return {
+        'total_records': stats['total_records'],
+        'average_performance': fields['performance_index']['average'],
+        'max_performance': fields['performance_index']['max'],
+        'min_performance': fields['performance_index']['min'],
+        'average_hours_studied': fields['hours_studied']['average'],
+        'average_sleep_hours': fields['sleep_hours']['average'],
+        'median_performance': stats['median_performance'],
+        'extracurricular_rate': stats['extracurricular_rate'],
+        'fields': fields,
+    }
+
+
+def model_missing_response():
+    """
+    Return an error Response for requests made while no model bundle is loaded.
+    """
+    return Response(
+        {'error': 'Model not found. Please train the model first.'},
+        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
 
 
 @api_view(['POST'])
@@ -98,95 +267,378 @@ def predict_performance(request):
     
     Returns:
     {
-        "predicted_performance_index": float
+        "predicted_performance_index": float,
+        "model_version": str
     }
     """
-    if model is None:
+    # Pin the served bundle for the whole request, so a hot reload
+    # in the meantime does not mix model versions
+    bundle = get_registry().get()
+    if bundle is None:
+        return model_missing_response()
+    
+    # Validate input data
+    serializer = PredictionSerializer(data=request.data)
+    
+    if not serializer.is_valid():
         return Response(
-            {'error': 'Model not found. Please train the model first.'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
         )
     
-    if scaler is None:
+    data = serializer.validated_data
+    
+    # VALIDATION: study_hours + sleep_hours must be ≤ 24
+    error = day_length_error(data)
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    profile, n_trees, error = resolve_profile(bundle, request.query_params.get('profile'))
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        prediction = score_single(bundle, data, n_trees=n_trees)
+        
+        # Queue the request for the challenger model; never waits on it.
+        # Only full-model predictions are compared, so truncated profiles
+        # do not show up as differences between the models
+        shadow = get_shadow()
+        if shadow is not None and n_trees is None:
+            shadow.submit(data, bundle.version, prediction)
+        
+        # Buffered; written in batches by a background thread
+        log_prediction(bundle, data, prediction, profile)
+        
+        return Response(prediction_payload(bundle, data, prediction, profile, n_trees), status=status.HTTP_200_OK)
+    
+    except Exception as e:
         return Response(
-            {'error': 'Scaler not found. Please train the model first.'},
+            {'error': f'Prediction error: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['POST'])
+def predict_batch(request):
+    """
+    Predict performance for many students in one request.
+    Every row is validated on its own; valid rows are scored together
+    with a single feature build and a single vectorized model call.
     
-    if feature_names is None:
+    Expected POST data: a JSON array of prediction inputs
+    [
+        {"hours_studied": int, "previous_scores": int, "extracurricular": boolean,
+         "sleep_hours": int, "sample_papers": int},
+        ...
+    ]
+    
+    Returns:
+    {
+        "count": int,
+        "succeeded": int,
+        "failed": int,
+        "results": [
+            {"index": 0, "predicted_performance_index": float},
+            {"index": 1, "errors": {...}}
+        ]
+    }
+    """
+    # Pin the served bundle for the whole request, so a hot reload
+    # in the meantime does not mix model versions
+    bundle = get_registry().get()
+    if bundle is None:
+        return model_missing_response()
+    
+    rows = request.data
+    error = batch_size_error(rows)
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    profile, n_trees, error = resolve_profile(bundle, request.query_params.get('profile'))
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    results, valid_indices, valid_rows = validate_batch(rows)
+    
+    try:
+        payload = score_batch(bundle, results, valid_indices, valid_rows, n_trees=n_trees, profile=profile)
+    except Exception as e:
         return Response(
-            {'error': 'Features configuration not found. Please train the model first.'},
+            {'error': f'Prediction error: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     
-    # Validate input data
-    serializer = PredictionSerializer(data=request.data)
+    return Response(payload, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def predict_sweep(request):
+    """
+    What-if sweep: vary one or two inputs around a base input and return
+    the whole curve or grid of predictions from one vectorized call.
+    
+    Expected POST data:
+    {
+        "base": {"hours_studied": int, "previous_scores": int, "extracurricular": boolean,
+                 "sleep_hours": int, "sample_papers": int},
+        "vary": [
+            {"feature": "sleep_hours", "start": 0, "stop": 12, "step": 1},
+            ...                      # optional second input for a 2-D grid
+        ]
+    }
     
+    Returns:
+    {
+        "features": ["sleep_hours"],
+        "values": [[0, 1, ..., 12]],
+        "predictions": [float | null, ...]   # nested per row for 2-D grids;
+                                             # null where study + sleep > 24
+    }
+    """
+    from .whatif import sweep, to_json
+    
+    bundle = get_registry().get()
+    if bundle is None:
+        return model_missing_response()
+    
+    serializer = SweepSerializer(data=request.data)
     if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    base = serializer.validated_data['base']
+    vary = serializer.validated_data['vary']
+    
+    # A base that breaks the day-length rule only matters if the sweep cannot change it
+    varied = {axis['feature'] for axis in vary}
+    error = day_length_error(base)
+    if error is not None and not varied & {'hours_studied', 'sleep_hours'}:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        values, predictions = sweep(bundle, base, vary)
+    except Exception as e:
         return Response(
-            serializer.errors,
-            status=status.HTTP_400_BAD_REQUEST
+            {'error': f'Prediction error: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     
+    return Response({
+        'features': [axis['feature'] for axis in vary],
+        'values': [axis.tolist() for axis in values],
+        'predictions': to_json(predictions),
+        'model_version': bundle.version,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def predict_goal_seek(request):
+    """
+    Find the minimum-effort change to a student's inputs that reaches a
+    target performance index.
+    
+    Expected POST data:
+    {
+        "base": {...prediction input...},
+        "target": float,                             # 0-100
+        "adjustable": ["hours_studied", "sample_papers"],   # default
+        "costs": {"hours_studied": 2.0},             # per-unit cost, default 1
+        "allow_decrease": false                      # only raise inputs by default
+    }
+    
+    Returns:
+    {
+        "achievable": bool,
+        "inputs": {...},              # cheapest inputs reaching the target, or
+                                      # the best reachable ones if not achievable
+        "changes": {"hours_studied": {"from": 6, "to": 9}},
+        "cost": float,
+        "predicted_performance_index": float,
+        "candidates": int,
+        "evaluated": int
+    }
+    """
+    from .whatif import candidate_count, goal_seek
+    
+    bundle = get_registry().get()
+    if bundle is None:
+        return model_missing_response()
+    
+    serializer = GoalSeekSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
     data = serializer.validated_data
+    error = day_length_error(data['base'])
+    if error is not None and not set(data['adjustable']) & {'hours_studied', 'sleep_hours'}:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
     
-    # VALIDATION: study_hours + sleep_hours must be ≤ 24
-    if data['hours_studied'] + data['sleep_hours'] > 24:
-        return Response(
-            {'error': f'Invalid input: Hours Studied ({data["hours_studied"]}) + Sleep Hours ({data["sleep_hours"]}) = {data["hours_studied"] + data["sleep_hours"]}, which exceeds 24 hours in a day. Please reduce one of these values.'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    # Without a prediction cube every candidate goes through the trees
+    if bundle.cube is None:
+        candidates = candidate_count(data['base'], data['adjustable'], data['allow_decrease'])
+        if candidates > settings.GOAL_SEEK_MAX_CANDIDATES:
+            return Response(
+                {'error': f'Search has {candidates} candidates, more than the {settings.GOAL_SEEK_MAX_CANDIDATES} '
+                          'allowed without a prediction cube. Adjust fewer inputs or disallow decreases.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
     
     try:
-        # Create advanced features
-        features_df = create_advanced_features_for_prediction(
-            data['hours_studied'],
-            data['previous_scores'],
-            data['extracurricular'],
-            data['sleep_hours'],
-            data['sample_papers']
+        result = goal_seek(
+            bundle, data['base'], data['target'], data['adjustable'],
+            costs=data['costs'], allow_decrease=data['allow_decrease']
         )
-        
-        # Reorder columns to match training features
-        features_df = features_df[feature_names]
-        
-        # Scale features using the same scaler as training
-        features_scaled = scaler.transform(features_df)
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        
-        # Clip prediction to realistic range (0-100)
-        prediction = np.clip(prediction, 0, 100)
-        
-        return Response({
-            'predicted_performance_index': round(float(prediction), 2),
-            'input_features': {
-                'hours_studied': data['hours_studied'],
-                'previous_scores': data['previous_scores'],
-                'extracurricular': data['extracurricular'],
-                'sleep_hours': data['sleep_hours'],
-                'sample_papers': data['sample_papers'],
-            },
-            'model_info': 'Bias-resistant prediction using advanced feature engineering'
-        }, status=status.HTTP_200_OK)
-    
     except Exception as e:
         return Response(
             {'error': f'Prediction error: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    result['model_version'] = bundle.version
+    return Response(result, status=status.HTTP_200_OK)
+
+
+# Content types of the streaming endpoint, by format
+STREAM_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+@csrf_exempt
+@require_POST
+def predict_stream(request):
+    """
+    Score a streamed CSV (dataset.csv column layout) or NDJSON body and
+    stream the predictions back, one chunk of rows at a time.
+    This is a plain Django view: DRF would parse the whole body up front.
+    
+    The format is taken from ?format=csv|ndjson, or else the Content-Type.
+    Output uses the same format, one line per input row:
+        CSV:    index,predicted_performance_index,error
+        NDJSON: {"index": 0, "predicted_performance_index": 72.45}
+                {"index": 1, "error": "..."}
+    """
+    # Imported here so that importing the views stays free of NumPy
+    from .streaming import StreamFormatError, read_records, stream_predictions
+    
+    bundle = get_registry().get()
+    if bundle is None:
+        return JsonResponse(
+            {'error': 'Model not found. Please train the model first.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    input_format = request.GET.get('format')
+    if input_format is None:
+        content_type = request.content_type or ''
+        input_format = 'csv' if content_type == 'text/csv' else 'ndjson'
+    
+    try:
+        # request is iterated line by line, so the body is never buffered whole
+        records = read_records(request, input_format)
+    except StreamFormatError as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    response = StreamingHttpResponse(
+        stream_predictions(bundle, records, input_format, settings.PREDICTION_STREAM_CHUNK_ROWS),
+        content_type=STREAM_CONTENT_TYPES[input_format]
+    )
+    response['X-Model-Version'] = bundle.version
+    return response
+
+
+@api_view(['GET'])
+def prediction_metrics(request):
+    """
+    Report serving metrics for the prediction endpoints.
+    """
+    registry = get_registry()
+    bundle = registry.get()
+    shadow = get_shadow()
+    prediction_log = get_prediction_log()
+    return Response({
+        'model_version': registry.version,
+        'cube_loaded': bundle is not None and bundle.cube is not None,
+        'profiles': bundle.served_profiles if bundle is not None else {},
+        'registry': registry.status(),
+        'cache': prediction_cache.stats(),
+        'micro_batcher': prediction_batcher.stats() if prediction_batcher is not None else {'enabled': False},
+        'executor': get_executor().stats(),
+        'shadow': shadow.status() if shadow is not None else {'enabled': False},
+        'prediction_log': prediction_log.status() if prediction_log is not None else {'enabled': False},
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reload_model(request):
+    """
+    Load a model bundle, smoke-test it and swap it in without downtime.
+    Admin only.
+    
+    Expected POST data (optional):
+    {
+        "version": str   # bundle to promote; defaults to the one named by CURRENT
+    }
+    """
+    registry = get_registry()
+    previous_version = registry.version
+    version = request.data.get('version')
+    
+    try:
+        bundle = registry.promote(version) if version else registry.reload()
+    except BundleError as e:
+        return Response(
+            {'error': f'Reload failed: {str(e)}', 'model_version': previous_version},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response({
+        'previous_version': previous_version,
+        'model_version': bundle.version,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def set_shadow_model(request):
+    """
+    Start shadow scoring of /api/predict/ traffic with a challenger bundle,
+    or stop it. Admin only.
+    
+    Expected POST data:
+    {
+        "version": str | null   # bundle to score in the shadow; null turns shadow mode off
+    }
+    """
+    version = request.data.get('version')
+    try:
+        shadow = set_shadow(version)
+    except BundleError as e:
+        return Response({'error': f'Could not load shadow model: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'shadow': shadow.status() if shadow is not None else {'enabled': False},
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 def get_all_records(request):
     """
-    Retrieve all student performance records from the database.
-    Supports pagination.
+    Retrieve student performance records from the database, newest first.
+    Supports cursor pagination: pass ?cursor=<next_cursor> from the previous
+    page, and optionally ?page_size=.
     """
-    records = StudentPerformance.objects.all()
+    try:
+        size = page_size(request.query_params.get('page_size'))
+        records = list(keyset_page(StudentPerformance.objects.all(), request.query_params.get('cursor'), size))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    records, next_cursor = split_page(records, size)
     serializer = StudentPerformanceSerializer(records, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(page_payload(request, serializer.data, next_cursor, size), status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -213,7 +665,9 @@ def create_record(request):
     serializer = StudentPerformanceSerializer(data=request.data)
     
     if serializer.is_valid():
-        serializer.save()
+        # The statistics row is updated in the same transaction
+        with transaction.atomic():
+            serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -224,23 +678,155 @@ def get_statistics(request):
     """
     Get statistics about the student performance data.
     """
-    records = StudentPerformance.objects.all()
+    stats = statistics_payload()
     
-    if not records.exists():
+    if stats is None:
         return Response(
             {'error': 'No records found in database'},
             status=status.HTTP_404_NOT_FOUND
         )
     
-    performance_indices = [r.performance_index for r in records]
+    return Response(stats, status=status.HTTP_200_OK)
+
+
+def distribution_params(query_params):
+    """
+    Parse ?fields= and ?percentiles= (comma-separated) for
+    /api/statistics/distribution/. Returns (fields, percentiles, error).
+    """
+    fields = [field for field in query_params.get('fields', '').split(',') if field] or list(HISTOGRAM_BINS)
+    unknown = [field for field in fields if field not in HISTOGRAM_BINS]
+    if unknown:
+        return None, None, f'Unknown fields: {", ".join(unknown)}. Available fields: {", ".join(HISTOGRAM_BINS)}.'
+    
+    try:
+        percentiles = [float(q) for q in query_params.get('percentiles', '').split(',') if q] or DEFAULT_PERCENTILES
+    except ValueError:
+        return None, None, 'percentiles must be comma-separated numbers'
+    if any(not 0 <= q <= 100 for q in percentiles):
+        return None, None, 'percentiles must be between 0 and 100'
+    return fields, percentiles, None
+
+
+@api_view(['GET'])
+def get_distribution(request):
+    """
+    Get percentiles and fixed-bin histograms of the record fields, read from
+    the incrementally maintained statistics row.
     
-    stats = {
-        'total_records': records.count(),
-        'average_performance': round(sum(performance_indices) / len(performance_indices), 2),
-        'max_performance': round(max(performance_indices), 2),
-        'min_performance': round(min(performance_indices), 2),
-        'average_hours_studied': round(sum([r.hours_studied for r in records]) / len(records), 2),
-        'average_sleep_hours': round(sum([r.sleep_hours for r in records]) / len(records), 2),
-    }
+    Query parameters:
+        fields: comma-separated fields (default: all)
+        percentiles: comma-separated percentiles, 0-100 (default: 5,10,25,50,75,90,95)
+    """
+    fields, percentiles, error = distribution_params(request.query_params)
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response(stats, status=status.HTTP_200_OK)
+    distribution = distribution_statistics(fields, percentiles)
+    
+    if distribution is None:
+        return Response(
+            {'error': 'No records found in database'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    return Response(distribution, status=status.HTTP_200_OK)
+
+
+def group_params(query_params):
+    """
+    Parse ?group_by= (comma-separated fields) and ?bins= (comma-separated
+    field:width pairs) for /api/statistics/groups/.
+    Returns (group_by, bins, error).
+    """
+    group_by = [field for field in query_params.get('group_by', '').split(',') if field]
+    if not group_by:
+        return None, None, f'group_by is required. Available fields: {", ".join(GROUP_FIELDS)}.'
+    unknown = [field for field in group_by if field not in GROUP_FIELDS]
+    if unknown:
+        return None, None, f'Unknown fields: {", ".join(unknown)}. Available fields: {", ".join(GROUP_FIELDS)}.'
+    if len(set(group_by)) != len(group_by) or len(group_by) > MAX_GROUP_FIELDS:
+        return None, None, f'group_by takes up to {MAX_GROUP_FIELDS} distinct fields'
+    
+    bins = {}
+    for pair in query_params.get('bins', '').split(','):
+        if not pair:
+            continue
+        field, _, width = pair.partition(':')
+        if field not in group_by or field == 'extracurricular':
+            return None, None, f'bins can only be set for numeric group_by fields, not {field!r}'
+        try:
+            width = int(width)
+        except ValueError:
+            return None, None, 'bins must look like sleep_hours:2,hours_studied:5'
+        if width < 1:
+            return None, None, 'bin widths must be at least 1'
+        if width > 1:
+            bins[field] = width
+    return group_by, bins, None
+
+
+@api_view(['GET'])
+def get_group_statistics(request):
+    """
+    Get performance statistics grouped by record fields, optionally binned,
+    computed in one grouped SQL query and cached until the next write.
+    
+    Query parameters:
+        group_by: comma-separated fields, e.g. extracurricular,sleep_hours
+        bins: comma-separated band widths, e.g. sleep_hours:2,hours_studied:5
+    """
+    group_by, bins, error = group_params(request.query_params)
+    if error is not None:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    key = (tuple(group_by), tuple(sorted(bins.items())))
+    generation = statistics_generation()
+    groups = group_statistics_cache.get(key, generation)
+    cached = groups is not None
+    if not cached:
+        groups = grouped_statistics(group_by, bins)
+        group_statistics_cache.put(key, generation, groups)
+    
+    return Response({
+        'group_by': group_by,
+        'bins': bins,
+        'groups': groups,
+        'cached': cached,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def get_trends(request):
+    """
+    Get record counts and averages per day, week or month over created_at.
+    Closed buckets are cached; only the current bucket is recomputed.
+    
+    Query parameters:
+        period: day, week or month (default: day)
+        buckets: number of buckets up to and including the current one (default: 30)
+    """
+    period = request.query_params.get('period', 'day')
+    if period not in TREND_PERIODS:
+        return Response(
+            {'error': f'period must be one of: {", ".join(TREND_PERIODS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        count = int(request.query_params.get('buckets', settings.TREND_DEFAULT_BUCKETS))
+    except ValueError:
+        count = 0
+    if not 1 <= count <= settings.TREND_MAX_BUCKETS:
+        return Response(
+            {'error': f'buckets must be an integer between 1 and {settings.TREND_MAX_BUCKETS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    buckets, cached = trend_statistics(period, count, cache=trend_cache, version=history_generation())
+    
+    return Response({
+        'period': period,
+        'buckets': buckets,
+        'cached_buckets': cached,
+    }, status=status.HTTP_200_OK)
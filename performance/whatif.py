@@ -0,0 +1,171 @@
+"""
+What-if analysis over the discrete input space.
+
+Every input accepted by PredictionSerializer is a small bounded integer, so
+a what-if question can be answered by enumerating the candidate inputs as
+one NumPy array and scoring them in a single vectorized call.
+"""
+import numpy as np
+from .cube import CUBE_SHAPE
+from .features import INPUT_FIELDS, rows_to_inputs
+
+
+# Candidates scored per model call by goal_seek()
+SEARCH_BATCH = 4096
+
+
+def axis_values(axis):
+    """
+    Return the values of a validated sweep axis, start..stop inclusive.
+    """
+    return np.arange(axis['start'], axis['stop'] + 1, axis['step'])
+
+
+def sweep(bundle, base, vary):
+    """
+    Score a 1-D curve or 2-D grid of inputs around base.
+
+    base is a validated prediction input and vary a list of one or two
+    validated sweep axes. Returns (values, predictions): the values of each
+    axis, and an array of shape (len(values[0]),) or
+    (len(values[0]), len(values[1])) holding NaN where
+    hours_studied + sleep_hours would exceed 24.
+    """
+    values = [axis_values(axis) for axis in vary]
+    grids = np.meshgrid(*values, indexing='ij')
+
+    inputs = np.repeat(rows_to_inputs([base]), grids[0].size, axis=0)
+    for axis, grid in zip(vary, grids):
+        inputs[:, INPUT_FIELDS.index(axis['feature'])] = grid.ravel()
+
+    valid = inputs[:, 0] + inputs[:, 3] <= 24
+    predictions = np.full(len(inputs), np.nan)
+    if valid.any():
+        predictions[valid] = bundle.predict_inputs(inputs[valid])
+    return values, predictions.reshape(grids[0].shape)
+
+
+def to_json(predictions):
+    """
+    Round predictions for a response body, with None for NaN.
+    """
+    rounded = np.round(predictions, 2).astype(object)
+    rounded[np.isnan(predictions)] = None
+    return rounded.tolist()
+
+
+def search_axes(base_inputs, columns, allow_decrease):
+    """
+    Return the values goal_seek() tries for each adjustable input column.
+    """
+    return [np.arange(0 if allow_decrease else base_inputs[column], CUBE_SHAPE[column]) for column in columns]
+
+
+def candidate_count(base, adjustable, allow_decrease=False):
+    """
+    Return the number of candidates goal_seek() would consider, without
+    building any of them.
+    """
+    base_inputs = rows_to_inputs([base])[0]
+    columns = [INPUT_FIELDS.index(feature) for feature in adjustable]
+    return int(np.prod([len(axis) for axis in search_axes(base_inputs, columns, allow_decrease)]))
+
+
+def goal_seek(bundle, base, target, adjustable, costs=None, allow_decrease=False, batch_size=SEARCH_BATCH):
+    """
+    Find the cheapest change to base whose prediction reaches target.
+
+    Only the adjustable inputs may change, each to any value allowed by the
+    API (or only upwards unless allow_decrease). A candidate costs the sum
+    over inputs of costs[input] (default 1) times the size of its change.
+    Candidates are sorted by cost and scored in batches, cheapest first, and
+    the search stops as soon as every candidate of the cheapest reaching
+    cost has been scored; ties go to the higher prediction.
+
+    Returns a dict describing the best candidate, or the best reachable
+    prediction if the target cannot be met.
+    """
+    costs = costs or {}
+    base_inputs = rows_to_inputs([base])[0]
+    columns = [INPUT_FIELDS.index(feature) for feature in adjustable]
+
+    axes = search_axes(base_inputs, columns, allow_decrease)
+    shape = tuple(len(axis) for axis in axes)
+
+    # Cost of every candidate, without materializing the candidates
+    cost = np.zeros(shape)
+    for i, (feature, column, axis) in enumerate(zip(adjustable, columns, axes)):
+        step_cost = costs.get(feature, 1.0) * np.abs(axis - base_inputs[column])
+        cost += step_cost.reshape([-1 if j == i else 1 for j in range(len(axes))])
+    cost = cost.ravel()
+    order = np.argsort(cost, kind='stable')
+
+    best = None
+    best_cost = None
+    highest = None
+    evaluated = 0
+
+    for start in range(0, len(order), batch_size):
+        positions = order[start:start + batch_size]
+        if best_cost is not None and cost[positions[0]] > best_cost:
+            break
+
+        inputs = np.repeat(base_inputs[None, :], len(positions), axis=0)
+        for column, axis, index in zip(columns, axes, np.unravel_index(positions, shape)):
+            inputs[:, column] = axis[index]
+
+        valid = inputs[:, 0] + inputs[:, 3] <= 24
+        positions, inputs = positions[valid], inputs[valid]
+        if not len(positions):
+            continue
+
+        predictions = bundle.predict_inputs(inputs)
+        evaluated += len(positions)
+
+        top = int(np.argmax(predictions))
+        if highest is None or predictions[top] > highest[1]:
+            highest = (inputs[top], float(predictions[top]), float(cost[positions[top]]))
+
+        hits = np.flatnonzero(predictions >= target)
+        if not len(hits):
+            continue
+        if best_cost is None:
+            # Positions are in cost order, so the first hit is the cheapest
+            best_cost = cost[positions[hits[0]]]
+        hits = hits[np.isclose(cost[positions[hits]], best_cost)]
+        if len(hits):
+            hit = hits[np.argmax(predictions[hits])]
+            if best is None or predictions[hit] > best[1]:
+                best = (inputs[hit], float(predictions[hit]), float(best_cost))
+
+    result = best if best is not None else highest
+    summary = {
+        'achievable': best is not None,
+        'target': target,
+        'candidates': int(len(order)),
+        'evaluated': evaluated,
+    }
+    if result is None:
+        return summary
+
+    inputs, prediction, result_cost = result
+    summary.update({
+        'inputs': describe_inputs(inputs),
+        'changes': {
+            feature: {'from': int(base_inputs[column]), 'to': int(inputs[column])}
+            for feature, column in zip(adjustable, columns)
+            if inputs[column] != base_inputs[column]
+        },
+        'cost': round(result_cost, 4),
+        'predicted_performance_index': round(prediction, 2),
+    })
+    return summary
+
+
+def describe_inputs(inputs):
+    """
+    Turn an input row back into a prediction input dict.
+    """
+    described = {field: int(value) for field, value in zip(INPUT_FIELDS, inputs)}
+    described['extracurricular'] = bool(described['extracurricular'])
+    return described
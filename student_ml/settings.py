@@ -308,6 +308,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'student_ml.wsgi.application'
+ASGI_APPLICATION = 'student_ml.asgi.application'
 
 
 # Database
@@ -363,6 +364,85 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+# /api/records/ is cursor-paginated (performance/pagination.py): PAGE_SIZE
+# records per page by default, and at most this many with ?page_size=
+RECORDS_MAX_PAGE_SIZE = 100
+
+# Prediction settings
+# Directory holding versioned model bundles written by train_model.train()
+MODEL_BUNDLE_DIR = BASE_DIR / 'performance' / 'bundles'
+
+# Seconds between checks for a new CURRENT bundle (0 disables the watcher;
+# POST /api/model/reload/ still reloads on demand)
+MODEL_RELOAD_INTERVAL = 30
+
+# Seconds requests wait before trying to load the bundle again after a
+# failed load (the watcher keeps checking CURRENT meanwhile)
+MODEL_LOAD_RETRY_INTERVAL = 5
+
+# Load the model bundle when the app starts (AppConfig.ready) instead of on
+# the first prediction. Off by default so management commands start fast.
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', '0') == '1'
+
+# Shadow mode: also score /api/predict/ traffic with this bundle version, off
+# the request path, and store both predictions as ShadowPrediction rows.
+# Requests are queued (up to SHADOW_QUEUE_SIZE, overflow is dropped and
+# counted) and scored in batches of up to SHADOW_BATCH_SIZE at least every
+# SHADOW_FLUSH_INTERVAL seconds. Can also be set with POST /api/model/shadow/.
+MODEL_SHADOW_VERSION = os.environ.get('MODEL_SHADOW_VERSION') or None
+SHADOW_QUEUE_SIZE = 10000
+SHADOW_BATCH_SIZE = 500
+SHADOW_FLUSH_INTERVAL = 1.0
+
+# Log every /api/predict/ request and its prediction as a PredictionLog row.
+# Rows are buffered in memory (up to PREDICTION_LOG_QUEUE_SIZE, overflow is
+# dropped and counted) and written with bulk_create by a background thread
+# once PREDICTION_LOG_BATCH_SIZE rows are buffered or every
+# PREDICTION_LOG_FLUSH_INTERVAL seconds.
+PREDICTION_LOG_ENABLED = os.environ.get('PREDICTION_LOG_ENABLED', '1') == '1'
+PREDICTION_LOG_QUEUE_SIZE = 10000
+PREDICTION_LOG_BATCH_SIZE = 500
+PREDICTION_LOG_FLUSH_INTERVAL = 1.0
+
+# Serving profile used when a request does not pass ?profile=. Bundles trained
+# with staged errors offer 'fast', 'balanced' and 'full' (see performance/profiles.py)
+PREDICTION_DEFAULT_PROFILE = 'full'
+
+# Maximum number of rows accepted by /api/predict/batch/ in one request
+PREDICTION_BATCH_MAX_SIZE = 50000
+
+# Rows parsed and scored per chunk by the streaming endpoint /api/predict/stream/
+PREDICTION_STREAM_CHUNK_ROWS = 10000
+
+# Largest goal-seek search (candidate inputs) accepted for a bundle without a
+# prediction cube, where every candidate is scored with the trees
+GOAL_SEEK_MAX_CANDIDATES = 250000
+
+# Number of distinct inputs kept in the in-process prediction LRU cache (0 disables it)
+PREDICTION_CACHE_SIZE = 4096
+
+# Parameter sets of /api/statistics/groups/ kept in an in-process LRU cache
+# (0 disables it). Entries expire when the record statistics row changes.
+STATISTICS_CACHE_SIZE = 256
+
+# /api/statistics/trends/: buckets returned by default and at most, and the
+# number of closed buckets kept in the in-process cache (0 disables it)
+TREND_DEFAULT_BUCKETS = 30
+TREND_MAX_BUCKETS = 366
+TREND_CACHE_SIZE = 2048
+
+# Micro-batching of concurrent /api/predict/ requests: rows arriving within
+# the window (milliseconds) are scored in one call, up to the maximum batch
+# size. A larger window adds latency but raises throughput under load.
+# 0 disables batching and scores each request on its own thread.
+PREDICTION_MICROBATCH_WINDOW_MS = int(os.environ.get('PREDICTION_MICROBATCH_WINDOW_MS', '0'))
+PREDICTION_MICROBATCH_MAX_SIZE = 64
+
+# Threads scoring requests for the async (/api/async/) endpoints, and the
+# number of jobs that may be queued or running before requests get a 503
+PREDICTION_EXECUTOR_WORKERS = int(os.environ.get('PREDICTION_EXECUTOR_WORKERS', '4'))
+PREDICTION_EXECUTOR_MAX_PENDING = 256
+
 # CORS settings - Allow ALL frontend ports on localhost
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",